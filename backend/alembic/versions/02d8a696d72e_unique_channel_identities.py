@@ -0,0 +1,122 @@
+"""Unique channel identities for the inbound upsert resolver
+
+Partial unique indexes that the contact and conversation ON CONFLICT upserts infer. The racy
+resolver they replace left duplicates behind, so those are merged first: the oldest contact of
+each channel identity keeps the conversations, deals and broadcast recipients of its duplicates,
+then the oldest open conversation of each contact and channel takes over the messages of the
+other open ones.
+
+Revision ID: 02d8a696d72e
+Revises: 97d5c8723cc9
+Create Date: 2026-10-18 01:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '02d8a696d72e'
+down_revision: Union[str, None] = '97d5c8723cc9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows of a table that point at a merged contact or conversation
+CONTACT_REFERENCES = ('conversations', 'deals', 'broadcast_recipients')
+CONVERSATION_REFERENCES = ('messages',)
+
+IDENTITY_COLUMNS = ('whatsapp_id', 'instagram_id', 'messenger_id')
+# Blanks of a kept contact filled in from its duplicates (oldest value first)
+CONTACT_FIELDS = ('email', 'phone', 'first_name', 'last_name', 'company')
+
+
+def _fill_kept_contacts(columns) -> str:
+    picked = ",\n".join(
+        f"(array_agg(d.{column} ORDER BY d.created_at NULLS LAST, d.id) "
+        f"FILTER (WHERE d.{column} IS NOT NULL))[1] AS {column}"
+        for column in columns
+    )
+    assignments = ", ".join(f"{column} = coalesce(c.{column}, picked.{column})" for column in columns)
+    return f"""
+        UPDATE contacts c
+        SET {assignments}
+        FROM (
+            SELECT merged.keep_id,
+            {picked}
+            FROM merged JOIN contacts d ON d.id = merged.duplicate_id
+            GROUP BY merged.keep_id
+        ) picked
+        WHERE c.id = picked.keep_id
+    """
+
+
+# The kept conversation now holds the newest message of the ones merged into it
+KEEP_LAST_MESSAGE_AT = """
+    UPDATE conversations c
+    SET last_message_at = latest.last_message_at
+    FROM (
+        SELECT merged.keep_id, max(d.last_message_at) AS last_message_at
+        FROM merged JOIN conversations d ON d.id = merged.duplicate_id
+        GROUP BY merged.keep_id
+    ) latest
+    WHERE c.id = latest.keep_id AND latest.last_message_at > coalesce(c.last_message_at, '-infinity')
+"""
+
+
+def _merge(table: str, reference_column: str, partition: str, where: str, references,
+           keep_update: str = None) -> None:
+    """Repoint references from every row but the oldest of each partition to it, then delete them
+
+    keep_update runs before the delete, with the temporary merged (duplicate_id, keep_id) table.
+    """
+    op.execute(f"""
+        CREATE TEMPORARY TABLE merged AS
+        SELECT id AS duplicate_id, keep_id
+        FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY {partition} ORDER BY created_at NULLS LAST, id
+            ) AS keep_id
+            FROM {table}
+            WHERE {where}
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    for reference in references:
+        op.execute(f"""
+            UPDATE {reference} SET {reference_column} = merged.keep_id
+            FROM merged
+            WHERE {reference}.{reference_column} = merged.duplicate_id
+        """)
+    if keep_update:
+        op.execute(keep_update)
+    op.execute(f"DELETE FROM {table} USING merged WHERE {table}.id = merged.duplicate_id")
+    op.execute("DROP TABLE merged")
+
+
+def upgrade() -> None:
+    # One identity at a time. A kept contact only takes over the identities of later passes, so a
+    # filled-in instagram_id that another contact holds is merged by the instagram_id pass
+    for position, column in enumerate(IDENTITY_COLUMNS):
+        fill = _fill_kept_contacts(IDENTITY_COLUMNS[position + 1:] + CONTACT_FIELDS)
+        _merge('contacts', 'contact_id', f'workspace_id, {column}', f'{column} IS NOT NULL', CONTACT_REFERENCES,
+               keep_update=fill)
+    # After the contact merges, which may have joined two contacts' open conversations
+    _merge('conversations', 'conversation_id', 'workspace_id, contact_id, channel',
+           "contact_id IS NOT NULL AND status IN ('ACTIVE', 'PENDING')", CONVERSATION_REFERENCES,
+           keep_update=KEEP_LAST_MESSAGE_AT)
+
+    for column in IDENTITY_COLUMNS:
+        op.create_index(f'uq_contacts_workspace_{column}', 'contacts', ['workspace_id', column], unique=True,
+                        postgresql_where=sa.text(f'{column} IS NOT NULL'))
+    op.create_index('uq_conversations_open_contact_channel', 'conversations',
+                    ['workspace_id', 'contact_id', 'channel'], unique=True,
+                    postgresql_where=sa.text("status IN ('ACTIVE', 'PENDING')"))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_conversations_open_contact_channel', table_name='conversations')
+    for column in ('messenger_id', 'instagram_id', 'whatsapp_id'):
+        op.drop_index(f'uq_contacts_workspace_{column}', table_name='contacts')
@@ -0,0 +1,29 @@
+"""Index broadcast recipients by channel message id
+
+Status callbacks are matched to recipients on the channel message id.
+
+Revision ID: 40b36588b4ae
+Revises: e7bba06ad923
+Create Date: 2026-10-18 01:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40b36588b4ae'
+down_revision: Union[str, None] = 'e7bba06ad923'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_broadcast_recipients_channel_message_id'), 'broadcast_recipients',
+                    ['channel_message_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_broadcast_recipients_channel_message_id'), table_name='broadcast_recipients')
@@ -0,0 +1,36 @@
+"""Contact import deduplication keys
+
+Adds the generated phone_digits column (computed for existing rows when the column is added) and
+the indexes the import merge matches on.
+
+Revision ID: 41ca90d56654
+Revises: 7d04a720f815
+Create Date: 2026-10-18 01:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41ca90d56654'
+down_revision: Union[str, None] = '7d04a720f815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('phone_digits', sa.String(length=50),
+                                        sa.Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True)))
+    op.create_index('ix_contacts_workspace_email_lower', 'contacts', ['workspace_id', sa.text('lower(email)')],
+                    unique=False)
+    op.create_index('ix_contacts_workspace_phone_digits', 'contacts', ['workspace_id', 'phone_digits'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_workspace_phone_digits', table_name='contacts')
+    op.drop_index('ix_contacts_workspace_email_lower', table_name='contacts')
+    op.drop_column('contacts', 'phone_digits')
@@ -0,0 +1,38 @@
+"""Store contact tags and custom fields as JSONB for segment indexes
+
+Revision ID: 5688ecd40de0
+Revises: d4d610162b4f
+Create Date: 2026-10-18 01:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5688ecd40de0'
+down_revision: Union[str, None] = 'd4d610162b4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for column in ('tags', 'custom_fields'):
+        op.alter_column('contacts', column, type_=postgresql.JSONB(), existing_type=sa.JSON(),
+                        postgresql_using=f'{column}::jsonb')
+    op.create_index('ix_contacts_tags_gin', 'contacts', ['tags'], unique=False, postgresql_using='gin')
+    op.create_index('ix_contacts_custom_fields_gin', 'contacts', ['custom_fields'], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_contacts_workspace_stage', 'contacts', ['workspace_id', 'stage'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_workspace_stage', table_name='contacts')
+    op.drop_index('ix_contacts_custom_fields_gin', table_name='contacts')
+    op.drop_index('ix_contacts_tags_gin', table_name='contacts')
+    for column in ('custom_fields', 'tags'):
+        op.alter_column('contacts', column, type_=sa.JSON(), existing_type=postgresql.JSONB(),
+                        postgresql_using=f'{column}::json')
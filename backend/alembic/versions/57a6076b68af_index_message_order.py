@@ -0,0 +1,29 @@
+"""Index a conversation's messages in order
+
+Serves exports and history windows walking (created_at, id).
+
+Revision ID: 57a6076b68af
+Revises: f8d06d717e40
+Create Date: 2026-10-18 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57a6076b68af'
+down_revision: Union[str, None] = 'f8d06d717e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_messages_conversation_created_at_id', 'messages', ['conversation_id', 'created_at', 'id'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_created_at_id', table_name='messages')
@@ -0,0 +1,35 @@
+"""Keyset pagination indexes for the list endpoints
+
+Revision ID: 6064914bcaf8
+Revises: 57a6076b68af
+Create Date: 2026-10-18 02:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6064914bcaf8'
+down_revision: Union[str, None] = '57a6076b68af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_automation_logs_automation_started_at_id', 'automation_logs',
+                    ['automation_id', 'started_at', 'id'], unique=False)
+    op.create_index('ix_contacts_workspace_created_at_id', 'contacts', ['workspace_id', 'created_at', 'id'],
+                    unique=False)
+    op.create_index('ix_conversations_workspace_last_message_at_id', 'conversations',
+                    ['workspace_id', 'last_message_at', 'id'], unique=False)
+    op.create_index('ix_deals_workspace_created_at_id', 'deals', ['workspace_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deals_workspace_created_at_id', table_name='deals')
+    op.drop_index('ix_conversations_workspace_last_message_at_id', table_name='conversations')
+    op.drop_index('ix_contacts_workspace_created_at_id', table_name='contacts')
+    op.drop_index('ix_automation_logs_automation_started_at_id', table_name='automation_logs')
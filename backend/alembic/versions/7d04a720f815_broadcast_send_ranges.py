@@ -0,0 +1,48 @@
+"""Broadcast send ranges and recipient send checkpoints
+
+Revision ID: 7d04a720f815
+Revises: 5688ecd40de0
+Create Date: 2026-10-18 01:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d04a720f815'
+down_revision: Union[str, None] = '5688ecd40de0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('broadcast_send_ranges',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('broadcast_id', sa.UUID(), nullable=False),
+    sa.Column('range_start', sa.UUID(), nullable=False),
+    sa.Column('range_end', sa.UUID(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'LEASED', 'DONE', name='sendrangestatus'), nullable=False),
+    sa.Column('lease_owner', sa.String(length=255), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['broadcast_id'], ['broadcasts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_broadcast_send_ranges_broadcast_start', 'broadcast_send_ranges',
+                    ['broadcast_id', 'range_start'], unique=True)
+    op.add_column('broadcast_recipients', sa.Column('send_attempted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_broadcast_recipients_broadcast_id_id', 'broadcast_recipients',
+                    ['broadcast_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_broadcast_recipients_broadcast_id_id', table_name='broadcast_recipients')
+    op.drop_column('broadcast_recipients', 'send_attempted_at')
+    op.drop_index('uq_broadcast_send_ranges_broadcast_start', table_name='broadcast_send_ranges')
+    op.drop_table('broadcast_send_ranges')
+    op.execute("DROP TYPE IF EXISTS sendrangestatus")
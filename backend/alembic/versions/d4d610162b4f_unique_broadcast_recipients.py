@@ -0,0 +1,43 @@
+"""One recipient row per broadcast and contact
+
+Removes duplicate recipient rows (keeping the one sent first) so INSERT ... SELECT materialization
+can rely on the unique index, and indexes contacts by (workspace_id, id) for audience walks.
+
+Revision ID: d4d610162b4f
+Revises: 40b36588b4ae
+Create Date: 2026-10-18 01:35:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4d610162b4f'
+down_revision: Union[str, None] = '40b36588b4ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM broadcast_recipients r
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY broadcast_id, contact_id ORDER BY sent_at NULLS LAST, id
+            ) AS copy
+            FROM broadcast_recipients
+            WHERE contact_id IS NOT NULL
+        ) d
+        WHERE r.id = d.id AND d.copy > 1
+    """)
+    op.create_index('uq_broadcast_recipients_broadcast_contact', 'broadcast_recipients',
+                    ['broadcast_id', 'contact_id'], unique=True)
+    op.create_index('ix_contacts_workspace_id_id', 'contacts', ['workspace_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_workspace_id_id', table_name='contacts')
+    op.drop_index('uq_broadcast_recipients_broadcast_contact', table_name='broadcast_recipients')
@@ -0,0 +1,42 @@
+"""Deduplicate redelivered webhook messages
+
+Removes the copies stored by earlier redeliveries (the first message of each channel message id
+is kept), then adds the partial unique index that ingest inserts ON CONFLICT DO NOTHING against.
+
+Revision ID: e7bba06ad923
+Revises: 02d8a696d72e
+Create Date: 2026-10-18 01:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7bba06ad923'
+down_revision: Union[str, None] = '02d8a696d72e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM messages m
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY conversation_id, channel_message_id ORDER BY created_at, id
+            ) AS copy
+            FROM messages
+            WHERE channel_message_id IS NOT NULL
+        ) d
+        WHERE m.id = d.id AND d.copy > 1
+    """)
+    op.create_index('uq_messages_conversation_channel_message_id', 'messages',
+                    ['conversation_id', 'channel_message_id'], unique=True,
+                    postgresql_where=sa.text('channel_message_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_messages_conversation_channel_message_id', table_name='messages')
@@ -0,0 +1,69 @@
+"""Conversation list projection for the inbox
+
+Adds the counters and latest-message preview kept on each conversation and backfills them from
+the existing messages, the way services.conversation_projection would have maintained them.
+
+Revision ID: ef1ff07f4ff0
+Revises: f872a08f3767
+Create Date: 2026-10-18 02:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ef1ff07f4ff0'
+down_revision: Union[str, None] = 'f872a08f3767'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+message_role = postgresql.ENUM('USER', 'ASSISTANT', 'SYSTEM', name='messagerole', create_type=False)
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('last_message_preview', sa.String(length=255), nullable=True))
+    op.add_column('conversations', sa.Column('last_message_role', message_role, nullable=True))
+    # Server defaults only fill existing rows; the application sets both on insert
+    op.add_column('conversations', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.alter_column('conversations', 'unread_count', server_default=None)
+    op.alter_column('conversations', 'message_count', server_default=None)
+    op.execute("""
+        UPDATE conversations c
+        SET message_count = m.total, unread_count = m.unread
+        FROM (
+            SELECT conversation_id, count(*) AS total,
+                   count(*) FILTER (WHERE role = 'USER' AND is_read IS FALSE) AS unread
+            FROM messages
+            GROUP BY conversation_id
+        ) m
+        WHERE c.id = m.conversation_id
+    """)
+    # Whitespace collapsed and cut to 140 characters, as in message_preview()
+    op.execute("""
+        UPDATE conversations c
+        SET last_message_preview = CASE WHEN char_length(latest.preview) <= 140 THEN latest.preview
+                                        ELSE left(latest.preview, 139) || '…' END,
+            last_message_role = latest.role
+        FROM (
+            SELECT DISTINCT ON (conversation_id) conversation_id, role,
+                   btrim(regexp_replace(content, '\\s+', ' ', 'g')) AS preview
+            FROM messages
+            ORDER BY conversation_id, created_at DESC, id DESC
+        ) latest
+        WHERE c.id = latest.conversation_id
+    """)
+    op.create_index('ix_messages_conversation_unread', 'messages', ['conversation_id', 'created_at'], unique=False,
+                    postgresql_where=sa.text("NOT is_read AND role = 'USER'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_unread', table_name='messages')
+    op.drop_column('conversations', 'message_count')
+    op.drop_column('conversations', 'unread_count')
+    op.drop_column('conversations', 'last_message_role')
+    op.drop_column('conversations', 'last_message_preview')
@@ -0,0 +1,70 @@
+"""Persisted delivery queue for inbox replies
+
+Adds the outbound_messages jobs table and the delivery status of messages sent to a channel
+(NULL for every existing message).
+
+Revision ID: f872a08f3767
+Revises: 6064914bcaf8
+Create Date: 2026-10-18 02:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f872a08f3767'
+down_revision: Union[str, None] = '6064914bcaf8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+message_status = postgresql.ENUM('PENDING', 'SENT', 'DELIVERED', 'READ', 'FAILED', name='messagestatus',
+                                 create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table('outbound_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('message_id', sa.UUID(), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('workspace_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='outboundstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('lease_owner', sa.String(length=255), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['message_id'], ['messages.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('message_id')
+    )
+    op.create_index('ix_outbound_messages_conversation_open', 'outbound_messages',
+                    ['conversation_id', 'created_at', 'id'], unique=False,
+                    postgresql_where=sa.text("status IN ('PENDING', 'SENDING')"))
+    op.create_index('ix_outbound_messages_due', 'outbound_messages', ['next_attempt_at'], unique=False,
+                    postgresql_where=sa.text("status = 'PENDING'"))
+    op.create_index('ix_outbound_messages_lease', 'outbound_messages', ['lease_expires_at'], unique=False,
+                    postgresql_where=sa.text("status = 'SENDING'"))
+    # add_column does not create the enum type the way create_table does
+    message_status.create(op.get_bind())
+    op.add_column('messages', sa.Column('status', message_status, nullable=True))
+    op.create_index('ix_messages_channel_message_id_outbound', 'messages', ['channel_message_id'], unique=False,
+                    postgresql_where=sa.text('status IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_channel_message_id_outbound', table_name='messages')
+    op.drop_column('messages', 'status')
+    message_status.drop(op.get_bind())
+    op.drop_index('ix_outbound_messages_lease', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_due', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_conversation_open', table_name='outbound_messages')
+    op.drop_table('outbound_messages')
+    op.execute("DROP TYPE IF EXISTS outboundstatus")
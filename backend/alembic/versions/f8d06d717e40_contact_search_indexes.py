@@ -0,0 +1,63 @@
+"""Contact search: generated search columns and their indexes
+
+Installs pg_trgm (trigram operator class) and btree_gin (workspace_id in the GIN indexes), adds
+the generated search_vector / search_text columns and rebuilds the phone_digits index with
+text_pattern_ops so prefix LIKE matches can use it.
+
+Revision ID: f8d06d717e40
+Revises: 41ca90d56654
+Create Date: 2026-10-18 01:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8d06d717e40'
+down_revision: Union[str, None] = '41ca90d56654'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(email, '')), 'C')"
+)
+SEARCH_TEXT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(company, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.add_column('contacts', sa.Column('search_vector', postgresql.TSVECTOR(),
+                                        sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True))
+    op.add_column('contacts', sa.Column('search_text', sa.Text(),
+                                        sa.Computed(SEARCH_TEXT, persisted=True), nullable=True))
+    op.drop_index('ix_contacts_workspace_phone_digits', table_name='contacts')
+    op.create_index('ix_contacts_workspace_phone_digits', 'contacts', ['workspace_id', 'phone_digits'],
+                    unique=False, postgresql_ops={'phone_digits': 'text_pattern_ops'})
+    op.create_index('ix_contacts_workspace_phone_digits_reverse', 'contacts',
+                    ['workspace_id', sa.text('reverse(phone_digits) text_pattern_ops')], unique=False)
+    op.create_index('ix_contacts_workspace_search_vector', 'contacts', ['workspace_id', 'search_vector'],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_contacts_workspace_search_text_trgm', 'contacts', ['workspace_id', 'search_text'],
+                    unique=False, postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    # The extensions stay installed; other objects may depend on them
+    op.drop_index('ix_contacts_workspace_search_text_trgm', table_name='contacts')
+    op.drop_index('ix_contacts_workspace_search_vector', table_name='contacts')
+    op.drop_index('ix_contacts_workspace_phone_digits_reverse', table_name='contacts')
+    op.drop_index('ix_contacts_workspace_phone_digits', table_name='contacts')
+    op.create_index('ix_contacts_workspace_phone_digits', 'contacts', ['workspace_id', 'phone_digits'],
+                    unique=False)
+    op.drop_column('contacts', 'search_text')
+    op.drop_column('contacts', 'search_vector')
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import Keyset, paginate, set_next_cursor
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.automation import Automation, AutomationLog, AutomationStatus
@@ -16,6 +17,8 @@ from app.schemas.automation import (
 
 router = APIRouter()
 
+LOG_KEYSET = Keyset(AutomationLog.started_at, AutomationLog.id)
+
 @router.get("", response_model=List[AutomationResponse])
 async def list_automations(
     x_workspace_id: str = Header(...),
@@ -121,7 +124,9 @@ async def delete_automation(
 @router.get("/{automation_id}/logs", response_model=List[AutomationLogResponse])
 async def get_automation_logs(
     automation_id: str,
+    response: Response,
     x_workspace_id: str = Header(...),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
@@ -138,10 +143,11 @@ async def get_automation_logs(
         raise HTTPException(status_code=404, detail="Automation not found")
     
     result = await db.execute(
-        select(AutomationLog)
-        .where(AutomationLog.automation_id == automation_id)
-        .order_by(desc(AutomationLog.started_at))
-        .offset(skip)
-        .limit(limit)
+        paginate(
+            select(AutomationLog).where(AutomationLog.automation_id == automation_id),
+            LOG_KEYSET, cursor, skip, limit
+        )
     )
-    return result.scalars().all()
+    logs = result.scalars().all()
+    set_next_cursor(response, LOG_KEYSET, logs, limit)
+    return logs
@@ -1,14 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.models.broadcast import Broadcast, BroadcastRecipient, BroadcastStatus
-from app.models.contact import Contact
+from app.models.broadcast import Broadcast, BroadcastStatus
+from app.core.config import settings
+from app.services.broadcast_audience import count_audience, insert_recipients, run_materialize_job
+from app.services.broadcast_dispatcher import broadcast_dispatcher
+from app.services.broadcast_progress import progress_stream
+from app.services.broadcast_scheduler import publish_schedule_change
+from app.services.jobs import create_job
+from app.services.segments import segment_sizes
 from app.schemas.broadcast import (
     BroadcastCreate, 
     BroadcastUpdate, 
@@ -16,13 +23,18 @@ from app.schemas.broadcast import (
     BroadcastSchedule,
     BroadcastStatsResponse
 )
+from app.schemas.segment import AudiencePreviewRequest, AudiencePreviewResponse
 
 router = APIRouter()
 
-async def send_broadcast_messages(broadcast_id: str, db: AsyncSession):
-    """Background task to send broadcast messages"""
-    # TODO: Implement actual message sending via channels
-    pass
+async def send_broadcast_messages(broadcast_id: str, job_id: Optional[str] = None):
+    """Background task to send broadcast messages (opens its own sessions)
+
+    With a job id, recipients are materialized first with progress reported on the job.
+    """
+    if job_id and not await run_materialize_job(broadcast_id, job_id):
+        return
+    await broadcast_dispatcher.dispatch(broadcast_id)
 
 @router.get("", response_model=List[BroadcastResponse])
 async def list_broadcasts(
@@ -56,6 +68,18 @@ async def create_broadcast(
     
     return broadcast
 
+@router.post("/audience/preview", response_model=AudiencePreviewResponse)
+async def preview_audience(
+    preview: AudiencePreviewRequest,
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    count, cached = await segment_sizes.count(
+        db, x_workspace_id, preview.audience_type, preview.audience_filter.model_dump(mode="json")
+    )
+    return AudiencePreviewResponse(count=count, cached=cached)
+
 @router.get("/{broadcast_id}", response_model=BroadcastResponse)
 async def get_broadcast(
     broadcast_id: str,
@@ -126,6 +150,8 @@ async def delete_broadcast(
     
     await db.delete(broadcast)
     await db.commit()
+    if broadcast.status == BroadcastStatus.SCHEDULED:
+        await publish_schedule_change(broadcast.id, None)
     
     return {"message": "Broadcast deleted"}
 
@@ -141,7 +167,7 @@ async def send_broadcast(
         select(Broadcast).where(
             Broadcast.id == broadcast_id,
             Broadcast.workspace_id == x_workspace_id
-        )
+        ).with_for_update()
     )
     broadcast = result.scalar_one_or_none()
     
@@ -151,35 +177,35 @@ async def send_broadcast(
     if broadcast.status not in [BroadcastStatus.DRAFT, BroadcastStatus.SCHEDULED]:
         raise HTTPException(status_code=400, detail="Broadcast already sent or sending")
     
-    # Get recipients based on audience filter
-    contacts_query = select(Contact).where(Contact.workspace_id == x_workspace_id)
-    
-    # Apply audience filter
-    if broadcast.audience_type == "tags" and broadcast.audience_filter.get("tags"):
-        # Filter by tags - this is simplified, actual implementation might be more complex
-        pass
-    
-    contacts_result = await db.execute(contacts_query)
-    contacts = contacts_result.scalars().all()
-    
-    # Create recipients
-    for contact in contacts:
-        recipient = BroadcastRecipient(
-            broadcast_id=broadcast_id,
-            contact_id=contact.id
-        )
-        db.add(recipient)
-    
     broadcast.status = BroadcastStatus.SENDING
-    broadcast.total_recipients = len(contacts)
     broadcast.sent_at = datetime.utcnow()
     
+    # Small audiences are materialized in-request with one INSERT ... SELECT
+    audience_size = await count_audience(db, broadcast)
+    if audience_size <= settings.BROADCAST_INLINE_AUDIENCE_MAX:
+        broadcast.total_recipients = await insert_recipients(db, broadcast)
+        await db.commit()
+        
+        # Start background task to send messages
+        background_tasks.add_task(send_broadcast_messages, broadcast_id)
+        
+        return {
+            "message": f"Sending broadcast to {broadcast.total_recipients} recipients",
+            "total_recipients": broadcast.total_recipients
+        }
+    
+    # Large audiences are materialized by a background job reporting progress
+    broadcast.total_recipients = 0
+    job = await create_job("broadcast_recipients", x_workspace_id, total=audience_size)
     await db.commit()
     
-    # Start background task to send messages
-    background_tasks.add_task(send_broadcast_messages, broadcast_id, db)
+    background_tasks.add_task(send_broadcast_messages, broadcast_id, job.id)
     
-    return {"message": f"Sending broadcast to {len(contacts)} recipients"}
+    return {
+        "message": f"Preparing broadcast for {audience_size} recipients",
+        "total_recipients": audience_size,
+        "job_id": job.id
+    }
 
 @router.post("/{broadcast_id}/schedule")
 async def schedule_broadcast(
@@ -203,10 +229,14 @@ async def schedule_broadcast(
     if schedule_data.scheduled_at <= datetime.utcnow():
         raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
     
+    if broadcast.status not in [BroadcastStatus.DRAFT, BroadcastStatus.SCHEDULED]:
+        raise HTTPException(status_code=400, detail="Broadcast already sent or sending")
+    
     broadcast.status = BroadcastStatus.SCHEDULED
     broadcast.scheduled_at = schedule_data.scheduled_at
     
     await db.commit()
+    await publish_schedule_change(broadcast.id, broadcast.scheduled_at)
     
     return {"message": f"Broadcast scheduled for {schedule_data.scheduled_at}"}
 
@@ -237,3 +267,42 @@ async def get_broadcast_stats(
         open_rate=broadcast.open_rate,
         click_rate=broadcast.click_rate
     )
+
+@router.get("/{broadcast_id}/progress")
+async def stream_broadcast_progress(
+    broadcast_id: str,
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Server-Sent Events stream of live send progress (replaces polling /stats)"""
+    result = await db.execute(
+        select(Broadcast).where(
+            Broadcast.id == broadcast_id,
+            Broadcast.workspace_id == x_workspace_id
+        )
+    )
+    broadcast = result.scalar_one_or_none()
+    
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    
+    async def load_snapshot() -> dict:
+        # Read once the stream is subscribed; the stream itself never touches the database again
+        async with AsyncSessionLocal() as session:
+            current = await session.get(Broadcast, broadcast.id)
+            return {
+                "id": str(current.id),
+                "status": current.status.value,
+                "total_recipients": current.total_recipients or 0,
+                "sent_count": current.sent_count or 0,
+                "delivered_count": current.delivered_count or 0,
+                "read_count": current.read_count or 0,
+                "failed_count": current.failed_count or 0
+            }
+    
+    return StreamingResponse(
+        progress_stream(broadcast.id, load_snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -7,6 +7,7 @@ from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.channel import Channel, ChannelType, ChannelStatus
+from app.services.channel_routes import channel_routes
 
 router = APIRouter()
 
@@ -55,6 +56,7 @@ async def connect_whatsapp(
     )
     db.add(channel)
     await db.commit()
+    await channel_routes.invalidate()
     
     return {"message": "WhatsApp connected successfully", "channel_id": str(channel.id)}
 
@@ -78,6 +80,7 @@ async def connect_instagram(
     )
     db.add(channel)
     await db.commit()
+    await channel_routes.invalidate()
     
     return {"message": "Instagram connected successfully", "channel_id": str(channel.id)}
 
@@ -101,6 +104,7 @@ async def connect_messenger(
     )
     db.add(channel)
     await db.commit()
+    await channel_routes.invalidate()
     
     return {"message": "Messenger connected successfully", "channel_id": str(channel.id)}
 
@@ -124,6 +128,7 @@ async def disconnect_channel(
     
     await db.delete(channel)
     await db.commit()
+    await channel_routes.invalidate()
     
     return {"message": "Channel disconnected"}
 
@@ -147,5 +152,6 @@ async def toggle_channel(
     
     channel.is_active = not channel.is_active
     await db.commit()
+    await channel_routes.invalidate()
     
     return {"message": f"Channel {'activated' if channel.is_active else 'deactivated'}"}
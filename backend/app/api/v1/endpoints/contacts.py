@@ -1,21 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response, UploadFile, File, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select
 from typing import List, Optional
+import asyncio
+import os
+import shutil
+import tempfile
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import Keyset, paginate, set_next_cursor
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.contact import Contact
-from app.schemas.contact import ContactCreate, ContactUpdate, ContactResponse, ContactImportRequest
+from app.schemas.contact import ContactCreate, ContactUpdate, ContactResponse, ContactImportRequest, ContactSuggestion
+from app.services.contact_import import IMPORT_FORMATS, run_contact_import
+from app.services.contact_search import contact_search
+from app.services.jobs import create_job
 
 router = APIRouter()
 
+CONTACT_KEYSET = Keyset(Contact.created_at, Contact.id)
+
 @router.get("", response_model=List[ContactResponse])
 async def list_contacts(
+    response: Response,
     x_workspace_id: str = Header(...),
     search: Optional[str] = None,
     stage: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
@@ -23,25 +36,42 @@ async def list_contacts(
 ):
     query = select(Contact).where(Contact.workspace_id == x_workspace_id)
     
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            or_(
-                Contact.first_name.ilike(search_filter),
-                Contact.last_name.ilike(search_filter),
-                Contact.email.ilike(search_filter),
-                Contact.phone.ilike(search_filter),
-                Contact.company.ilike(search_filter)
-            )
-        )
-    
     if stage:
         query = query.where(Contact.stage == stage)
     
-    query = query.offset(skip).limit(limit)
+    if search:
+        # Search results are ranked by relevance, which has no stable cursor
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not available with search")
+        # Ranked, index-backed match on name/email/company words, substrings and phone digits
+        search_filter, ranking = contact_search(search)
+        query = query.where(search_filter).order_by(*ranking).offset(skip).limit(limit)
+    else:
+        query = paginate(query, CONTACT_KEYSET, cursor, skip, limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    contacts = result.scalars().all()
+    if not search:
+        set_next_cursor(response, CONTACT_KEYSET, contacts, limit)
+    return contacts
+
+@router.get("/autocomplete", response_model=List[ContactSuggestion])
+async def autocomplete_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    x_workspace_id: str = Header(...),
+    limit: int = Query(10, ge=1, le=25),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Contacts whose words start with the typed prefix (or whose phone does), best first"""
+    search_filter, ranking = contact_search(q, autocomplete=True)
+    result = await db.execute(
+        select(Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.phone, Contact.company)
+        .where(Contact.workspace_id == x_workspace_id, search_filter)
+        .order_by(*ranking)
+        .limit(limit)
+    )
+    return result.mappings().all()
 
 @router.post("", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
 async def create_contact(
@@ -150,3 +180,38 @@ async def import_contacts(
     await db.commit()
     
     return {"message": f"Imported {imported_count} contacts"}
+
+def _spool_upload(file: UploadFile) -> str:
+    """Copy the upload to a file that outlives the request; returns its path"""
+    with tempfile.NamedTemporaryFile(prefix="contact-import-", delete=False) as spooled:
+        shutil.copyfileobj(file.file, spooled, 1024 * 1024)
+    return spooled.name
+
+@router.post("/import/stream", status_code=status.HTTP_202_ACCEPTED)
+async def import_contacts_stream(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the file extension"),
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Import a CSV or NDJSON file of any size as a background job
+
+    Rows are deduplicated against existing contacts on whatsapp_id, email and phone: matches
+    fill in the contact's empty fields, everything else is created. Poll GET /jobs/{job_id}
+    for progress, counts and per-row errors.
+    """
+    import_format = (format or os.path.splitext(file.filename or "")[1].lstrip(".")).lower()
+    if import_format == "jsonl":
+        import_format = "ndjson"
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format; use one of {', '.join(IMPORT_FORMATS)}")
+    
+    if file.size is not None and file.size > settings.CONTACT_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Import file is too large")
+    
+    path = await asyncio.to_thread(_spool_upload, file)
+    job = await create_job("contact_import", x_workspace_id, total=os.path.getsize(path))
+    background_tasks.add_task(run_contact_import, job.id, x_workspace_id, path, import_format)
+    
+    return {"message": "Import started", "job_id": job.id}
@@ -1,34 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, func, update
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import Keyset, paginate, set_next_cursor
 from app.core.security import get_current_user
 from app.models.user import User
+from app.models.contact import Contact
 from app.models.conversation import Conversation, Message, ConversationStatus, ChannelType
+from app.services.conversation_projection import apply_new_messages, mark_read
+from app.services.inbox_events import conversation_event, message_event, record_inbox_event
+from app.services.message_history import message_window
+from app.services.outbound_delivery import enqueue_outbound, outbound_delivery
 from app.schemas.conversation import (
     ConversationResponse, 
+    ConversationListItem,
     ConversationUpdate, 
+    ConversationBulkUpdate,
+    ConversationBulkRead,
     MessageCreate, 
     MessageResponse,
+    MessageHistoryResponse,
     ConversationFilter
 )
 
 router = APIRouter()
 
-@router.get("", response_model=List[ConversationResponse])
+CONVERSATION_KEYSET = Keyset(Conversation.last_message_at, Conversation.id)
+
+# Inbox row columns: the conversation's list projection plus its contact's display fields
+LIST_COLUMNS = (
+    Conversation.id,
+    Conversation.contact_id,
+    Conversation.agent_id,
+    Conversation.assigned_user_id,
+    Conversation.channel,
+    Conversation.status,
+    Conversation.subject,
+    Conversation.is_ai_enabled,
+    Conversation.last_message_at,
+    Conversation.last_message_preview,
+    Conversation.last_message_role,
+    Conversation.unread_count,
+    Conversation.message_count,
+    Conversation.created_at,
+    func.coalesce(
+        func.nullif(func.concat_ws(" ", Contact.first_name, Contact.last_name), ""),
+        Contact.phone,
+        Contact.email
+    ).label("contact_name"),
+    Contact.avatar_url.label("contact_avatar_url")
+)
+
+@router.get("", response_model=List[ConversationListItem])
 async def list_conversations(
+    response: Response,
     x_workspace_id: str = Header(...),
     status: Optional[ConversationStatus] = None,
     channel: Optional[ChannelType] = None,
     agent_id: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Conversation).where(Conversation.workspace_id == x_workspace_id)
+    # One query: a keyset walk of the inbox index, each row joined to its contact by primary key
+    query = (
+        select(*LIST_COLUMNS)
+        .outerjoin(Contact, Contact.id == Conversation.contact_id)
+        .where(Conversation.workspace_id == x_workspace_id)
+    )
     
     if status:
         query = query.where(Conversation.status == status)
@@ -37,10 +82,59 @@ async def list_conversations(
     if agent_id:
         query = query.where(Conversation.agent_id == agent_id)
     
-    query = query.order_by(desc(Conversation.last_message_at)).offset(skip).limit(limit)
+    query = paginate(query, CONVERSATION_KEYSET, cursor, skip, limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    rows = result.all()
+    set_next_cursor(response, CONVERSATION_KEYSET, rows, limit)
+    return [dict(row._mapping) for row in rows]
+
+@router.patch("/bulk")
+async def bulk_update_conversations(
+    update_data: ConversationBulkUpdate,
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply one status/assignment/AI change to many conversations with a single UPDATE"""
+    changes = update_data.model_dump(exclude_unset=True, exclude={"conversation_ids"})
+    
+    result = await db.execute(
+        update(Conversation)
+        .where(
+            Conversation.workspace_id == x_workspace_id,
+            Conversation.id.in_(update_data.conversation_ids)
+        )
+        .values(**changes)
+        .returning(Conversation.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.scalars().all()
+    
+    # One event batch for the whole change, published after commit
+    event_changes = update_data.model_dump(mode="json", exclude_unset=True, exclude={"conversation_ids"})
+    for conversation_id in updated:
+        record_inbox_event(db, x_workspace_id, conversation_event(conversation_id, **event_changes))
+    
+    await db.commit()
+    
+    return {"updated": len(updated), "conversation_ids": updated}
+
+@router.post("/bulk/read")
+async def bulk_mark_read(
+    read_data: ConversationBulkRead,
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark the contact's messages of many conversations read, optionally only up to a time"""
+    unread = await mark_read(db, x_workspace_id, read_data.conversation_ids, up_to=read_data.up_to)
+    for conversation_id, unread_count in unread.items():
+        record_inbox_event(db, x_workspace_id, conversation_event(conversation_id, unread_count=unread_count))
+    
+    await db.commit()
+    
+    return {"updated": len(unread), "unread_counts": {str(conversation_id): count for conversation_id, count in unread.items()}}
 
 @router.get("/{conversation_id}", response_model=ConversationResponse)
 async def get_conversation(
@@ -60,15 +154,55 @@ async def get_conversation(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    # Load messages
-    messages_result = await db.execute(
-        select(Message)
-        .where(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at)
+    # Only the latest window; the client pages further back through /messages?before=
+    messages, has_more = await message_window(db, conversation_id, settings.CONVERSATION_MESSAGE_WINDOW)
+    set_committed_value(conversation, "messages", messages)
+    
+    response = ConversationResponse.model_validate(conversation)
+    response.has_more_messages = has_more
+    return response
+
+@router.get("/{conversation_id}/messages", response_model=MessageHistoryResponse)
+async def get_conversation_messages(
+    conversation_id: str,
+    before: Optional[str] = Query(None, description="Message id; return the messages just older than it"),
+    after: Optional[str] = Query(None, description="Message id; return the messages just newer than it"),
+    limit: int = Query(50, ge=1, le=200),
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Message history in windows around a message; without before/after, the latest window"""
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    
+    result = await db.execute(
+        select(Conversation.id).where(
+            Conversation.id == conversation_id,
+            Conversation.workspace_id == x_workspace_id
+        )
     )
-    conversation.messages = messages_result.scalars().all()
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
     
-    return conversation
+    anchor = None
+    if before or after:
+        result = await db.execute(
+            select(Message).where(
+                Message.id == (before or after),
+                Message.conversation_id == conversation_id
+            )
+        )
+        anchor = result.scalar_one_or_none()
+        if anchor is None:
+            raise HTTPException(status_code=404, detail="Message not found")
+    
+    if after:
+        messages, has_more = await message_window(db, conversation_id, limit, after=anchor)
+        return {"messages": messages, "has_more_before": True, "has_more_after": has_more}
+    
+    messages, has_more = await message_window(db, conversation_id, limit, before=anchor)
+    return {"messages": messages, "has_more_before": has_more, "has_more_after": anchor is not None}
 
 @router.put("/{conversation_id}", response_model=ConversationResponse)
 async def update_conversation(
@@ -91,6 +225,9 @@ async def update_conversation(
     
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(conversation, field, value)
+    record_inbox_event(db, x_workspace_id, conversation_event(
+        conversation_id, **update_data.model_dump(mode="json", exclude_unset=True)
+    ))
     
     await db.commit()
     await db.refresh(conversation)
@@ -123,14 +260,18 @@ async def send_message(
     )
     db.add(message)
     
-    # Update conversation last message time
-    from datetime import datetime
-    conversation.last_message_at = datetime.utcnow()
+    # Flushed first so the projection, the delivery job and the event see the message's id and time
+    await db.flush()
+    await apply_new_messages(db, [message])
+    queued = enqueue_outbound(db, conversation, message)
+    record_inbox_event(db, x_workspace_id, message_event(message))
     
     await db.commit()
     await db.refresh(message)
     
-    # TODO: Send message to channel (WhatsApp, Instagram, etc.)
+    # Delivered to the channel in the background; status updates follow over the inbox socket
+    if queued:
+        outbound_delivery.wake()
     
     return message
 
@@ -158,7 +299,55 @@ async def assign_conversation(
         conversation.assigned_user_id = user_id
     if agent_id:
         conversation.agent_id = agent_id
+    record_inbox_event(db, x_workspace_id, conversation_event(
+        conversation_id,
+        assigned_user_id=str(conversation.assigned_user_id) if conversation.assigned_user_id else None,
+        agent_id=str(conversation.agent_id) if conversation.agent_id else None
+    ))
     
     await db.commit()
     
     return {"message": "Conversation assigned"}
+
+@router.post("/{conversation_id}/read")
+async def mark_conversation_read(
+    conversation_id: str,
+    up_to: Optional[str] = Query(None, description="Message id; mark it and every older message read"),
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(Conversation.id, Conversation.unread_count).where(
+            Conversation.id == conversation_id,
+            Conversation.workspace_id == x_workspace_id
+        )
+    )
+    conversation = result.first()
+    
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    anchor = None
+    if up_to:
+        result = await db.execute(
+            select(Message.created_at, Message.id).where(
+                Message.id == up_to,
+                Message.conversation_id == conversation.id
+            )
+        )
+        anchor = result.first()
+        if anchor is None:
+            raise HTTPException(status_code=404, detail="Message not found")
+    
+    unread = await mark_read(
+        db, x_workspace_id, [conversation.id],
+        up_to=anchor.created_at if anchor else None,
+        up_to_id=anchor.id if anchor else None
+    )
+    if conversation.id in unread:
+        record_inbox_event(db, x_workspace_id, conversation_event(conversation.id, unread_count=unread[conversation.id]))
+    
+    await db.commit()
+    
+    return {"unread_count": unread.get(conversation.id, conversation.unread_count)}
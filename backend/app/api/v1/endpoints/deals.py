@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import Keyset, paginate, set_next_cursor
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.deal import Deal, DealStage
@@ -12,10 +13,14 @@ from app.schemas.deal import DealCreate, DealUpdate, DealResponse
 
 router = APIRouter()
 
+DEAL_KEYSET = Keyset(Deal.created_at, Deal.id)
+
 @router.get("", response_model=List[DealResponse])
 async def list_deals(
+    response: Response,
     x_workspace_id: str = Header(...),
     stage: Optional[DealStage] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
@@ -26,10 +31,12 @@ async def list_deals(
     if stage:
         query = query.where(Deal.stage == stage)
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, DEAL_KEYSET, cursor, skip, limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    deals = result.scalars().all()
+    set_next_cursor(response, DEAL_KEYSET, deals, limit)
+    return deals
 
 @router.post("", response_model=DealResponse, status_code=status.HTTP_201_CREATED)
 async def create_deal(
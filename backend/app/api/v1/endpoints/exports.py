@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+
+from app.core.security import get_current_user
+from app.models.user import User
+from app.services.exports import EXPORT_FORMATS, EXPORTS, create_encoder, export_query, stream_export
+
+router = APIRouter()
+
+@router.get("/{entity}")
+async def export_entity(
+    entity: str,
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every contact, deal or conversation message of the workspace as one file
+
+    Rows come from a server-side cursor and are encoded batch by batch, so exports of any size
+    run in constant memory. `conversations` yields one row per message with its conversation.
+    """
+    if entity not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export; use one of {', '.join(EXPORTS)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format; use one of {', '.join(EXPORT_FORMATS)}")
+    
+    query = export_query(entity, x_workspace_id)
+    try:
+        encoder = create_encoder(format, query)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"{entity}-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    return StreamingResponse(
+        stream_export(query, encoder),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
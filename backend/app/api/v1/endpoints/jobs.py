@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException, Header
+
+from app.core.security import get_current_user
+from app.models.user import User
+from app.services.jobs import job_store
+
+router = APIRouter()
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    x_workspace_id: str = Header(...),
+    current_user: User = Depends(get_current_user)
+):
+    job = await job_store.get(job_id)
+
+    if not job or job.workspace_id != x_workspace_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
@@ -0,0 +1,65 @@
+import uuid
+
+from fastapi import APIRouter, WebSocket, Query, status
+from sqlalchemy import select, or_, exists
+from typing import Optional
+
+from app.core.database import AsyncSessionLocal
+from app.core.security import decode_access_token
+from app.models.user import User
+from app.models.workspace import Workspace, WorkspaceMember
+from app.services.inbox_gateway import inbox_gateway
+
+router = APIRouter()
+
+async def _authorize(token: Optional[str], workspace_id: str) -> Optional[str]:
+    """User id if the token is a valid access token of an active member of the workspace"""
+    user_id = decode_access_token(token) if token else None
+    if user_id is None:
+        return None
+    
+    # Short-lived session: a socket must not hold a pooled connection for its lifetime
+    async with AsyncSessionLocal() as db:
+        member = exists().where(
+            WorkspaceMember.workspace_id == Workspace.id,
+            WorkspaceMember.user_id == User.id
+        )
+        result = await db.execute(
+            select(User.id).where(
+                User.id == user_id,
+                User.is_active.is_(True),
+                Workspace.id == workspace_id,
+                or_(Workspace.owner_id == User.id, member)
+            )
+        )
+        return user_id if result.scalar_one_or_none() else None
+
+@router.websocket("/inbox")
+async def inbox_socket(
+    websocket: WebSocket,
+    workspace_id: str = Query(...),
+    token: Optional[str] = Query(None, description="Access token, for clients that can't set headers")
+):
+    """Realtime inbox events of a workspace: new messages, conversation updates and typing
+
+    Authenticate with the usual access token, as `Authorization: Bearer` or `?token=`. Server
+    frames are `{"events": [...]}`; clients may send `{"type": "typing", "conversation_id": ...,
+    "is_typing": bool}` and `{"type": "ping"}`.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if not token and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    
+    try:
+        # Canonical form: events are published under str(UUID)
+        workspace_id = str(uuid.UUID(workspace_id))
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_id = await _authorize(token, workspace_id)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    await inbox_gateway.serve(websocket, workspace_id, str(user_id))
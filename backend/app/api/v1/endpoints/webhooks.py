@@ -1,19 +1,22 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 import hashlib
 import hmac
+import logging
+import orjson
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.models.channel import Channel
-from app.models.conversation import Conversation, Message, ChannelType, ConversationStatus, MessageRole
-from app.models.contact import Contact
+from app.core.metrics import metrics
+from app.services.message_ingest import ingest_webhook
+from app.services.webhook_queue import webhook_queue
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-def verify_whatsapp_signature(payload: bytes, signature: str) -> bool:
-    """Verify WhatsApp webhook signature"""
+def verify_meta_signature(payload: bytes, signature: str) -> bool:
+    """Verify Meta (WhatsApp, Instagram, Messenger) webhook signature"""
     if not settings.META_APP_SECRET:
         return False
     
@@ -25,6 +28,51 @@ def verify_whatsapp_signature(payload: bytes, signature: str) -> bool:
     
     return hmac.compare_digest(f"sha256={expected_signature}", signature)
 
+async def webhook_body(request: Request) -> bytes:
+    """Read the raw webhook body once and verify the signature over that same buffer"""
+    payload = await request.body()
+    
+    # Without the app secret nothing can be verified: fail closed unless explicitly in development
+    if not settings.META_APP_SECRET:
+        if not settings.WEBHOOK_ALLOW_UNSIGNED:
+            logger.error("Rejected a webhook: META_APP_SECRET is not set (WEBHOOK_ALLOW_UNSIGNED is for local development)")
+            metrics.incr("webhooks.unverifiable")
+            raise HTTPException(status_code=403, detail="Webhook signature verification is not configured")
+        logger.warning("Accepting an unsigned webhook: META_APP_SECRET is not set and WEBHOOK_ALLOW_UNSIGNED is on")
+        return payload
+    
+    signature = request.headers.get("X-Hub-Signature-256", "")
+    if not verify_meta_signature(payload, signature):
+        metrics.incr("webhooks.invalid_signature")
+        raise HTTPException(status_code=403, detail="Invalid signature")
+    
+    return payload
+
+def parse_webhook_body(payload: bytes) -> dict:
+    """Decode a verified webhook body"""
+    try:
+        data = orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    return data
+
+async def handle_webhook(channel: str, payload: bytes, db: AsyncSession) -> dict:
+    """Shared ingest path of the channel webhooks"""
+    if settings.WEBHOOK_ASYNC_INGEST:
+        # Durable mode: enqueue the raw verified payload and ack before any DB work
+        await webhook_queue.enqueue(channel, payload)
+        metrics.incr("webhook_queue.enqueued")
+        return {"status": "ok"}
+    
+    data = parse_webhook_body(payload)
+    if "entry" in data:
+        await ingest_webhook(channel, data, db)
+    
+    return {"status": "ok"}
+
 @router.get("/whatsapp")
 async def verify_whatsapp_webhook(
     hub_mode: str = None,
@@ -41,107 +89,11 @@ async def verify_whatsapp_webhook(
 
 @router.post("/whatsapp")
 async def whatsapp_webhook(
-    request: Request,
+    payload: bytes = Depends(webhook_body),
     db: AsyncSession = Depends(get_db)
 ):
     """Handle incoming WhatsApp messages"""
-    payload = await request.body()
-    signature = request.headers.get("X-Hub-Signature-256", "")
-    
-    # Verify signature in production
-    # if not verify_whatsapp_signature(payload, signature):
-    #     raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    data = await request.json()
-    
-    # Process WhatsApp message
-    if "entry" in data:
-        for entry in data["entry"]:
-            for change in entry.get("changes", []):
-                if change.get("field") == "messages":
-                    value = change.get("value", {})
-                    messages = value.get("messages", [])
-                    
-                    for message in messages:
-                        await process_whatsapp_message(message, value, db)
-    
-    return {"status": "ok"}
-
-async def process_whatsapp_message(message: dict, value: dict, db: AsyncSession):
-    """Process incoming WhatsApp message"""
-    phone_number_id = value.get("metadata", {}).get("phone_number_id")
-    from_number = message.get("from")
-    message_text = message.get("text", {}).get("body", "")
-    message_id = message.get("id")
-    
-    # Find channel
-    result = await db.execute(
-        select(Channel).where(
-            Channel.external_id == phone_number_id,
-            Channel.channel_type == ChannelType.WHATSAPP
-        )
-    )
-    channel = result.scalar_one_or_none()
-    
-    if not channel:
-        return
-    
-    # Find or create contact
-    result = await db.execute(
-        select(Contact).where(
-            Contact.workspace_id == channel.workspace_id,
-            Contact.whatsapp_id == from_number
-        )
-    )
-    contact = result.scalar_one_or_none()
-    
-    if not contact:
-        contact = Contact(
-            workspace_id=channel.workspace_id,
-            whatsapp_id=from_number,
-            phone=from_number
-        )
-        db.add(contact)
-        await db.flush()
-    
-    # Find or create conversation
-    result = await db.execute(
-        select(Conversation).where(
-            Conversation.workspace_id == channel.workspace_id,
-            Conversation.contact_id == contact.id,
-            Conversation.channel == ChannelType.WHATSAPP,
-            Conversation.status.in_([ConversationStatus.ACTIVE, ConversationStatus.PENDING])
-        )
-    )
-    conversation = result.scalar_one_or_none()
-    
-    if not conversation:
-        conversation = Conversation(
-            workspace_id=channel.workspace_id,
-            contact_id=contact.id,
-            channel=ChannelType.WHATSAPP,
-            channel_conversation_id=from_number,
-            status=ConversationStatus.ACTIVE
-        )
-        db.add(conversation)
-        await db.flush()
-    
-    # Create message
-    new_message = Message(
-        conversation_id=conversation.id,
-        role=MessageRole.USER,
-        content=message_text,
-        channel_message_id=message_id
-    )
-    db.add(new_message)
-    
-    # Update conversation
-    from datetime import datetime
-    conversation.last_message_at = datetime.utcnow()
-    
-    await db.commit()
-    
-    # TODO: Trigger AI response if enabled
+    return await handle_webhook("whatsapp", payload, db)
 
 @router.get("/instagram")
 async def verify_instagram_webhook(
@@ -159,15 +111,11 @@ async def verify_instagram_webhook(
 
 @router.post("/instagram")
 async def instagram_webhook(
-    request: Request,
+    payload: bytes = Depends(webhook_body),
     db: AsyncSession = Depends(get_db)
 ):
     """Handle incoming Instagram messages"""
-    data = await request.json()
-    
-    # TODO: Process Instagram message similar to WhatsApp
-    
-    return {"status": "ok"}
+    return await handle_webhook("instagram", payload, db)
 
 @router.get("/messenger")
 async def verify_messenger_webhook(
@@ -185,12 +133,8 @@ async def verify_messenger_webhook(
 
 @router.post("/messenger")
 async def messenger_webhook(
-    request: Request,
+    payload: bytes = Depends(webhook_body),
     db: AsyncSession = Depends(get_db)
 ):
     """Handle incoming Messenger messages"""
-    data = await request.json()
-    
-    # TODO: Process Messenger message similar to WhatsApp
-    
-    return {"status": "ok"}
+    return await handle_webhook("messenger", payload, db)
@@ -17,7 +17,10 @@ from app.api.v1.endpoints import (
     settings,
     channels,
     chat,
-    webhooks
+    webhooks,
+    jobs,
+    exports,
+    realtime
 )
 
 api_router = APIRouter()
@@ -39,3 +42,6 @@ api_router.include_router(settings.router, prefix="/settings", tags=["Settings"]
 api_router.include_router(channels.router, prefix="/channels", tags=["Channels"])
 api_router.include_router(chat.router, prefix="/chat", tags=["AI Chat"])
 api_router.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+api_router.include_router(exports.router, prefix="/exports", tags=["Exports"])
+api_router.include_router(realtime.router, prefix="/realtime", tags=["Realtime"])
@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_MAX_CONNECTIONS: int = 100
+    EVENTS_BACKEND: str = "redis"  # redis, memory (single process only)
     
     # JWT
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-change-in-production")
@@ -46,6 +48,92 @@ class Settings(BaseSettings):
     # Meta (Instagram/Messenger)
     META_APP_SECRET: str = os.getenv("META_APP_SECRET", "")
     META_ACCESS_TOKEN: str = os.getenv("META_ACCESS_TOKEN", "")
+    WEBHOOK_ALLOW_UNSIGNED: bool = False  # Local development only: accept webhooks when META_APP_SECRET is unset
+    GRAPH_API_BASE_URL: str = "https://graph.facebook.com/v18.0"  # Point at app.scripts.fake_graph_api for local load tests
+    
+    # Outbound HTTP client (shared pool for channel APIs)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 100
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 15.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_POOL_TIMEOUT: float = 10.0
+    
+    # Inbound webhook queue
+    WEBHOOK_ASYNC_INGEST: bool = False  # Ack immediately and ingest from the queue
+    WEBHOOK_QUEUE_BACKEND: str = "redis"  # redis, memory
+    WEBHOOK_STREAM_KEY: str = "webhooks:inbound"
+    WEBHOOK_DEAD_LETTER_KEY: str = "webhooks:dead"
+    WEBHOOK_CONSUMER_GROUP: str = "ingest"
+    WEBHOOK_CONSUMER_NAME: str = ""  # Unique per process and stable across restarts; defaults to host-pid
+    WEBHOOK_STREAM_MAXLEN: int = 1000000
+    WEBHOOK_CONSUMERS: int = 4
+    WEBHOOK_BATCH_SIZE: int = 100
+    WEBHOOK_BATCH_BLOCK_MS: int = 50
+    WEBHOOK_BATCH_WINDOW_MS: int = 0  # Coalesce inline deliveries within this window (0 disables)
+    WEBHOOK_CLAIM_IDLE_MS: int = 60000
+    WEBHOOK_MAX_DELIVERIES: int = 5
+    CHANNEL_ROUTES_TTL: int = 300
+    DEDUP_BACKEND: str = "redis"  # redis, memory
+    DEDUP_TTL_SECONDS: int = 86400
+    STATUS_RETRY_INTERVAL_MS: int = 1000
+    STATUS_RETRY_MAX_AGE_SECONDS: int = 120
+    STATUS_RETRY_MAX_EVENTS: int = 100000
+    CHANNEL_ROUTES_MISS_TTL: int = 30
+    
+    # Broadcast dispatch
+    BROADCAST_BATCH_SIZE: int = 500
+    BROADCAST_CONCURRENCY: int = 50
+    BROADCAST_DEFAULT_MPS: float = 80.0  # WhatsApp Cloud API default throughput per phone number
+    BROADCAST_SEND_ATTEMPTS: int = 4
+    BROADCAST_RETRY_BASE_MS: int = 250
+    BROADCAST_RETRY_MAX_MS: int = 8000
+    BROADCAST_INLINE_AUDIENCE_MAX: int = 5000  # Larger audiences are materialized by a background job
+    BROADCAST_MATERIALIZE_CHUNK: int = 50000
+    SEGMENT_COUNT_TTL: int = 60
+    BROADCAST_RANGE_SIZE: int = 5000  # Recipients per leased checkpoint range
+    BROADCAST_LEASE_SECONDS: int = 120
+    BROADCAST_PROGRESS_INTERVAL_MS: int = 250  # Max progress updates per broadcast: 4/s
+    BROADCAST_PROGRESS_KEEPALIVE_SECONDS: int = 15
+    
+    # Broadcast scheduler (python -m app.scheduler)
+    SCHEDULER_TICK_MS: int = 100
+    SCHEDULER_POLL_SECONDS: int = 30
+    SCHEDULER_LOOKAHEAD_SECONDS: int = 900
+    SCHEDULER_CLAIM_BATCH: int = 500
+    SCHEDULER_MAX_CONCURRENT_SENDS: int = 8
+    SCHEDULER_REPORT_SECONDS: int = 60
+    SCHEDULER_RESUME_SECONDS: int = 30
+    
+    # Contact import
+    CONTACT_IMPORT_CHUNK: int = 20000  # Rows per COPY + merge transaction
+    CONTACT_IMPORT_MAX_BYTES: int = 1024 * 1024 * 1024
+    
+    # Conversations
+    CONVERSATION_MESSAGE_WINDOW: int = 50  # Latest messages returned with a conversation
+    
+    # Outbound delivery of inbox messages
+    OUTBOUND_WORKERS: int = 4
+    OUTBOUND_BATCH_SIZE: int = 50  # Jobs claimed per worker round, at most one per conversation
+    OUTBOUND_POLL_MS: int = 500  # Idle poll for jobs enqueued by other processes
+    OUTBOUND_MAX_ATTEMPTS: int = 6
+    OUTBOUND_RETRY_BASE_MS: int = 1000
+    OUTBOUND_RETRY_MAX_MS: int = 60000
+    OUTBOUND_LEASE_SECONDS: int = 60
+    
+    # Realtime inbox WebSockets
+    WS_SEND_QUEUE_SIZE: int = 256  # Frames buffered per socket before it is evicted as a slow consumer
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    WS_TYPING_INTERVAL_SECONDS: float = 1.0
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 5000  # Rows per server-side cursor fetch
+    
+    # Background jobs
+    JOBS_BACKEND: str = "redis"  # redis, memory
+    JOB_TTL_SECONDS: int = 86400
+    JOB_MAX_ERRORS: int = 1000
     
     class Config:
         env_file = ".env"
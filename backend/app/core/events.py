@@ -0,0 +1,83 @@
+import asyncio
+import fnmatch
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Set, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+
+logger = logging.getLogger(__name__)
+
+def encode_event(message: dict) -> bytes:
+    return orjson.dumps(message, default=str)
+
+def decode_event(data: bytes) -> dict:
+    return orjson.loads(data)
+
+class RedisEventBus:
+    """Cross-worker publish/subscribe over Redis pub/sub"""
+
+    async def publish(self, topic: str, message: dict):
+        await redis_manager.client.publish(topic, encode_event(message))
+
+    @asynccontextmanager
+    async def subscribe(self, *topics: str) -> AsyncIterator[AsyncIterator[Tuple[str, dict]]]:
+        """Subscribe to topics (glob patterns allowed) and yield an iterator of (topic, message)"""
+        pubsub = redis_manager.client.pubsub(ignore_subscribe_messages=True)
+        patterns = [topic for topic in topics if any(c in topic for c in "*?[")]
+        channels = [topic for topic in topics if topic not in patterns]
+        if channels:
+            await pubsub.subscribe(*channels)
+        if patterns:
+            await pubsub.psubscribe(*patterns)
+
+        async def iterate():
+            async for raw in pubsub.listen():
+                try:
+                    yield raw["channel"].decode(), decode_event(raw["data"])
+                except ValueError:
+                    logger.warning("Dropping undecodable event on %s", raw["channel"])
+
+        try:
+            yield iterate()
+        finally:
+            await pubsub.aclose()
+
+class InMemoryEventBus:
+    """Single-process bus with the same interface, used in tests and local development"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def publish(self, topic: str, message: dict):
+        data = encode_event(message)
+        for pattern, queues in list(self._subscribers.items()):
+            if fnmatch.fnmatchcase(topic, pattern):
+                for queue in queues:
+                    queue.put_nowait((topic, decode_event(data)))
+
+    @asynccontextmanager
+    async def subscribe(self, *topics: str) -> AsyncIterator[AsyncIterator[Tuple[str, dict]]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        for topic in topics:
+            self._subscribers.setdefault(topic, set()).add(queue)
+
+        async def iterate():
+            while True:
+                yield await queue.get()
+
+        try:
+            yield iterate()
+        finally:
+            for topic in topics:
+                self._subscribers.get(topic, set()).discard(queue)
+
+def create_event_bus():
+    if settings.EVENTS_BACKEND == "memory":
+        return InMemoryEventBus()
+    return RedisEventBus()
+
+event_bus = create_event_bus()
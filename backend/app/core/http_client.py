@@ -0,0 +1,50 @@
+import httpx
+from typing import Optional
+
+from app.core.config import settings
+
+class HTTPClientManager:
+    """Owns the app-lifetime pooled HTTP client used for outbound API calls"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        # httpx pools per origin; the limits below effectively apply per host since
+        # nearly all outbound traffic goes to graph.facebook.com
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            settings.HTTP_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT
+        )
+        return httpx.AsyncClient(
+            http2=settings.HTTP2_ENABLED,
+            limits=limits,
+            timeout=timeout
+        )
+
+    async def startup(self):
+        """Create the shared client (called from the app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def shutdown(self):
+        """Close the shared client and drain pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Lazily create the client for processes that don't run the FastAPI lifespan
+        # (workers, scripts) so callers never fall back to per-request clients
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+http_client = HTTPClientManager()
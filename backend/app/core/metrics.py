@@ -0,0 +1,61 @@
+from collections import defaultdict, deque
+from typing import Deque, Dict
+import time
+
+class Histogram:
+    """Fixed-size reservoir of recent observations for percentile reporting"""
+
+    def __init__(self, size: int = 2048):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": max(self.samples) if self.samples else 0.0
+        }
+
+class Metrics:
+    """Process-local counters, gauges and histograms exposed on /metrics"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = defaultdict(Histogram)
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        self.histograms[name].observe(value)
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "histograms": {name: hist.snapshot() for name, hist in self.histograms.items()}
+        }
+
+metrics = Metrics()
@@ -0,0 +1,61 @@
+import base64
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql import Select
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+@dataclass(frozen=True)
+class Keyset:
+    """Newest-first order on a nullable timestamp column, with the primary key as tiebreaker
+
+    Rows sort by (sort DESC NULLS FIRST, id DESC), which is exactly a backward scan of a plain
+    (..., sort, id) btree index. A cursor is the (sort, id) of the last row served; the next
+    page is every row after it, so pages never repeat or skip rows however deep they go.
+    """
+    sort: object
+    id: object
+
+    def order_by(self) -> list:
+        return [self.sort.desc().nulls_first(), self.id.desc()]
+
+    def after(self, sort_value: Optional[datetime], id_value: uuid.UUID):
+        if sort_value is None:
+            # Still among the rows without a sort value; every row with one comes later
+            return or_(and_(self.sort.is_(None), self.id < id_value), self.sort.isnot(None))
+        # Row comparison is a single index condition; NULL sort values compare as NULL and drop out
+        return tuple_(self.sort, self.id) < (sort_value, id_value)
+
+    def cursor_for(self, row) -> str:
+        sort_value = getattr(row, self.sort.key)
+        payload = [sort_value.isoformat() if sort_value is not None else None, str(getattr(row, self.id.key))]
+        return base64.urlsafe_b64encode(orjson.dumps(payload)).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        sort_value, id_value = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (
+            datetime.fromisoformat(sort_value) if sort_value is not None else None,
+            uuid.UUID(id_value)
+        )
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query: Select, keyset: Keyset, cursor: Optional[str], skip: int, limit: int) -> Select:
+    """Order the query by the keyset and select one page, by cursor if given, else by offset"""
+    query = query.order_by(*keyset.order_by()).limit(limit)
+    if cursor:
+        return query.where(keyset.after(*decode_cursor(cursor)))
+    return query.offset(skip)
+
+def set_next_cursor(response: Response, keyset: Keyset, rows: Sequence, limit: int):
+    """Point the client at the page after `rows`; a short page is the last one"""
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = keyset.cursor_for(rows[-1])
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from typing import Dict, Hashable, Optional
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`
+
+    Waiters are served in FIFO order, so a slow refill never starves earlier callers.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Drain the bucket so no token is available for `seconds` (upstream throttling)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+class RateLimiterRegistry:
+    """Process-local token buckets keyed by sender (e.g. a WhatsApp phone number id)"""
+
+    def __init__(self):
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def get(self, key: Hashable, rate: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.rate != rate:
+            bucket = TokenBucket(rate)
+            self._buckets[key] = bucket
+        return bucket
+
+rate_limiters = RateLimiterRegistry()
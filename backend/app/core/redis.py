@@ -0,0 +1,28 @@
+import redis.asyncio as redis
+from typing import Optional
+
+from app.core.config import settings
+
+class RedisManager:
+    """Owns the app-lifetime Redis connection pool"""
+
+    def __init__(self):
+        self._client: Optional[redis.Redis] = None
+
+    async def startup(self):
+        if self._client is None:
+            self._client = redis.from_url(settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS)
+
+    async def shutdown(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> redis.Redis:
+        # Lazily connect for workers and scripts that don't run the app lifespan
+        if self._client is None:
+            self._client = redis.from_url(settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS)
+        return self._client
+
+redis_manager = RedisManager()
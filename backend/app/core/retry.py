@@ -0,0 +1,38 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2 ** attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+async def retry_async(
+    operation: Callable[[], Awaitable[T]],
+    *,
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    should_retry: Callable[[Exception], bool],
+    retry_after: Optional[Callable[[Exception], Optional[float]]] = None,
+    on_retry: Optional[Callable[[int, Exception], None]] = None
+) -> T:
+    """Run operation, retrying errors accepted by should_retry with jittered backoff
+
+    retry_after may return a server-provided minimum delay (e.g. a Retry-After header).
+    The last error is re-raised once attempts are exhausted.
+    """
+    for attempt in range(attempts):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt + 1 >= attempts or not should_retry(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            if retry_after:
+                delay = max(delay, min(retry_after(e) or 0, max_delay))
+            if on_retry:
+                on_retry(attempt + 1, e)
+            await asyncio.sleep(delay)
+    raise RuntimeError("retry_async called with attempts < 1")
@@ -0,0 +1,89 @@
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class HierarchicalTimerWheel:
+    """Hashed hierarchical timer wheel keyed by arbitrary hashable ids
+
+    Level 0 has `slots` buckets of one tick each; every level above covers `slots` buckets of the
+    level below. Timers land in the lowest level whose window still contains them and cascade
+    down one level each time the wheel enters their bucket, so add, cancel and advance are O(1)
+    per timer regardless of how many are pending. Timers past the top level wait in an overflow
+    map until the top level's window reaches them.
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 64, levels: int = 4, start: float = 0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current = int(start // tick)  # Current tick number
+        self._wheels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow: Dict[Hashable, int] = {}
+        self._positions: Dict[Hashable, Optional[Tuple[int, int]]] = {}  # key -> (level, slot), None = overflow
+        self._expired: List[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def _place(self, key: Hashable, due_tick: int):
+        if due_tick <= self.current:
+            self._expired.append(key)
+            return
+
+        for level in range(self.levels):
+            span = self.slots ** level
+            # Within this level's window: fewer than `slots` buckets ahead of the current one
+            if due_tick // span - self.current // span < self.slots:
+                slot = (due_tick // span) % self.slots
+                self._wheels[level][slot][key] = due_tick
+                self._positions[key] = (level, slot)
+                return
+
+        self._overflow[key] = due_tick
+        self._positions[key] = None
+
+    def add(self, key: Hashable, due: float):
+        """Schedule (or reschedule) key to fire at timestamp `due` (never earlier)"""
+        self.cancel(key)
+        self._place(key, math.ceil(due / self.tick))
+
+    def cancel(self, key: Hashable) -> bool:
+        if key not in self._positions:
+            return False
+        position = self._positions.pop(key)
+        if position is None:
+            self._overflow.pop(key, None)
+        else:
+            level, slot = position
+            self._wheels[level][slot].pop(key, None)
+        return True
+
+    def _cascade(self, level: int):
+        slot = (self.current // self.slots ** level) % self.slots
+        bucket, self._wheels[level][slot] = self._wheels[level][slot], {}
+        for key, due_tick in bucket.items():
+            del self._positions[key]
+            self._place(key, due_tick)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel to timestamp `now` and return every key that came due"""
+        target = int(now // self.tick)
+        while self.current < target:
+            self.current += 1
+            if self._overflow and self.current % self.slots ** self.levels == 0:
+                overflow, self._overflow = self._overflow, {}
+                for key, due_tick in overflow.items():
+                    del self._positions[key]
+                    self._place(key, due_tick)
+            # Higher levels first so their timers can land in this tick's level-0 bucket
+            for level in range(self.levels - 1, 0, -1):
+                if self.current % self.slots ** level == 0:
+                    self._cascade(level)
+            self._cascade(0)
+
+        expired, self._expired = self._expired, []
+        for key in expired:
+            self._positions.pop(key, None)
+        return expired
@@ -3,16 +3,35 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine
+from app.core.http_client import http_client
+from app.core.metrics import metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.redis import redis_manager
+from app.services.channel_routes import channel_routes
+from app.services.inbox_gateway import inbox_gateway
+from app.services.outbound_delivery import outbound_delivery
+from app.services.webhook_queue import webhook_consumers
 from app.api.v1.router import api_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup (the schema is managed by Alembic migrations)
+    await http_client.startup()
+    await redis_manager.startup()
+    await channel_routes.start()
+    await inbox_gateway.start()
+    await outbound_delivery.start()
+    if settings.WEBHOOK_ASYNC_INGEST:
+        await webhook_consumers.start()
     yield
     # Shutdown
+    await outbound_delivery.stop()
+    await inbox_gateway.stop()
+    await webhook_consumers.stop()
+    await channel_routes.stop()
+    await redis_manager.shutdown()
+    await http_client.shutdown()
     await engine.dispose()
 
 app = FastAPI(
@@ -29,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include API routes
@@ -37,3 +57,9 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "ReficulBot API"}
+
+@app.get("/metrics")
+async def get_metrics():
+    if settings.WEBHOOK_ASYNC_INGEST:
+        await webhook_consumers.collect_metrics()
+    return metrics.snapshot()
@@ -1,12 +1,12 @@
 from app.models.user import User, UserRole
 from app.models.workspace import Workspace, WorkspaceMember
 from app.models.agent import Agent, AgentKnowledge
-from app.models.conversation import Conversation, Message
+from app.models.conversation import Conversation, Message, OutboundMessage
 from app.models.contact import Contact
 from app.models.deal import Deal
 from app.models.flow import Flow, FlowNode
 from app.models.automation import Automation, AutomationLog
-from app.models.broadcast import Broadcast, BroadcastRecipient
+from app.models.broadcast import Broadcast, BroadcastRecipient, BroadcastSendRange
 from app.models.knowledge import KnowledgeSource
 from app.models.channel import Channel
 from app.models.billing import Subscription, Invoice
@@ -16,12 +16,12 @@ __all__ = [
     "User", "UserRole",
     "Workspace", "WorkspaceMember",
     "Agent", "AgentKnowledge",
-    "Conversation", "Message",
+    "Conversation", "Message", "OutboundMessage",
     "Contact",
     "Deal",
     "Flow", "FlowNode",
     "Automation", "AutomationLog",
-    "Broadcast", "BroadcastRecipient",
+    "Broadcast", "BroadcastRecipient", "BroadcastSendRange",
     "KnowledgeSource",
     "Channel",
     "Subscription", "Invoice",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, JSON, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, JSON, Integer, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -52,6 +52,10 @@ class Automation(Base):
 
 class AutomationLog(Base):
     __tablename__ = "automation_logs"
+    __table_args__ = (
+        # Log order: keyset pages on (started_at, id), newest first
+        Index("ix_automation_logs_automation_started_at_id", "automation_id", "started_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     automation_id = Column(UUID(as_uuid=True), ForeignKey("automations.id", ondelete="CASCADE"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, JSON, Enum as SQLEnum, Float
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, JSON, Index, Enum as SQLEnum, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -21,6 +21,11 @@ class RecipientStatus(str, enum.Enum):
     READ = "read"
     FAILED = "failed"
 
+class SendRangeStatus(str, enum.Enum):
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+
 class Broadcast(Base):
     __tablename__ = "broadcasts"
     
@@ -62,17 +67,45 @@ class Broadcast(Base):
 
 class BroadcastRecipient(Base):
     __tablename__ = "broadcast_recipients"
+    __table_args__ = (
+        # One row per contact; lets INSERT ... SELECT materialization be re-run safely
+        Index("uq_broadcast_recipients_broadcast_contact", "broadcast_id", "contact_id", unique=True),
+        # Keyset batches and send-range boundaries walk recipients by id within a broadcast
+        Index("ix_broadcast_recipients_broadcast_id_id", "broadcast_id", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     broadcast_id = Column(UUID(as_uuid=True), ForeignKey("broadcasts.id", ondelete="CASCADE"), nullable=False)
     contact_id = Column(UUID(as_uuid=True), ForeignKey("contacts.id", ondelete="SET NULL"))
     
     status = Column(SQLEnum(RecipientStatus), default=RecipientStatus.PENDING)
-    channel_message_id = Column(String(255))
+    channel_message_id = Column(String(255), index=True)  # Status callbacks are matched on this
     sent_at = Column(DateTime)
     delivered_at = Column(DateTime)
     read_at = Column(DateTime)
     error_message = Column(Text)
+    send_attempted_at = Column(DateTime)  # Set before the API call; never resent once set
     
     # Relationships
     broadcast = relationship("Broadcast", back_populates="recipients")
+
+class BroadcastSendRange(Base):
+    """Checkpoint of a broadcast send: a leased range of recipient ids [range_start, range_end)"""
+    __tablename__ = "broadcast_send_ranges"
+    __table_args__ = (
+        Index("uq_broadcast_send_ranges_broadcast_start", "broadcast_id", "range_start", unique=True),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    broadcast_id = Column(UUID(as_uuid=True), ForeignKey("broadcasts.id", ondelete="CASCADE"), nullable=False)
+    
+    range_start = Column(UUID(as_uuid=True), nullable=False)  # Inclusive
+    range_end = Column(UUID(as_uuid=True))  # Exclusive; NULL for the last range
+    
+    status = Column(SQLEnum(SendRangeStatus), default=SendRangeStatus.PENDING, nullable=False)
+    lease_owner = Column(String(255))
+    lease_expires_at = Column(DateTime)
+    attempts = Column(Integer, default=0, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
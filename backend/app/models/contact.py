@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, JSON, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, DDL, String, Text, DateTime, ForeignKey, Integer, Index, Enum as SQLEnum, event, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 import enum
@@ -13,8 +13,47 @@ class ContactStage(str, enum.Enum):
     CUSTOMER = "customer"
     CHURNED = "churned"
 
+# Search document: names weigh most, then company, then email ('simple' keeps names unstemmed)
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(email, '')), 'C')"
+)
+SEARCH_TEXT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || coalesce(company, ''))"
+)
+
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # One contact per channel identity; targets of the inbound ON CONFLICT resolver
+        Index("uq_contacts_workspace_whatsapp_id", "workspace_id", "whatsapp_id", unique=True,
+              postgresql_where=text("whatsapp_id IS NOT NULL")),
+        Index("uq_contacts_workspace_instagram_id", "workspace_id", "instagram_id", unique=True,
+              postgresql_where=text("instagram_id IS NOT NULL")),
+        Index("uq_contacts_workspace_messenger_id", "workspace_id", "messenger_id", unique=True,
+              postgresql_where=text("messenger_id IS NOT NULL")),
+        # Audience scans and id-range walks for broadcast materialization
+        Index("ix_contacts_workspace_id_id", "workspace_id", "id"),
+        # Segment predicates: tags ?| / @> and custom_fields @> / ? are served by GIN
+        Index("ix_contacts_tags_gin", "tags", postgresql_using="gin"),
+        Index("ix_contacts_custom_fields_gin", "custom_fields", postgresql_using="gin"),
+        Index("ix_contacts_workspace_stage", "workspace_id", "stage"),
+        # List order: keyset pages on (created_at, id), newest first
+        Index("ix_contacts_workspace_created_at_id", "workspace_id", "created_at", "id"),
+        # Deduplication keys for imports: case-insensitive email and phone digits
+        Index("ix_contacts_workspace_email_lower", "workspace_id", text("lower(email)")),
+        # Phone search: prefix (country code first) and suffix (national number) LIKE matches
+        Index("ix_contacts_workspace_phone_digits", "workspace_id", "phone_digits",
+              postgresql_ops={"phone_digits": "text_pattern_ops"}),
+        Index("ix_contacts_workspace_phone_digits_reverse", "workspace_id",
+              text("reverse(phone_digits) text_pattern_ops")),
+        # Full-text prefix search and trigram substring search, scoped by workspace (btree_gin)
+        Index("ix_contacts_workspace_search_vector", "workspace_id", "search_vector", postgresql_using="gin"),
+        Index("ix_contacts_workspace_search_text_trgm", "workspace_id", "search_text", postgresql_using="gin",
+              postgresql_ops={"search_text": "gin_trgm_ops"}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
@@ -24,6 +63,8 @@ class Contact(Base):
     last_name = Column(String(100))
     email = Column(String(255), index=True)
     phone = Column(String(50), index=True)
+    # Digits of phone only, so "+1 (555) 010-0000" and "15550100000" compare equal
+    phone_digits = Column(String(50), Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True))
     avatar_url = Column(String(500))
     
     # Company info
@@ -38,15 +79,23 @@ class Contact(Base):
     # CRM fields
     stage = Column(SQLEnum(ContactStage), default=ContactStage.LEAD)
     lead_score = Column(Integer, default=0)
-    tags = Column(JSON, default=list)
-    custom_fields = Column(JSON, default=dict)
+    tags = Column(JSONB, default=list)
+    custom_fields = Column(JSONB, default=dict)
     
     notes = Column(Text)
     last_contacted_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Search (generated; deferred so ordinary loads don't fetch them)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True)))
+    search_text = deferred(Column(Text, Computed(SEARCH_TEXT, persisted=True)))
+    
     # Relationships
     workspace = relationship("Workspace", back_populates="contacts")
     conversations = relationship("Conversation", back_populates="contact")
     deals = relationship("Deal", back_populates="contact")
+
+# Operator classes used by the search indexes
+for extension in ("pg_trgm", "btree_gin"):
+    event.listen(Contact.__table__, "before_create", DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index, Integer, Enum as SQLEnum, Boolean, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -25,8 +25,31 @@ class MessageRole(str, enum.Enum):
     ASSISTANT = "assistant"
     SYSTEM = "system"
 
+class MessageStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DELIVERED = "delivered"
+    READ = "read"
+    FAILED = "failed"
+
+class OutboundStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+# Enum columns store member names; literal SQL so it can be used for ON CONFLICT index inference
+OPEN_CONVERSATION_PREDICATE = "status IN ('ACTIVE', 'PENDING')"
+
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Inbox order: keyset pages on (last_message_at, id), newest first
+        Index("ix_conversations_workspace_last_message_at_id", "workspace_id", "last_message_at", "id"),
+        # At most one open conversation per contact and channel
+        Index("uq_conversations_open_contact_channel", "workspace_id", "contact_id", "channel", unique=True,
+              postgresql_where=text(OPEN_CONVERSATION_PREDICATE)),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
@@ -41,6 +64,12 @@ class Conversation(Base):
     
     is_ai_enabled = Column(Boolean, default=True)
     last_message_at = Column(DateTime)
+    
+    # Inbox list projection, maintained on message insert and read (see services.conversation_projection)
+    last_message_preview = Column(String(255))
+    last_message_role = Column(SQLEnum(MessageRole))
+    unread_count = Column(Integer, default=0, nullable=False)  # Contact messages no agent has read
+    message_count = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -52,6 +81,19 @@ class Conversation(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Webhook redeliveries carry the same channel message id; ingest inserts ON CONFLICT DO NOTHING
+        Index("uq_messages_conversation_channel_message_id", "conversation_id", "channel_message_id", unique=True,
+              postgresql_where=text("channel_message_id IS NOT NULL")),
+        # A conversation's messages in order (exports, history windows)
+        Index("ix_messages_conversation_created_at_id", "conversation_id", "created_at", "id"),
+        # Status callbacks of inbox sends are matched on the channel message id
+        Index("ix_messages_channel_message_id_outbound", "channel_message_id",
+              postgresql_where=text("status IS NOT NULL")),
+        # Unread contact messages of a conversation, flipped by mark-as-read
+        Index("ix_messages_conversation_unread", "conversation_id", "created_at",
+              postgresql_where=text("NOT is_read AND role = 'USER'")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
@@ -61,10 +103,38 @@ class Message(Base):
     # Metadata
     channel_message_id = Column(String(255))  # External ID from channel
     attachments = Column(Text)  # JSON array of attachment URLs
-    metadata = Column(Text)  # Additional JSON metadata
+    extra_metadata = Column("metadata", Text)  # Additional JSON metadata ("metadata" is reserved by declarative)
     
     is_read = Column(Boolean, default=False)
+    status = Column(SQLEnum(MessageStatus))  # Delivery status of messages sent to the channel; NULL otherwise
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
+
+class OutboundMessage(Base):
+    """Delivery job of an inbox message to its channel (see services.outbound_delivery)"""
+    __tablename__ = "outbound_messages"
+    __table_args__ = (
+        # Jobs that are due, oldest first
+        Index("ix_outbound_messages_due", "next_attempt_at", postgresql_where=text("status = 'PENDING'")),
+        # Unfinished jobs of a conversation in order; only the first may be sent
+        Index("ix_outbound_messages_conversation_open", "conversation_id", "created_at", "id",
+              postgresql_where=text("status IN ('PENDING', 'SENDING')")),
+        Index("ix_outbound_messages_lease", "lease_expires_at", postgresql_where=text("status = 'SENDING'")),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id", ondelete="CASCADE"), nullable=False, unique=True)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
+    workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
+    
+    status = Column(SQLEnum(OutboundStatus), default=OutboundStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_owner = Column(String(255))
+    lease_expires_at = Column(DateTime)
+    error_message = Column(Text)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
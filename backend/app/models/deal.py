@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Float, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Float, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -17,6 +17,10 @@ class DealStage(str, enum.Enum):
 
 class Deal(Base):
     __tablename__ = "deals"
+    __table_args__ = (
+        # List order: keyset pages on (created_at, id), newest first
+        Index("ix_deals_workspace_created_at_id", "workspace_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
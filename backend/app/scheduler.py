@@ -0,0 +1,41 @@
+"""Scheduled broadcast executor.
+
+Usage:
+    python -m app.scheduler
+
+Runs the broadcast scheduler until SIGINT/SIGTERM. Any number of replicas may run side by
+side; due broadcasts are claimed with FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import logging
+import signal
+
+from app.core.database import engine
+from app.core.http_client import http_client
+from app.core.redis import redis_manager
+from app.services.broadcast_scheduler import broadcast_scheduler
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await http_client.startup()
+    await redis_manager.startup()
+    await broadcast_scheduler.start()
+    logger.info("Broadcast scheduler started")
+    try:
+        await stop.wait()
+    finally:
+        await broadcast_scheduler.stop()
+        await redis_manager.shutdown()
+        await http_client.shutdown()
+        await engine.dispose()
+        logger.info("Broadcast scheduler stopped")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(main())
@@ -1,9 +1,18 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Any
 from datetime import datetime
 from uuid import UUID
 from enum import Enum
 
+from app.schemas.segment import AudienceFilter
+from app.services.templating import validate_template
+
+def _validate_audience_filter(value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Stored as JSON, but must compile to a segment predicate
+    if value is None:
+        return value
+    return AudienceFilter.model_validate(value).model_dump(mode="json", exclude_defaults=True)
+
 class BroadcastStatus(str, Enum):
     DRAFT = "draft"
     SCHEDULED = "scheduled"
@@ -11,6 +20,10 @@ class BroadcastStatus(str, Enum):
     SENT = "sent"
     FAILED = "failed"
 
+def _validate_message_content(value: Optional[str]) -> Optional[str]:
+    # Personalization placeholders must compile before the broadcast is stored
+    return validate_template(value) if value is not None else value
+
 class BroadcastCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     channel: str = Field(..., max_length=50)
@@ -20,6 +33,9 @@ class BroadcastCreate(BaseModel):
     audience_type: str = Field("all", max_length=50)
     audience_filter: Dict[str, Any] = {}
 
+    check_audience_filter = field_validator("audience_filter")(_validate_audience_filter)
+    check_message_content = field_validator("message_content")(_validate_message_content)
+
 class BroadcastUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=255)
     message_content: Optional[str] = Field(None, max_length=5000)
@@ -27,6 +43,9 @@ class BroadcastUpdate(BaseModel):
     audience_type: Optional[str] = Field(None, max_length=50)
     audience_filter: Optional[Dict[str, Any]] = None
 
+    check_audience_filter = field_validator("audience_filter")(_validate_audience_filter)
+    check_message_content = field_validator("message_content")(_validate_message_content)
+
 class BroadcastSchedule(BaseModel):
     scheduled_at: datetime
 
@@ -56,5 +56,13 @@ class ContactResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ContactSuggestion(BaseModel):
+    id: UUID
+    first_name: Optional[str]
+    last_name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    company: Optional[str]
+
 class ContactImportRequest(BaseModel):
     contacts: List[ContactCreate]
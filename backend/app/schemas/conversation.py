@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
 from enum import Enum
 
@@ -22,6 +22,13 @@ class MessageRole(str, Enum):
     ASSISTANT = "assistant"
     SYSTEM = "system"
 
+class MessageStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DELIVERED = "delivered"
+    READ = "read"
+    FAILED = "failed"
+
 class MessageCreate(BaseModel):
     content: str = Field(..., min_length=1, max_length=5000)
     role: MessageRole = MessageRole.ASSISTANT
@@ -32,6 +39,8 @@ class MessageResponse(BaseModel):
     role: MessageRole
     content: str
     is_read: bool
+    status: Optional[MessageStatus] = None  # Delivery status of replies sent to the channel
+    channel_message_id: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -49,17 +58,74 @@ class ConversationResponse(BaseModel):
     is_ai_enabled: bool
     last_message_at: Optional[datetime]
     created_at: datetime
-    messages: List[MessageResponse] = []
+    last_message_preview: Optional[str] = None
+    last_message_role: Optional[MessageRole] = None
+    unread_count: int = 0
+    message_count: int = 0
+    messages: List[MessageResponse] = []  # Latest window only; older ones via /messages?before=
+    has_more_messages: bool = False
     contact_name: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+class ConversationListItem(BaseModel):
+    """Inbox row: the conversation's list projection and its contact's display fields"""
+    id: UUID
+    contact_id: Optional[UUID]
+    agent_id: Optional[UUID]
+    assigned_user_id: Optional[UUID]
+    channel: ChannelType
+    status: ConversationStatus
+    subject: Optional[str]
+    is_ai_enabled: bool
+    last_message_at: Optional[datetime]
+    last_message_preview: Optional[str]
+    last_message_role: Optional[MessageRole]
+    unread_count: int
+    message_count: int
+    created_at: datetime
+    contact_name: Optional[str]
+    contact_avatar_url: Optional[str]
+
+class MessageHistoryResponse(BaseModel):
+    messages: List[MessageResponse]  # Oldest first
+    has_more_before: bool
+    has_more_after: bool
+
 class ConversationUpdate(BaseModel):
     status: Optional[ConversationStatus] = None
     assigned_user_id: Optional[UUID] = None
     is_ai_enabled: Optional[bool] = None
 
+# Conversations one bulk request may change; supervisors routinely act on a few hundred
+BULK_MAX_CONVERSATIONS = 1000
+
+class ConversationBulkUpdate(BaseModel):
+    conversation_ids: List[UUID] = Field(..., min_length=1, max_length=BULK_MAX_CONVERSATIONS)
+    status: Optional[ConversationStatus] = None
+    assigned_user_id: Optional[UUID] = None  # Explicit null unassigns
+    agent_id: Optional[UUID] = None
+    is_ai_enabled: Optional[bool] = None
+    
+    @model_validator(mode="after")
+    def check_changes(self):
+        if not self.model_fields_set - {"conversation_ids"}:
+            raise ValueError("Nothing to change")
+        return self
+
+class ConversationBulkRead(BaseModel):
+    conversation_ids: List[UUID] = Field(..., min_length=1, max_length=BULK_MAX_CONVERSATIONS)
+    up_to: Optional[datetime] = None  # Only messages received at or before this time
+    
+    @field_validator("up_to")
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Message times are stored as naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 class ConversationFilter(BaseModel):
     status: Optional[ConversationStatus] = None
     channel: Optional[ChannelType] = None
@@ -0,0 +1,73 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Optional, List, Any, Literal
+from datetime import datetime
+
+from app.schemas.contact import ContactStage
+
+class TagFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    any: List[str] = []  # Has at least one of
+    all: List[str] = []  # Has every one of
+    none: List[str] = []  # Has none of
+
+class RangeFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    gte: Optional[float] = None
+    lte: Optional[float] = None
+
+class CustomFieldFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    field: str = Field(..., min_length=1, max_length=100)
+    op: Literal["eq", "ne", "in", "exists", "not_exists", "gt", "gte", "lt", "lte", "contains"] = "eq"
+    value: Any = None
+
+    @model_validator(mode="after")
+    def check_value(self):
+        if self.op in ("gt", "gte", "lt", "lte") and not isinstance(self.value, (int, float)):
+            raise ValueError(f"custom field '{self.field}': {self.op} needs a numeric value")
+        if self.op == "in" and not isinstance(self.value, list):
+            raise ValueError(f"custom field '{self.field}': in needs a list value")
+        if self.op == "contains" and not isinstance(self.value, str):
+            raise ValueError(f"custom field '{self.field}': contains needs a string value")
+        return self
+
+class DateWindowFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    after: Optional[datetime] = None
+    before: Optional[datetime] = None
+    within_days: Optional[int] = Field(None, ge=0)  # Contacted in the last N days
+    not_within_days: Optional[int] = Field(None, ge=0)  # Not contacted in the last N days (or never)
+
+class AudienceFilter(BaseModel):
+    """Broadcast.audience_filter: every present criterion must match
+
+    Unknown keys are rejected rather than ignored, so a misspelled criterion can't silently
+    widen an audience to the whole workspace.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    tags: Optional[TagFilter] = None
+    stages: List[ContactStage] = []
+    lead_score: Optional[RangeFilter] = None
+    custom_fields: List[CustomFieldFilter] = []
+    last_contacted_at: Optional[DateWindowFilter] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def accept_tag_list(cls, data):
+        # Legacy "tags" audiences store a plain list meaning "any of"
+        if isinstance(data, dict) and isinstance(data.get("tags"), list):
+            data = {**data, "tags": {"any": data["tags"]}}
+        return data
+
+class AudiencePreviewRequest(BaseModel):
+    audience_type: str = Field("all", max_length=50)
+    audience_filter: AudienceFilter = AudienceFilter()
+
+class AudiencePreviewResponse(BaseModel):
+    count: int
+    cached: bool
@@ -0,0 +1,117 @@
+"""Contact search latency against a real database.
+
+Usage:
+    python -m app.scripts.bench_contact_search [--contacts 1000000] [--queries 200]
+
+Seeds a throwaway user and workspace with synthetic contacts (generated server-side with
+INSERT ... SELECT generate_series), runs the list endpoint's search query and the autocomplete
+query for a mix of name prefixes, substrings, emails and phone numbers, and prints p50/p95/p99
+latency per kind. The workspace is deleted afterwards.
+
+Run it against a database migrated to head (alembic upgrade head); it creates no tables.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import String, cast, delete, func, literal, literal_column, select, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import Histogram
+from app.models import *  # noqa
+from app.models.contact import Contact
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.services.contact_search import contact_search
+
+FIRST_NAMES = ["ada", "grace", "alan", "linus", "barbara", "edsger", "donald", "margaret", "ken", "dennis"]
+LAST_NAMES = ["lovelace", "hopper", "turing", "torvalds", "liskov", "dijkstra", "knuth", "hamilton", "thompson", "ritchie"]
+
+def queries(count: int, contacts: int) -> dict:
+    pick = lambda: random.randrange(contacts)
+    return {
+        "name prefix": [random.choice(FIRST_NAMES)[:3] for _ in range(count)],
+        "full name": [f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)[:4]}" for _ in range(count)],
+        "substring": [f"mpany {pick() % 1000}" for _ in range(count)],
+        "email": [f"user{pick()}@exa" for _ in range(count)],
+        "phone": [f"+1 555 {pick():07d}"[:10] for _ in range(count)],
+        "phone suffix": [f"{pick():07d}" for _ in range(count)],
+    }
+
+async def seed(workspace_id: uuid.UUID, contacts: int):
+    n = func.generate_series(1, contacts).table_valued("value").render_derived(name="n")
+    first = literal_column(f"(ARRAY{FIRST_NAMES!r})[1 + n.value % {len(FIRST_NAMES)}]")
+    last = literal_column(f"(ARRAY{LAST_NAMES!r})[1 + (n.value / {len(FIRST_NAMES)}) % {len(LAST_NAMES)}]")
+    rows = select(
+        func.gen_random_uuid(),
+        literal(workspace_id, UUID(as_uuid=True)),
+        first,
+        last,
+        func.concat("user", n.c.value, "@example.com"),
+        func.concat("+1555", func.lpad(cast(n.c.value, String), 7, "0")),
+        func.concat("Company ", n.c.value % 1000),
+        literal_column("'[]'::jsonb"),
+        literal_column("'{}'::jsonb")
+    ).select_from(n)
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            Contact.__table__.insert().from_select(
+                ["id", "workspace_id", "first_name", "last_name", "email", "phone", "company", "tags", "custom_fields"],
+                rows
+            )
+        )
+        await db.commit()
+        await db.execute(text("ANALYZE contacts"))
+        await db.commit()
+
+async def main(args):
+    suffix = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{suffix}@example.com", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        workspace = Workspace(name=f"bench-{suffix}", slug=f"bench-{suffix}", owner_id=user.id)
+        db.add(workspace)
+        await db.commit()
+
+    try:
+        started = time.perf_counter()
+        await seed(workspace.id, args.contacts)
+        print(f"seeded {args.contacts} contacts in {time.perf_counter() - started:.1f}s")
+
+        print(f"{'query':<16}{'mode':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        async with AsyncSessionLocal() as db:
+            for kind, searches in queries(args.queries, args.contacts).items():
+                for autocomplete in (False, True):
+                    latencies = Histogram(len(searches))
+                    for search in searches:
+                        search_filter, ranking = contact_search(search, autocomplete=autocomplete)
+                        query = (
+                            select(Contact.id)
+                            .where(Contact.workspace_id == workspace.id, search_filter)
+                            .order_by(*ranking)
+                            .limit(10 if autocomplete else 50)
+                        )
+                        began = time.perf_counter()
+                        await db.execute(query)
+                        latencies.observe((time.perf_counter() - began) * 1000)
+                    mode = "autocomplete" if autocomplete else "list"
+                    print(f"{kind:<16}{mode:<14}{latencies.percentile(50):>10.1f}"
+                          f"{latencies.percentile(95):>10.1f}{latencies.percentile(99):>10.1f}")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Contact).where(Contact.workspace_id == workspace.id))
+            await db.execute(delete(Workspace).where(Workspace.id == workspace.id))
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
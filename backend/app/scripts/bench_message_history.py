@@ -0,0 +1,126 @@
+"""Conversation detail and message history latency for a long conversation.
+
+Usage:
+    python -m app.scripts.bench_message_history [--messages 50000] [--pages 200] [--window 50]
+
+Seeds a throwaway user, workspace and one conversation with the given number of messages
+(generated server-side with INSERT ... SELECT generate_series), then compares loading every
+message (the old get_conversation) with the latest window, and pages backwards from random
+messages with the before cursor. Prints p50/p95/p99 latency and response size per kind. The
+workspace is deleted afterwards.
+
+Run it against a database migrated to head (alembic upgrade head); it creates no tables.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import orjson
+from sqlalchemy import delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import Histogram
+from app.models import *  # noqa
+from app.models.conversation import ChannelType, Conversation, Message, MessageRole
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.schemas.conversation import MessageResponse
+from app.services.message_history import message_window
+
+def payload_size(messages) -> int:
+    return len(orjson.dumps([MessageResponse.model_validate(message).model_dump(mode="json") for message in messages]))
+
+async def seed(conversation_id: uuid.UUID, messages: int):
+    n = func.generate_series(1, messages).table_valued("value").render_derived(name="n")
+    rows = select(
+        func.gen_random_uuid(),
+        literal(conversation_id, UUID(as_uuid=True)),
+        literal(MessageRole.USER, Message.__table__.c.role.type),
+        func.concat("benchmark message number ", n.c.value, " with some typical chat length text"),
+        literal(True),
+        # One message a minute, ending now
+        func.now() - func.make_interval(0, 0, 0, 0, 0, messages - n.c.value)
+    ).select_from(n)
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            Message.__table__.insert().from_select(
+                ["id", "conversation_id", "role", "content", "is_read", "created_at"], rows
+            )
+        )
+        await db.commit()
+        await db.execute(text("ANALYZE messages"))
+        await db.commit()
+
+async def measure(label: str, runs: int, operation):
+    latencies = Histogram(runs)
+    size = 0
+    for _ in range(runs):
+        began = time.perf_counter()
+        messages = await operation()
+        latencies.observe((time.perf_counter() - began) * 1000)
+        size = payload_size(messages)
+    print(f"{label:<24}{latencies.percentile(50):>10.1f}{latencies.percentile(95):>10.1f}"
+          f"{latencies.percentile(99):>10.1f}{size / 1024:>12.1f}")
+
+async def main(args):
+    suffix = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{suffix}@example.com", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        workspace = Workspace(name=f"bench-{suffix}", slug=f"bench-{suffix}", owner_id=user.id)
+        db.add(workspace)
+        await db.flush()
+        conversation = Conversation(workspace_id=workspace.id, channel=ChannelType.WHATSAPP)
+        db.add(conversation)
+        await db.commit()
+
+    try:
+        started = time.perf_counter()
+        await seed(conversation.id, args.messages)
+        print(f"seeded {args.messages} messages in {time.perf_counter() - started:.1f}s")
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Message.id).where(Message.conversation_id == conversation.id))
+            message_ids = result.scalars().all()
+
+            async def load_all():
+                result = await db.execute(
+                    select(Message).where(Message.conversation_id == conversation.id).order_by(Message.created_at)
+                )
+                messages = result.scalars().all()
+                db.expunge_all()
+                return messages
+
+            async def latest():
+                messages, _ = await message_window(db, conversation.id, args.window)
+                db.expunge_all()
+                return messages
+
+            async def before_random():
+                anchor = await db.get(Message, random.choice(message_ids))
+                messages, _ = await message_window(db, conversation.id, args.window, before=anchor)
+                db.expunge_all()
+                return messages
+
+            print(f"{'kind':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'payload KB':>12}")
+            await measure("all messages (old)", max(1, args.pages // 20), load_all)
+            await measure("latest window", args.pages, latest)
+            await measure("before random message", args.pages, before_random)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Workspace).where(Workspace.id == workspace.id))
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--window", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""Local stand-in for the Graph API send endpoints, for load-testing the broadcast dispatcher.
+
+Usage:
+    python -m app.scripts.fake_graph_api [--port 8089] [--latency-ms 40] [--jitter-ms 20]
+                                         [--error-rate 0.01] [--mps 80]
+
+Then point the backend at it:
+    GRAPH_API_BASE_URL=http://127.0.0.1:8089/v18.0
+
+POST /{version}/{sender_id}/messages answers like WhatsApp Cloud API (messages[0].id) when the
+body has "messaging_product", otherwise like Messenger/Instagram (message_id). --error-rate
+injects 500s; --mps enforces a per-sender throughput tier and answers 429 with Graph error code
+130429 above it. GET /stats returns request counts.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, mps: float) -> FastAPI:
+    app = FastAPI(title="Fake Graph API")
+    stats: Counter = Counter()
+    windows = defaultdict(deque)
+
+    def over_tier(sender_id: str) -> bool:
+        if not mps:
+            return False
+        now = time.monotonic()
+        window = windows[sender_id]
+        while window and now - window[0] > 1.0:
+            window.popleft()
+        if len(window) >= mps:
+            return True
+        window.append(now)
+        return False
+
+    @app.post("/{version}/{sender_id}/messages")
+    async def send(version: str, sender_id: str, request: Request):
+        payload = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+
+        if over_tier(sender_id):
+            stats["throttled"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit hit", "code": 130429, "type": "OAuthException"}},
+                status_code=429
+            )
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "An unknown error has occurred.", "code": 1, "type": "OAuthException"}},
+                status_code=500
+            )
+
+        stats["accepted"] += 1
+        if "messaging_product" in payload:
+            return {
+                "messaging_product": "whatsapp",
+                "contacts": [{"input": payload.get("to"), "wa_id": payload.get("to")}],
+                "messages": [{"id": f"wamid.fake.{uuid.uuid4().hex}"}]
+            }
+        return {"recipient_id": payload.get("recipient", {}).get("id"), "message_id": f"m_fake.{uuid.uuid4().hex}"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--mps", type=float, default=0.0, help="Per-sender throughput tier (0 disables)")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.mps),
+        host=args.host, port=args.port, log_level="warning"
+    )
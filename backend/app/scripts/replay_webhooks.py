@@ -0,0 +1,47 @@
+"""Inspect, replay or purge dead-lettered webhook payloads.
+
+Usage:
+    python -m app.scripts.replay_webhooks list [--limit 20]
+    python -m app.scripts.replay_webhooks show <id>
+    python -m app.scripts.replay_webhooks replay [<id> ...] [--all]
+    python -m app.scripts.replay_webhooks purge [<id> ...] [--all]
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.redis import redis_manager
+from app.services.webhook_queue import webhook_queue
+
+async def main(args) -> int:
+    try:
+        if args.command == "list":
+            for entry in await webhook_queue.list_dead_letters(args.limit):
+                print(f"{entry['id']}  {entry['channel']:<10} deliveries={entry['deliveries']}  {entry['error'][:120]}")
+        elif args.command == "show":
+            entries = [e for e in await webhook_queue.list_dead_letters(10000) if e["id"] in args.ids]
+            for entry in entries:
+                print(f"# {entry['id']} ({entry['channel']}) source={entry['source_id']}")
+                print(f"# error: {entry['error']}")
+                print(entry["body"].decode(errors="replace"))
+        elif args.command in ("replay", "purge"):
+            if not args.ids and not args.all:
+                print("Pass payload ids or --all", file=sys.stderr)
+                return 2
+            if args.command == "replay":
+                count = await webhook_queue.replay_dead_letters(args.ids or None)
+                print(f"Replayed {count} payload(s)")
+            else:
+                count = await webhook_queue.purge_dead_letters(args.ids or None)
+                print(f"Purged {count} payload(s)")
+    finally:
+        await redis_manager.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["list", "show", "replay", "purge"])
+    parser.add_argument("ids", nargs="*")
+    parser.add_argument("--all", action="store_true")
+    parser.add_argument("--limit", type=int, default=20)
+    sys.exit(asyncio.run(main(parser.parse_args())))
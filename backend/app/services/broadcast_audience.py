@@ -0,0 +1,123 @@
+import logging
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, update, func, literal, and_
+from sqlalchemy.dialects.postgresql import insert, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.broadcast import Broadcast, BroadcastRecipient, BroadcastStatus, RecipientStatus
+from app.models.contact import Contact
+from app.services.broadcast_progress import record_progress
+from app.services.jobs import Job, JobStatus, job_store
+from app.services.segments import compile_audience
+
+logger = logging.getLogger(__name__)
+
+def audience_clause(broadcast: Broadcast) -> ColumnElement:
+    """SQL predicate on contacts selecting the broadcast's audience"""
+    return compile_audience(broadcast.workspace_id, broadcast.audience_type, broadcast.audience_filter)
+
+async def count_audience(db: AsyncSession, broadcast: Broadcast) -> int:
+    return await db.scalar(select(func.count()).select_from(Contact).where(audience_clause(broadcast)))
+
+def _insert_recipients(broadcast: Broadcast, where: ColumnElement):
+    """INSERT INTO broadcast_recipients SELECT ... FROM contacts WHERE <audience>
+
+    Conflicts on (broadcast_id, contact_id) are skipped, so a re-run only adds missing rows.
+    """
+    audience = select(
+        func.gen_random_uuid(),
+        literal(broadcast.id, UUID(as_uuid=True)),
+        Contact.id,
+        literal(RecipientStatus.PENDING, BroadcastRecipient.__table__.c.status.type)
+    ).where(where)
+
+    return (
+        insert(BroadcastRecipient.__table__)
+        .from_select(["id", "broadcast_id", "contact_id", "status"], audience)
+        .on_conflict_do_nothing(index_elements=["broadcast_id", "contact_id"])
+    )
+
+async def insert_recipients(db: AsyncSession, broadcast: Broadcast) -> int:
+    """Materialize the whole audience with one statement (caller commits); returns rows inserted"""
+    result = await db.execute(_insert_recipients(broadcast, audience_clause(broadcast)))
+    return result.rowcount
+
+async def materialize_recipients(db: AsyncSession, broadcast: Broadcast, job: Optional[Job] = None) -> int:
+    """Materialize the audience in contact-id ranges, committing and reporting progress per range
+
+    Each range is one INSERT ... SELECT plus a total_recipients increment in the same transaction,
+    so an interrupted run can be resumed without double counting.
+    """
+    where = audience_clause(broadcast)
+    chunk = settings.BROADCAST_MATERIALIZE_CHUNK
+    inserted = 0
+    after = None
+
+    while True:
+        range_where = where if after is None else and_(where, Contact.id > after)
+        # Upper bound of the next range, walked along the (workspace_id, id) index
+        upper = await db.scalar(
+            select(Contact.id).where(range_where).order_by(Contact.id).offset(chunk - 1).limit(1)
+        )
+        if upper is not None:
+            range_where = and_(range_where, Contact.id <= upper)
+
+        result = await db.execute(_insert_recipients(broadcast, range_where))
+        counters = await db.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast.id)
+            .values(total_recipients=Broadcast.total_recipients + result.rowcount)
+            .returning(
+                Broadcast.total_recipients,
+                Broadcast.sent_count, Broadcast.delivered_count, Broadcast.read_count, Broadcast.failed_count
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Progress streams opened while the audience is still growing see the total rise
+        record_progress(db, {broadcast.id: counters.one()})
+        await db.commit()
+        inserted += result.rowcount
+
+        if job is not None:
+            job.processed = inserted
+            await job_store.save(job)
+
+        if upper is None:
+            return inserted
+        after = upper
+
+async def run_materialize_job(broadcast_id: str, job_id: Optional[str] = None) -> bool:
+    """Background half of send_broadcast for large audiences; returns True once recipients exist"""
+    job = await job_store.get(job_id) if job_id else None
+    async with AsyncSessionLocal() as db:
+        broadcast = await db.get(Broadcast, uuid.UUID(str(broadcast_id)))
+        if broadcast is None:
+            return False
+
+        if job is not None:
+            job.status = JobStatus.RUNNING
+            await job_store.save(job)
+
+        try:
+            inserted = await materialize_recipients(db, broadcast, job)
+        except Exception as e:
+            logger.exception("Failed to materialize recipients of broadcast %s", broadcast_id)
+            await db.rollback()
+            broadcast.status = BroadcastStatus.FAILED
+            await db.commit()
+            if job is not None:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+                await job_store.save(job)
+            return False
+
+    if job is not None:
+        job.status = JobStatus.COMPLETED
+        job.result = {"broadcast_id": str(broadcast_id), "total_recipients": inserted}
+        await job_store.save(job)
+    return True
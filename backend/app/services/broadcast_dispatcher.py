@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import select, update, values, column, cast, func, String, DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import Histogram, metrics
+from app.core.rate_limit import rate_limiters
+from app.core.retry import retry_async
+from app.models.broadcast import Broadcast, BroadcastRecipient, BroadcastStatus, RecipientStatus
+from app.models.channel import Channel, ChannelStatus, ChannelType
+from app.models.contact import Contact
+from app.services.channel_service import (
+    ChannelAPIError,
+    instagram_service,
+    is_transient_error,
+    message_id_from_response,
+    messenger_service,
+    whatsapp_service
+)
+from app.services.broadcast_progress import broadcast_progress
+from app.services.broadcast_ranges import (
+    RangeLease,
+    claim_range,
+    complete_range,
+    mark_attempted,
+    plan_ranges,
+    recover_range,
+    renew_lease
+)
+from app.services.status_ingest import increment_broadcast_counters
+from app.services.templating import CompiledTemplate, compile_template
+
+logger = logging.getLogger(__name__)
+
+# Contact column holding the recipient's address on each channel
+DESTINATION_COLUMNS = {
+    ChannelType.WHATSAPP: func.coalesce(Contact.whatsapp_id, Contact.phone),
+    ChannelType.INSTAGRAM: Contact.instagram_id,
+    ChannelType.MESSENGER: Contact.messenger_id,
+}
+
+# Contact columns a message template can read (see templating.TEMPLATE_FIELDS)
+TEMPLATE_COLUMNS = {
+    "first_name": Contact.first_name,
+    "last_name": Contact.last_name,
+    "email": Contact.email,
+    "phone": Contact.phone,
+    "company": Contact.company,
+    "job_title": Contact.job_title,
+    "custom_fields": Contact.custom_fields,
+}
+
+SendFn = Callable[[str, str], Awaitable[dict]]
+
+@dataclass(slots=True)
+class SendOutcome:
+    recipient_id: uuid.UUID
+    status: RecipientStatus
+    channel_message_id: Optional[str] = None
+    sent_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+@dataclass
+class DispatchReport:
+    """Throughput and latency of one dispatch run"""
+    broadcast_id: str
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    latency_ms: Histogram = field(default_factory=lambda: Histogram(size=100000))
+
+    def as_dict(self) -> dict:
+        return {
+            "broadcast_id": self.broadcast_id,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "messages_per_second": round((self.sent + self.failed) / self.elapsed, 1) if self.elapsed else 0.0,
+            "send_latency_p50_ms": round(self.latency_ms.percentile(50), 1),
+            "send_latency_p99_ms": round(self.latency_ms.percentile(99), 1)
+        }
+
+def _sender(channel: Channel, broadcast: Broadcast) -> SendFn:
+    """Bind the channel credentials and broadcast content to a send(to, text) coroutine"""
+    if channel.channel_type == ChannelType.WHATSAPP:
+        if broadcast.template_id:
+            return lambda to, text: whatsapp_service.send_template_message(
+                channel.external_id, channel.access_token, to, broadcast.template_id
+            )
+        return lambda to, text: whatsapp_service.send_message(channel.external_id, channel.access_token, to, text)
+    if channel.channel_type == ChannelType.INSTAGRAM:
+        return lambda to, text: instagram_service.send_message(channel.external_id, channel.access_token, to, text)
+    return lambda to, text: messenger_service.send_message(channel.external_id, channel.access_token, to, text)
+
+class BroadcastDispatcher:
+    """Sends a broadcast to its pending recipients
+
+    The recipients are split into id ranges (see broadcast_ranges) that workers lease one at a
+    time, so any number of processes can work on one broadcast and a crashed worker's range is
+    picked up once its lease expires. Within a range, recipients are read in keyset-ordered
+    batches (id > last id), checkpointed, sent with bounded concurrency behind a per-sender
+    token bucket, and each batch's outcomes are written back with one UPDATE ... FROM (VALUES ...)
+    plus one counter update before the lease is renewed and the next batch is read.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        attempts: Optional[int] = None
+    ):
+        self.batch_size = batch_size or settings.BROADCAST_BATCH_SIZE
+        self.concurrency = concurrency or settings.BROADCAST_CONCURRENCY
+        self.attempts = attempts or settings.BROADCAST_SEND_ATTEMPTS
+
+    async def _load(self, db: AsyncSession, broadcast_id: str) -> Tuple[Optional[Broadcast], Optional[Channel]]:
+        broadcast = await db.get(Broadcast, uuid.UUID(str(broadcast_id)))
+        if broadcast is None:
+            return None, None
+        try:
+            channel_type = ChannelType(broadcast.channel)
+        except ValueError:
+            return broadcast, None
+
+        result = await db.execute(
+            select(Channel)
+            .where(
+                Channel.workspace_id == broadcast.workspace_id,
+                Channel.channel_type == channel_type,
+                Channel.status == ChannelStatus.CONNECTED,
+                Channel.is_active.is_(True)
+            )
+            .order_by(Channel.created_at)
+            .limit(1)
+        )
+        return broadcast, result.scalar_one_or_none()
+
+    async def _next_batch(
+        self,
+        db: AsyncSession,
+        lease: RangeLease,
+        channel_type: ChannelType,
+        template: CompiledTemplate,
+        after: Optional[uuid.UUID]
+    ) -> list:
+        """Rows of (recipient id, destination, *template fields) for the next pending batch"""
+        query = (
+            select(
+                BroadcastRecipient.id,
+                DESTINATION_COLUMNS[channel_type].label("destination"),
+                *(TEMPLATE_COLUMNS[field] for field in template.fields)
+            )
+            .outerjoin(Contact, Contact.id == BroadcastRecipient.contact_id)
+            .where(
+                lease.clause(),
+                BroadcastRecipient.status == RecipientStatus.PENDING,
+                BroadcastRecipient.send_attempted_at.is_(None)
+            )
+            .order_by(BroadcastRecipient.id)
+            .limit(self.batch_size)
+        )
+        if after is not None:
+            query = query.where(BroadcastRecipient.id > after)
+        return (await db.execute(query)).all()
+
+    async def _send_one(self, send: SendFn, bucket, recipient_id, destination, text: str, report: DispatchReport) -> SendOutcome:
+        if not destination:
+            return SendOutcome(recipient_id, RecipientStatus.FAILED, error="Contact has no address on this channel")
+
+        async def attempt():
+            await bucket.acquire()
+            started = time.perf_counter()
+            try:
+                return await send(destination, text)
+            except ChannelAPIError as e:
+                if e.throttled:
+                    # Upstream says we're over the tier: stop every sender on this number briefly
+                    bucket.pause(e.retry_after or settings.BROADCAST_RETRY_BASE_MS / 1000)
+                raise
+            finally:
+                report.latency_ms.observe((time.perf_counter() - started) * 1000)
+
+        def on_retry(attempt_number: int, error: Exception):
+            report.retries += 1
+            metrics.incr("broadcast.retries")
+
+        try:
+            response = await retry_async(
+                attempt,
+                attempts=self.attempts,
+                base_delay=settings.BROADCAST_RETRY_BASE_MS / 1000,
+                max_delay=settings.BROADCAST_RETRY_MAX_MS / 1000,
+                should_retry=is_transient_error,
+                retry_after=lambda e: getattr(e, "retry_after", None),
+                on_retry=on_retry
+            )
+        except Exception as e:
+            return SendOutcome(recipient_id, RecipientStatus.FAILED, error=str(e)[:1000] or e.__class__.__name__)
+
+        return SendOutcome(recipient_id, RecipientStatus.SENT, message_id_from_response(response), datetime.utcnow())
+
+    async def _write_back(self, db: AsyncSession, broadcast_id: uuid.UUID, outcomes: List[SendOutcome]) -> Tuple[int, int]:
+        """Persist a batch of outcomes and counters in one transaction; returns (sent, failed)"""
+        v = values(
+            column("id", UUID(as_uuid=True)),
+            column("status", BroadcastRecipient.__table__.c.status.type),
+            column("channel_message_id", String),
+            column("sent_at", DateTime),
+            column("error", Text),
+            name="o"
+        ).data([
+            (outcome.recipient_id, outcome.status, outcome.channel_message_id, outcome.sent_at, outcome.error)
+            for outcome in outcomes
+        ])
+        result = await db.execute(
+            update(BroadcastRecipient)
+            .where(
+                BroadcastRecipient.id == v.c.id,
+                BroadcastRecipient.status == RecipientStatus.PENDING
+            )
+            .values(
+                status=v.c.status,
+                # A VALUES column that is NULL in every row (e.g. an all-failed batch) is typed text
+                channel_message_id=cast(v.c.channel_message_id, String),
+                sent_at=cast(v.c.sent_at, DateTime),
+                error_message=cast(v.c.error, Text)
+            )
+            .returning(BroadcastRecipient.status)
+            .execution_options(synchronize_session=False)
+        )
+        statuses = result.scalars().all()
+        sent = sum(1 for status in statuses if status == RecipientStatus.SENT)
+        failed = len(statuses) - sent
+        if statuses:
+            await increment_broadcast_counters(db, {broadcast_id: [sent, 0, 0, failed]})
+        await db.commit()
+        return sent, failed
+
+    async def _finish(self, db: AsyncSession, broadcast_id: uuid.UUID):
+        """Close out the broadcast once no recipient is left pending"""
+        pending = await db.scalar(
+            select(BroadcastRecipient.id)
+            .where(
+                BroadcastRecipient.broadcast_id == broadcast_id,
+                BroadcastRecipient.status == RecipientStatus.PENDING
+            )
+            .limit(1)
+        )
+        if pending is not None:
+            return
+
+        sent_count = await db.scalar(select(Broadcast.sent_count).where(Broadcast.id == broadcast_id))
+        status = BroadcastStatus.SENT if sent_count else BroadcastStatus.FAILED
+        result = await db.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast_id, Broadcast.status == BroadcastStatus.SENDING)
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount:
+            await broadcast_progress.publish_status(broadcast_id, status.value)
+
+    async def dispatch(self, broadcast_id: str) -> DispatchReport:
+        """Send every pending recipient of a broadcast and return the run's report"""
+        report = DispatchReport(broadcast_id=str(broadcast_id))
+        started = time.perf_counter()
+
+        async with AsyncSessionLocal() as db:
+            broadcast, channel = await self._load(db, broadcast_id)
+            if broadcast is None:
+                logger.warning("Broadcast %s not found", broadcast_id)
+                return report
+            if channel is None:
+                logger.warning("Broadcast %s has no connected %s channel", broadcast_id, broadcast.channel)
+                broadcast.status = BroadcastStatus.FAILED
+                await db.commit()
+                return report
+
+            send = _sender(channel, broadcast)
+            template = compile_template(broadcast.message_content)
+            render = template.render
+            rate = float((channel.config or {}).get("throughput_mps") or settings.BROADCAST_DEFAULT_MPS)
+            bucket = rate_limiters.get((channel.channel_type.value, channel.external_id), rate)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def send_bounded(recipient_id, destination, text):
+                async with semaphore:
+                    return await self._send_one(send, bucket, recipient_id, destination, text, report)
+
+            await plan_ranges(db, broadcast.id)
+            while True:
+                lease = await claim_range(db, broadcast.id)
+                if lease is None:
+                    break
+                if lease.reclaimed:
+                    recovered = await recover_range(db, lease)
+                    report.failed += recovered
+                    metrics.incr("broadcast.ranges_reclaimed")
+
+                after = None
+                while True:
+                    batch = await self._next_batch(db, lease, channel.channel_type, template, after)
+                    if not batch:
+                        await complete_range(db, lease)
+                        break
+                    after = batch[-1].id
+
+                    await mark_attempted(db, [row.id for row in batch])
+                    outcomes = await asyncio.gather(*(
+                        send_bounded(row[0], row[1], render(row[2:])) for row in batch
+                    ))
+                    sent, failed = await self._write_back(db, broadcast.id, outcomes)
+                    report.sent += sent
+                    report.failed += failed
+
+                    if not await renew_lease(db, lease):
+                        logger.warning("Lost the lease on a range of broadcast %s; leaving it to its new owner", broadcast_id)
+                        break
+
+            await self._finish(db, broadcast.id)
+
+        report.elapsed = time.perf_counter() - started
+        metrics.incr("broadcast.sent", report.sent)
+        metrics.incr("broadcast.failed", report.failed)
+        if report.elapsed:
+            metrics.set_gauge("broadcast.last_run_mps", (report.sent + report.failed) / report.elapsed)
+        for sample in report.latency_ms.samples:
+            metrics.observe("broadcast.send_latency_ms", sample)
+        logger.info("Broadcast dispatch finished: %s", report.as_dict())
+        return report
+
+broadcast_dispatcher = BroadcastDispatcher()
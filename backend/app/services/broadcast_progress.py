@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import orjson
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import event_bus
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FIELDS = ("sent", "delivered", "read", "failed")
+# Counters carried by progress updates: the recipient total (it grows while a large audience is
+# materialized) and PROGRESS_FIELDS
+COUNTER_FIELDS = ("total_recipients", *PROGRESS_FIELDS)
+
+def progress_topic(broadcast_id) -> str:
+    return f"broadcasts:progress:{broadcast_id}"
+
+class BroadcastProgressPublisher:
+    """Coalesces counter updates per broadcast and publishes them at most every interval
+
+    An update holds a broadcast's COUNTER_FIELDS as returned by the UPDATE that changed them and
+    is recorded when its transaction commits. Counters only grow, so updates merge by keeping the
+    largest value of each field, and a send applying hundreds of batches per second still produces
+    only a few messages per second per broadcast. Publishing totals rather than deltas lets a
+    subscriber apply an update its snapshot already includes without counting it twice.
+    """
+
+    def __init__(self, interval_ms: int):
+        self.interval = interval_ms / 1000
+        self._pending: Dict[str, List[int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, counters: Dict[object, Sequence[int]]):
+        for broadcast_id, values in counters.items():
+            values = [value or 0 for value in values]
+            pending = self._pending.get(str(broadcast_id))
+            self._pending[str(broadcast_id)] = (
+                values if pending is None else [max(old, new) for old, new in zip(pending, values)]
+            )
+
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # No loop (sync scripts); the next recorded update flushes
+                pass
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        await self.flush()
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        for broadcast_id, counters in pending.items():
+            try:
+                await event_bus.publish(progress_topic(broadcast_id), dict(zip(COUNTER_FIELDS, counters)))
+            except Exception:
+                logger.exception("Failed to publish progress of broadcast %s", broadcast_id)
+
+    async def publish_status(self, broadcast_id, status: str):
+        """Flush outstanding updates, then announce a status change (e.g. the send finished)"""
+        await self.flush()
+        try:
+            await event_bus.publish(progress_topic(broadcast_id), {"status": status})
+        except Exception:
+            logger.exception("Failed to publish status of broadcast %s", broadcast_id)
+
+broadcast_progress = BroadcastProgressPublisher(settings.BROADCAST_PROGRESS_INTERVAL_MS)
+
+def record_progress(db: AsyncSession, counters: Dict[object, Sequence[int]]):
+    """Publish broadcasts' COUNTER_FIELDS, as written by db's transaction, once it commits"""
+    db.info.setdefault("broadcast_progress", []).append(counters)
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_progress(session: Session):
+    for counters in session.info.pop("broadcast_progress", ()):
+        broadcast_progress.record(counters)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_progress(session: Session):
+    session.info.pop("broadcast_progress", None)
+
+FINAL_STATUSES = ("sent", "failed")
+
+def _sse(event_name: str, data: dict) -> bytes:
+    return b"event: " + event_name.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+async def progress_stream(broadcast_id, load_snapshot: Callable[[], Awaitable[dict]]) -> AsyncIterator[bytes]:
+    """Server-Sent Events for one broadcast: a snapshot, then coalesced progress, then done
+
+    load_snapshot returns the broadcast's status, total_recipients and *_count counters read from
+    the database. It is called once subscribed, so no update committed in between is missed;
+    updates carry totals, so one the snapshot already includes changes nothing. Updates from
+    every process are merged here and emitted at most every BROADCAST_PROGRESS_INTERVAL_MS with
+    the running totals, send rate and ETA.
+    """
+    async with event_bus.subscribe(progress_topic(broadcast_id)) as events:
+        snapshot = await load_snapshot()
+        totals = {field: snapshot[f"{field}_count"] for field in PROGRESS_FIELDS}
+        total_recipients = snapshot["total_recipients"]
+        yield _sse("snapshot", snapshot)
+        if snapshot["status"] in FINAL_STATUSES:
+            yield _sse("done", {"status": snapshot["status"], **totals})
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def reader():
+            async for _, message in events:
+                queue.put_nowait(message)
+
+        reader_task = asyncio.create_task(reader())
+        try:
+            interval = settings.BROADCAST_PROGRESS_INTERVAL_MS / 1000
+            latest = dict(totals)
+            latest_recipients = total_recipients
+            rate = 0.0
+            last_emit = last_keepalive = time.monotonic()
+            status = None
+
+            while status is None:
+                changed = latest != totals or latest_recipients != total_recipients
+                timeout = max(0.0, last_emit + interval - time.monotonic()) if changed else settings.BROADCAST_PROGRESS_KEEPALIVE_SECONDS
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    message = None
+                if reader_task.done():
+                    # Subscription dropped; the client reconnects and gets a fresh snapshot
+                    break
+
+                if message is not None:
+                    status = message.get("status")
+                    latest_recipients = max(latest_recipients, message.get("total_recipients", 0))
+                    for field in PROGRESS_FIELDS:
+                        latest[field] = max(latest[field], message.get(field, 0))
+
+                now = time.monotonic()
+                changed = latest != totals or latest_recipients != total_recipients
+                if changed and (status is not None or now - last_emit >= interval):
+                    delta = {field: latest[field] - totals[field] for field in PROGRESS_FIELDS}
+                    elapsed = max(now - last_emit, 1e-6)
+                    processed = delta["sent"] + delta["failed"]
+                    # Exponentially weighted send rate so one slow interval doesn't swing the ETA
+                    rate = processed / elapsed if not rate else 0.7 * rate + 0.3 * processed / elapsed
+                    totals = dict(latest)
+                    total_recipients = latest_recipients
+                    remaining = max(0, total_recipients - totals["sent"] - totals["failed"])
+                    yield _sse("progress", {
+                        **totals,
+                        "total_recipients": total_recipients,
+                        "delta": delta,
+                        "rate_per_second": round(rate, 1),
+                        "eta_seconds": round(remaining / rate) if rate else None
+                    })
+                    last_emit = last_keepalive = now
+                elif now - last_keepalive >= settings.BROADCAST_PROGRESS_KEEPALIVE_SECONDS:
+                    yield b": keepalive\n\n"
+                    last_keepalive = now
+
+            if status is not None:
+                yield _sse("done", {"status": status, **totals})
+        finally:
+            reader_task.cancel()
+            await asyncio.gather(reader_task, return_exceptions=True)
@@ -0,0 +1,178 @@
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, case, select, update, func, literal
+from sqlalchemy.dialects.postgresql import insert, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.broadcast import BroadcastRecipient, BroadcastSendRange, RecipientStatus, SendRangeStatus
+from app.services.status_ingest import increment_broadcast_counters
+
+# Identifies this process in lease_owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+INTERRUPTED_SEND_ERROR = "Send interrupted before its outcome was recorded; not retried to avoid a duplicate"
+
+@dataclass(frozen=True, slots=True)
+class RangeLease:
+    id: uuid.UUID
+    broadcast_id: uuid.UUID
+    range_start: uuid.UUID
+    range_end: Optional[uuid.UUID]
+    reclaimed: bool  # Taken over from an expired lease
+
+    def clause(self):
+        """Predicate on recipients inside this range"""
+        clause = and_(
+            BroadcastRecipient.broadcast_id == self.broadcast_id,
+            BroadcastRecipient.id >= self.range_start
+        )
+        if self.range_end is not None:
+            clause = and_(clause, BroadcastRecipient.id < self.range_end)
+        return clause
+
+async def plan_ranges(db: AsyncSession, broadcast_id: uuid.UUID, range_size: Optional[int] = None) -> int:
+    """Split a broadcast's recipients into fixed-size id ranges (idempotent; commits)
+
+    Every range_size-th recipient id starts a range that ends where the next one starts; one
+    INSERT ... SELECT with window functions, so planning 500k recipients is a single statement.
+    The first range starts at the nil UUID so together the ranges cover the whole id space.
+    """
+    range_size = range_size or settings.BROADCAST_RANGE_SIZE
+    numbered = (
+        select(
+            BroadcastRecipient.id,
+            func.row_number().over(order_by=BroadcastRecipient.id).label("position")
+        )
+        .where(BroadcastRecipient.broadcast_id == broadcast_id)
+        .subquery()
+    )
+    starts = (
+        select(case(
+            (numbered.c.position == 1, literal(uuid.UUID(int=0), UUID(as_uuid=True))),
+            else_=numbered.c.id
+        ).label("range_start"))
+        .where((numbered.c.position - 1) % range_size == 0)
+        .subquery()
+    )
+    planned = select(
+        func.gen_random_uuid(),
+        literal(broadcast_id, UUID(as_uuid=True)),
+        starts.c.range_start,
+        func.lead(starts.c.range_start).over(order_by=starts.c.range_start),
+        literal(SendRangeStatus.PENDING, BroadcastSendRange.__table__.c.status.type),
+        literal(0)
+    )
+    result = await db.execute(
+        insert(BroadcastSendRange.__table__)
+        .from_select(["id", "broadcast_id", "range_start", "range_end", "status", "attempts"], planned)
+        .on_conflict_do_nothing(index_elements=["broadcast_id", "range_start"])
+    )
+    await db.commit()
+    return result.rowcount
+
+async def claim_range(db: AsyncSession, broadcast_id: uuid.UUID, owner: str = WORKER_ID) -> Optional[RangeLease]:
+    """Lease the next unfinished range: pending, or leased by a worker whose lease expired (commits)"""
+    now = datetime.utcnow()
+    # Lock the next range, skipping ranges other workers are claiming, and keep its status from
+    # before the update: RETURNING only sees the new row
+    candidate = (
+        select(BroadcastSendRange.id, BroadcastSendRange.status.label("previous_status"))
+        .where(
+            BroadcastSendRange.broadcast_id == broadcast_id,
+            or_(
+                BroadcastSendRange.status == SendRangeStatus.PENDING,
+                and_(
+                    BroadcastSendRange.status == SendRangeStatus.LEASED,
+                    BroadcastSendRange.lease_expires_at < now
+                )
+            )
+        )
+        .order_by(BroadcastSendRange.range_start)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .cte("candidate")
+    )
+    result = await db.execute(
+        update(BroadcastSendRange)
+        .where(BroadcastSendRange.id == candidate.c.id)
+        .values(
+            status=SendRangeStatus.LEASED,
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=settings.BROADCAST_LEASE_SECONDS),
+            attempts=BroadcastSendRange.attempts + 1,
+            updated_at=now
+        )
+        .returning(
+            BroadcastSendRange.id,
+            BroadcastSendRange.range_start,
+            BroadcastSendRange.range_end,
+            candidate.c.previous_status
+        )
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    await db.commit()
+    if row is None:
+        return None
+    return RangeLease(row.id, broadcast_id, row.range_start, row.range_end, reclaimed=row.previous_status == SendRangeStatus.LEASED)
+
+async def renew_lease(db: AsyncSession, lease: RangeLease, owner: str = WORKER_ID) -> bool:
+    """Extend a lease we still hold; False means another worker took the range over (commits)"""
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(BroadcastSendRange)
+        .where(
+            BroadcastSendRange.id == lease.id,
+            BroadcastSendRange.status == SendRangeStatus.LEASED,
+            BroadcastSendRange.lease_owner == owner
+        )
+        .values(lease_expires_at=now + timedelta(seconds=settings.BROADCAST_LEASE_SECONDS), updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def complete_range(db: AsyncSession, lease: RangeLease, owner: str = WORKER_ID):
+    await db.execute(
+        update(BroadcastSendRange)
+        .where(BroadcastSendRange.id == lease.id, BroadcastSendRange.lease_owner == owner)
+        .values(status=SendRangeStatus.DONE, lease_expires_at=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def mark_attempted(db: AsyncSession, recipient_ids: list):
+    """Checkpoint a batch right before it is sent (commits)"""
+    await db.execute(
+        update(BroadcastRecipient)
+        .where(BroadcastRecipient.id.in_(recipient_ids), BroadcastRecipient.status == RecipientStatus.PENDING)
+        .values(send_attempted_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def recover_range(db: AsyncSession, lease: RangeLease) -> int:
+    """Close out recipients a dead worker was sending when it lost the range (commits)
+
+    They may or may not have reached the API, so they are failed rather than resent.
+    """
+    result = await db.execute(
+        update(BroadcastRecipient)
+        .where(
+            lease.clause(),
+            BroadcastRecipient.status == RecipientStatus.PENDING,
+            BroadcastRecipient.send_attempted_at.isnot(None)
+        )
+        .values(status=RecipientStatus.FAILED, error_message=INTERRUPTED_SEND_ERROR)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        await increment_broadcast_counters(db, {lease.broadcast_id: [0, 0, 0, result.rowcount]})
+    await db.commit()
+    return result.rowcount
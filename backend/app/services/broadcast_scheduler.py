@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set
+
+from sqlalchemy import and_, exists, or_, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import event_bus
+from app.core.metrics import metrics
+from app.core.timer_wheel import HierarchicalTimerWheel
+from app.models.broadcast import Broadcast, BroadcastSendRange, BroadcastStatus, SendRangeStatus
+from app.services.broadcast_audience import run_materialize_job
+from app.services.broadcast_dispatcher import broadcast_dispatcher
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_SCHEDULE_TOPIC = "broadcasts:schedule"
+
+def _timestamp(value: datetime) -> float:
+    # scheduled_at is stored as naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+async def publish_schedule_change(broadcast_id, scheduled_at: Optional[datetime]):
+    """Tell running schedulers about a new, moved or cancelled schedule without waiting for a poll"""
+    try:
+        await event_bus.publish(BROADCAST_SCHEDULE_TOPIC, {
+            "broadcast_id": str(broadcast_id),
+            "scheduled_at": _timestamp(scheduled_at) if scheduled_at else None
+        })
+    except Exception:
+        # The next poll still picks the change up
+        logger.exception("Failed to publish broadcast schedule change")
+
+class BroadcastScheduler:
+    """Fires scheduled broadcasts from an in-memory hierarchical timer wheel
+
+    Broadcasts due within SCHEDULER_LOOKAHEAD_SECONDS are loaded every SCHEDULER_POLL_SECONDS
+    (and on schedule-change events), so the wheel only holds the near future. Due broadcasts
+    are claimed with SELECT ... FOR UPDATE SKIP LOCKED and flipped to SENDING in the same
+    statement, which makes it safe to run several scheduler replicas: each broadcast is
+    claimed by exactly one of them.
+
+    The scheduler also resumes stalled sends: broadcasts left in SENDING by a worker that died,
+    either mid-range (its lease expired) or before its recipients were planned into ranges.
+    """
+
+    def __init__(self):
+        self.wheel = HierarchicalTimerWheel(tick=settings.SCHEDULER_TICK_MS / 1000, start=time.time())
+        self._tasks: List[asyncio.Task] = []
+        self._sends: Set[asyncio.Task] = set()
+        self._active: Set[uuid.UUID] = set()
+        self._send_slots = asyncio.Semaphore(settings.SCHEDULER_MAX_CONCURRENT_SENDS)
+        self._wakeup = asyncio.Event()
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._poll()),
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._run()),
+            asyncio.create_task(self._resume()),
+            asyncio.create_task(self._report())
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Let in-flight sends finish their current batch; unsent recipients stay pending
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+
+    async def load(self):
+        """Add every scheduled broadcast due within the lookahead window to the wheel"""
+        horizon = datetime.utcnow() + timedelta(seconds=settings.SCHEDULER_LOOKAHEAD_SECONDS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Broadcast.id, Broadcast.scheduled_at)
+                .where(
+                    Broadcast.status == BroadcastStatus.SCHEDULED,
+                    Broadcast.scheduled_at <= horizon
+                )
+            )
+            rows = result.all()
+
+        for broadcast_id, scheduled_at in rows:
+            self.wheel.add(broadcast_id, _timestamp(scheduled_at))
+        metrics.set_gauge("scheduler.pending", len(self.wheel))
+        self._wakeup.set()
+
+    async def _poll(self):
+        while True:
+            try:
+                await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to load scheduled broadcasts")
+            await asyncio.sleep(settings.SCHEDULER_POLL_SECONDS)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with event_bus.subscribe(BROADCAST_SCHEDULE_TOPIC) as events:
+                    async for _, event in events:
+                        broadcast_id = uuid.UUID(event["broadcast_id"])
+                        due = event.get("scheduled_at")
+                        if due is None:
+                            self.wheel.cancel(broadcast_id)
+                        elif due <= time.time() + settings.SCHEDULER_LOOKAHEAD_SECONDS:
+                            self.wheel.add(broadcast_id, due)
+                            self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broadcast schedule listener failed; resubscribing")
+                await asyncio.sleep(1)
+
+    async def _run(self):
+        tick = self.wheel.tick
+        while True:
+            # Sleep to the next tick boundary (or until new timers arrive)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=tick - time.time() % tick)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            due = self.wheel.advance(time.time())
+            for start in range(0, len(due), settings.SCHEDULER_CLAIM_BATCH):
+                try:
+                    await self.claim(due[start:start + settings.SCHEDULER_CLAIM_BATCH])
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # Left SCHEDULED; the next poll re-adds them
+                    logger.exception("Failed to claim due broadcasts")
+            metrics.set_gauge("scheduler.pending", len(self.wheel))
+
+    async def claim(self, broadcast_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+        """Atomically move due broadcasts to SENDING and hand them to the sender"""
+        now = datetime.utcnow()
+        due = (
+            select(Broadcast.id)
+            .where(
+                Broadcast.id.in_(broadcast_ids),
+                Broadcast.status == BroadcastStatus.SCHEDULED,
+                Broadcast.scheduled_at <= now
+            )
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Broadcast)
+                .where(Broadcast.id.in_(due))
+                .values(status=BroadcastStatus.SENDING, sent_at=now, total_recipients=0)
+                .returning(Broadcast.id, Broadcast.scheduled_at)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = result.all()
+            await db.commit()
+
+        fired_at = time.time()
+        for broadcast_id, scheduled_at in claimed:
+            lateness_ms = (fired_at - _timestamp(scheduled_at)) * 1000
+            metrics.observe("scheduler.lateness_ms", lateness_ms)
+            metrics.incr("scheduler.fired")
+            self._start_send(broadcast_id, materialize=True)
+        return [broadcast_id for broadcast_id, _ in claimed]
+
+    def _start_send(self, broadcast_id: uuid.UUID, materialize: bool):
+        self._active.add(broadcast_id)
+        task = asyncio.create_task(self._send(broadcast_id, materialize))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, broadcast_id: uuid.UUID, materialize: bool):
+        async with self._send_slots:
+            try:
+                if not materialize or await run_materialize_job(str(broadcast_id)):
+                    await broadcast_dispatcher.dispatch(str(broadcast_id))
+            except Exception:
+                logger.exception("Broadcast %s send failed", broadcast_id)
+            finally:
+                self._active.discard(broadcast_id)
+
+    async def find_stalled(self) -> List[tuple]:
+        """SENDING broadcasts nobody is working on, with whether they still need materializing"""
+        now = datetime.utcnow()
+        ranges = BroadcastSendRange
+        expired_lease = exists().where(
+            ranges.broadcast_id == Broadcast.id,
+            ranges.status == SendRangeStatus.LEASED,
+            ranges.lease_expires_at < now
+        )
+        live_lease = exists().where(
+            ranges.broadcast_id == Broadcast.id,
+            ranges.status == SendRangeStatus.LEASED,
+            ranges.lease_expires_at >= now
+        )
+        pending_range = exists().where(
+            ranges.broadcast_id == Broadcast.id,
+            ranges.status == SendRangeStatus.PENDING
+        )
+        planned = exists().where(ranges.broadcast_id == Broadcast.id)
+        stale = now - timedelta(seconds=settings.BROADCAST_LEASE_SECONDS)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Broadcast.id, ~planned)
+                .where(
+                    Broadcast.status == BroadcastStatus.SENDING,
+                    or_(
+                        expired_lease,
+                        and_(pending_range, ~live_lease, Broadcast.updated_at < stale),
+                        and_(~planned, Broadcast.updated_at < stale)
+                    )
+                )
+                .limit(settings.SCHEDULER_CLAIM_BATCH)
+            )
+            return result.all()
+
+    async def _resume(self):
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_RESUME_SECONDS)
+            try:
+                for broadcast_id, unplanned in await self.find_stalled():
+                    if broadcast_id not in self._active:
+                        metrics.incr("scheduler.resumed")
+                        logger.info("Resuming stalled broadcast %s", broadcast_id)
+                        self._start_send(broadcast_id, materialize=unplanned)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to resume stalled broadcasts")
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_REPORT_SECONDS)
+            lateness = metrics.histograms.get("scheduler.lateness_ms")
+            if lateness and lateness.count:
+                logger.info(
+                    "Scheduler: fired=%d pending=%d lateness_ms=%s",
+                    metrics.counters["scheduler.fired"], len(self.wheel), lateness.snapshot()
+                )
+
+broadcast_scheduler = BroadcastScheduler()
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import event_bus
+from app.core.metrics import metrics
+from app.models.channel import Channel, ChannelType
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_ROUTES_TOPIC = "channels:routes"
+
+RouteKey = Tuple[str, str]
+
+@dataclass(frozen=True, slots=True)
+class ChannelRoute:
+    channel_id: UUID
+    workspace_id: UUID
+    is_active: bool
+
+def _key(channel_type, external_id: str) -> RouteKey:
+    return (getattr(channel_type, "value", channel_type), external_id)
+
+class ChannelRoutingTable:
+    """Process-local (channel_type, external_id) -> channel routing for webhook lookups
+
+    Loaded at startup, dropped on invalidation events published by the channel endpoints and
+    reloaded at least every CHANNEL_ROUTES_TTL seconds as a safety net for missed events.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._routes: Dict[RouteKey, ChannelRoute] = {}
+        self._misses: Dict[RouteKey, float] = {}
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.reload()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def reload(self, db: AsyncSession = None, if_expired: bool = False):
+        async with self._lock:
+            # Concurrent callers that waited on the lock reuse the table just loaded
+            if if_expired and time.monotonic() < self._expires_at:
+                return
+            if db is None:
+                async with AsyncSessionLocal() as session:
+                    routes = await self._load(session)
+            else:
+                routes = await self._load(db)
+            self._routes = routes
+            self._misses = {}
+            self._expires_at = time.monotonic() + self.ttl
+        metrics.incr("channel_routes.reloads")
+        metrics.set_gauge("channel_routes.size", len(routes))
+
+    async def _load(self, db: AsyncSession, keys: Iterable[RouteKey] = None) -> Dict[RouteKey, ChannelRoute]:
+        query = select(
+            Channel.channel_type, Channel.external_id, Channel.id, Channel.workspace_id, Channel.is_active
+        ).where(Channel.external_id.isnot(None))
+        if keys is not None:
+            query = query.where(tuple_(Channel.channel_type, Channel.external_id).in_(
+                [(ChannelType(channel_type), external_id) for channel_type, external_id in keys]
+            ))
+        result = await db.execute(query)
+        return {
+            _key(channel_type, external_id): ChannelRoute(channel_id, workspace_id, bool(is_active))
+            for channel_type, external_id, channel_id, workspace_id, is_active in result.all()
+        }
+
+    async def get_many(
+        self,
+        channel_type,
+        external_ids: Iterable[str],
+        db: AsyncSession = None
+    ) -> Dict[str, ChannelRoute]:
+        """Resolve external ids to routes; unknown ids are looked up once and negatively cached"""
+        if time.monotonic() >= self._expires_at:
+            await self.reload(db, if_expired=True)
+
+        now = time.monotonic()
+        routes = {}
+        unknown = []
+        for external_id in set(external_ids):
+            key = _key(channel_type, external_id)
+            route = self._routes.get(key)
+            if route is not None:
+                routes[external_id] = route
+            elif self._misses.get(key, 0) <= now:
+                unknown.append(key)
+
+        metrics.incr("channel_routes.hits", len(routes))
+        if unknown and db is not None:
+            # Covers a connect on another worker whose invalidation event hasn't arrived yet
+            found = await self._load(db, unknown)
+            self._routes.update(found)
+            for key in unknown:
+                if key in found:
+                    routes[key[1]] = found[key]
+                else:
+                    self._misses[key] = now + settings.CHANNEL_ROUTES_MISS_TTL
+            metrics.incr("channel_routes.misses", len(unknown))
+        return routes
+
+    async def get(self, channel_type, external_id: str, db: AsyncSession = None) -> Optional[ChannelRoute]:
+        return (await self.get_many(channel_type, [external_id], db)).get(external_id)
+
+    async def invalidate(self):
+        """Drop the table on every worker after a channel is connected, removed or toggled"""
+        self._expires_at = 0.0
+        try:
+            await event_bus.publish(CHANNEL_ROUTES_TOPIC, {"event": "invalidate"})
+        except Exception:
+            # The TTL still bounds staleness on the other workers
+            logger.exception("Failed to publish channel route invalidation")
+
+    async def _listen(self):
+        while True:
+            try:
+                async with event_bus.subscribe(CHANNEL_ROUTES_TOPIC) as events:
+                    async for _ in events:
+                        self._expires_at = 0.0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Channel route listener failed; resubscribing")
+                self._expires_at = 0.0
+                await asyncio.sleep(1)
+
+channel_routes = ChannelRoutingTable(settings.CHANNEL_ROUTES_TTL)
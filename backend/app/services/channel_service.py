@@ -1,10 +1,81 @@
-import httpx
 from typing import Optional
+
+import httpx
+
 from app.core.config import settings
+from app.core.http_client import http_client
+
+# Graph error codes that signal throttling rather than a bad request
+# (app/account rate limits, Cloud API throughput, spam and pair rate limits)
+THROTTLING_ERROR_CODES = {4, 80007, 130429, 131048, 131056}
+
+class ChannelAPIError(Exception):
+    """Non-2xx response from a channel API"""
+
+    def __init__(self, status_code: int, message: str, code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        """Worth retrying: rate limited or a server-side failure"""
+        return self.status_code == 429 or self.status_code >= 500 or self.code in THROTTLING_ERROR_CODES
+
+    @property
+    def throttled(self) -> bool:
+        return self.status_code == 429 or self.code in THROTTLING_ERROR_CODES
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed send is worth retrying: throttled, a server-side failure or a network error"""
+    if isinstance(error, ChannelAPIError):
+        return error.transient
+    return isinstance(error, httpx.TransportError)
+
+def message_id_from_response(response: dict) -> Optional[str]:
+    """Channel message id of a send: WhatsApp returns messages[0].id, Messenger/Instagram message_id"""
+    messages = response.get("messages")
+    if messages:
+        return messages[0].get("id")
+    return response.get("message_id")
+
+class GraphAPIService:
+    @property
+    def BASE_URL(self) -> str:
+        return settings.GRAPH_API_BASE_URL
 
-class WhatsAppService:
-    BASE_URL = "https://graph.facebook.com/v18.0"
-    
+    async def _post(self, path: str, access_token: str, payload: dict) -> dict:
+        """POST to the Graph API over the shared connection pool
+
+        Raises ChannelAPIError on non-2xx responses.
+        """
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+
+        response = await http_client.client.post(
+            f"{self.BASE_URL}/{path}",
+            json=payload,
+            headers=headers
+        )
+        if response.is_success:
+            return response.json()
+
+        try:
+            error = response.json().get("error", {})
+        except ValueError:
+            error = {}
+        retry_after = response.headers.get("retry-after")
+        raise ChannelAPIError(
+            response.status_code,
+            error.get("message") or response.reason_phrase,
+            code=error.get("code"),
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+        )
+
+class WhatsAppService(GraphAPIService):
     async def send_message(
         self,
         phone_number_id: str,
@@ -13,24 +84,15 @@ class WhatsAppService:
         message: str
     ) -> dict:
         """Send WhatsApp message"""
-        url = f"{self.BASE_URL}/{phone_number_id}/messages"
-        
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "messaging_product": "whatsapp",
             "to": to,
             "type": "text",
             "text": {"body": message}
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            return response.json()
-    
+
+        return await self._post(f"{phone_number_id}/messages", access_token, payload)
+
     async def send_template_message(
         self,
         phone_number_id: str,
@@ -40,13 +102,6 @@ class WhatsAppService:
         language_code: str = "en"
     ) -> dict:
         """Send WhatsApp template message"""
-        url = f"{self.BASE_URL}/{phone_number_id}/messages"
-        
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "messaging_product": "whatsapp",
             "to": to,
@@ -56,14 +111,10 @@ class WhatsAppService:
                 "language": {"code": language_code}
             }
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            return response.json()
 
-class InstagramService:
-    BASE_URL = "https://graph.facebook.com/v18.0"
-    
+        return await self._post(f"{phone_number_id}/messages", access_token, payload)
+
+class InstagramService(GraphAPIService):
     async def send_message(
         self,
         page_id: str,
@@ -72,25 +123,14 @@ class InstagramService:
         message: str
     ) -> dict:
         """Send Instagram Direct message"""
-        url = f"{self.BASE_URL}/{page_id}/messages"
-        
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "recipient": {"id": recipient_id},
             "message": {"text": message}
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            return response.json()
 
-class MessengerService:
-    BASE_URL = "https://graph.facebook.com/v18.0"
-    
+        return await self._post(f"{page_id}/messages", access_token, payload)
+
+class MessengerService(GraphAPIService):
     async def send_message(
         self,
         page_id: str,
@@ -99,21 +139,12 @@ class MessengerService:
         message: str
     ) -> dict:
         """Send Messenger message"""
-        url = f"{self.BASE_URL}/{page_id}/messages"
-        
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "recipient": {"id": recipient_id},
             "message": {"text": message}
         }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            return response.json()
+
+        return await self._post(f"{page_id}/messages", access_token, payload)
 
 whatsapp_service = WhatsAppService()
 instagram_service = InstagramService()
@@ -0,0 +1,423 @@
+import asyncio
+import csv
+import io
+import logging
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, Text, cast, delete, distinct, func, literal, select, update
+)
+from sqlalchemy.dialects.postgresql import insert, JSONB, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.contact import Contact, ContactStage
+from app.services.jobs import Job, JobStatus, job_store
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Plain text columns copied as-is (after trimming), with their maximum lengths
+TEXT_COLUMNS = {
+    "first_name": 100,
+    "last_name": 100,
+    "company": 255,
+    "job_title": 255,
+    "notes": None
+}
+CUSTOM_FIELD_PREFIX = "custom_fields."
+
+EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+NON_DIGITS = re.compile(r"[^0-9]")
+TAG_SEPARATORS = re.compile(r"[;,]")
+
+# Rows are COPYed here, matched to existing contacts, then merged into contacts in one transaction
+staging = Table(
+    "contact_import_staging",
+    MetaData(),
+    Column("row_number", Integer, nullable=False),
+    Column("email", String),
+    Column("phone", String),
+    Column("phone_digits", String),
+    Column("whatsapp_id", String),
+    Column("first_name", String),
+    Column("last_name", String),
+    Column("company", String),
+    Column("job_title", String),
+    Column("notes", Text),
+    Column("stage", String),
+    Column("tags", JSONB),
+    Column("custom_fields", JSONB),
+    Column("contact_id", UUID(as_uuid=True)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP"
+)
+COPY_COLUMNS = [column.name for column in staging.columns if column.name != "contact_id"]
+
+class ImportRowError(ValueError):
+    pass
+
+def normalize_email(value) -> Optional[str]:
+    value = _text(value)
+    if value is None:
+        return None
+    value = value.lower()
+    if len(value) > 255 or not EMAIL.match(value):
+        raise ImportRowError(f"Invalid email '{value}'")
+    return value
+
+def normalize_phone(value) -> Optional[str]:
+    """'+1 (555) 010-0000' / '001 555 010 0000' -> '+15550100000' (E.164 digits)"""
+    value = _text(value)
+    if value is None:
+        return None
+    digits = NON_DIGITS.sub("", value)
+    if not value.startswith("+") and digits.startswith("00"):
+        digits = digits[2:]
+    if not 7 <= len(digits) <= 15:
+        raise ImportRowError(f"Invalid phone number '{value}'")
+    return f"+{digits}"
+
+def normalize_whatsapp_id(value) -> Optional[str]:
+    value = _text(value)
+    if value is None:
+        return None
+    digits = NON_DIGITS.sub("", value)
+    if not 7 <= len(digits) <= 15:
+        raise ImportRowError(f"Invalid whatsapp_id '{value}'")
+    return digits
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _tags(value) -> Optional[List[str]]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = TAG_SEPARATORS.split(value)
+    if not isinstance(value, list):
+        raise ImportRowError("tags must be a list or a ';'-separated string")
+    tags = list(dict.fromkeys(tag for tag in (_text(tag) for tag in value) if tag))
+    return tags or None
+
+def _stage(value) -> str:
+    value = _text(value)
+    if value is None:
+        return ContactStage.LEAD.name
+    try:
+        return ContactStage(value.lower()).name
+    except ValueError:
+        raise ImportRowError(f"Invalid stage '{value}'; use one of {', '.join(s.value for s in ContactStage)}")
+
+def normalize_row(row_number: int, data: dict) -> tuple:
+    """Validate one parsed row into a staging record (COPY_COLUMNS order)"""
+    email = normalize_email(data.get("email"))
+    phone = normalize_phone(data.get("phone"))
+    whatsapp_id = normalize_whatsapp_id(data.get("whatsapp_id"))
+
+    values = {}
+    for name, max_length in TEXT_COLUMNS.items():
+        value = _text(data.get(name))
+        if value is not None and max_length and len(value) > max_length:
+            raise ImportRowError(f"{name} is longer than {max_length} characters")
+        values[name] = value
+
+    if not (email or phone or whatsapp_id or values["first_name"] or values["last_name"]):
+        raise ImportRowError("Row has no name, email, phone or whatsapp_id")
+
+    custom_fields = data.get("custom_fields") or {}
+    if not isinstance(custom_fields, dict):
+        raise ImportRowError("custom_fields must be an object")
+    tags = _tags(data.get("tags"))
+
+    return (
+        row_number,
+        email,
+        phone,
+        phone[1:] if phone else None,
+        whatsapp_id,
+        values["first_name"],
+        values["last_name"],
+        values["company"],
+        values["job_title"],
+        values["notes"],
+        _stage(data.get("stage")),
+        # JSONB goes through COPY as text
+        orjson.dumps(tags).decode() if tags else None,
+        orjson.dumps(custom_fields).decode() if custom_fields else None
+    )
+
+def _csv_rows(binary: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+    text_file = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    try:
+        for row_number, row in enumerate(csv.DictReader(text_file), start=1):
+            if None in row:
+                yield row_number, ImportRowError("Row has more cells than the header")
+                continue
+            data = {}
+            custom_fields = {}
+            for key, value in row.items():
+                key = key.strip().lower()
+                if key.startswith(CUSTOM_FIELD_PREFIX):
+                    if value not in (None, ""):
+                        custom_fields[key[len(CUSTOM_FIELD_PREFIX):]] = value
+                else:
+                    data[key] = value
+            data["custom_fields"] = custom_fields
+            yield row_number, data
+    finally:
+        # Collecting the wrapper would close the file under ImportReader
+        text_file.detach()
+
+def _ndjson_rows(binary: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+    for row_number, line in enumerate(binary, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row_number, ImportRowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            yield row_number, ImportRowError("Line is not a JSON object")
+            continue
+        yield row_number, data
+
+ROW_READERS = {"csv": _csv_rows, "ndjson": _ndjson_rows}
+
+class ImportReader:
+    """Parses an upload incrementally into chunks of normalized, deduplicated staging records
+
+    Only one chunk is in memory at a time. Rows repeating the email, phone or whatsapp_id of an
+    earlier row in the same chunk are reported as duplicates; repeats across chunks are merged
+    into the contact the earlier chunk created, like any other existing contact.
+    """
+
+    def __init__(self, path: str, import_format: str):
+        self._file = open(path, "rb")
+        self._rows = ROW_READERS[import_format](self._file)
+
+    @property
+    def position(self) -> int:
+        """Bytes consumed so far (progress against the file size)"""
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+    def next_chunk(self, size: int) -> Tuple[List[tuple], List[dict], int]:
+        """-> (records, row errors, rows read); no rows read means the file is exhausted"""
+        records: List[tuple] = []
+        errors: List[dict] = []
+        seen: Dict[str, int] = {}
+        read = 0
+
+        for row_number, data in self._rows:
+            read += 1
+            try:
+                if isinstance(data, ImportRowError):
+                    raise data
+                record = normalize_row(row_number, data)
+            except ImportRowError as e:
+                errors.append({"row": row_number, "error": str(e)})
+            else:
+                keys = _dedupe_keys(record)
+                duplicate_of = next((seen[key] for key in keys if key in seen), None)
+                if duplicate_of is not None:
+                    errors.append({"row": row_number, "error": f"Duplicate of row {duplicate_of}"})
+                else:
+                    seen.update(dict.fromkeys(keys, row_number))
+                    records.append(record)
+            if read >= size:
+                break
+
+        return records, errors, read
+
+def _dedupe_keys(record: tuple) -> Set[str]:
+    _, email, _, phone_digits, whatsapp_id = record[:5]
+    keys = set()
+    if email:
+        keys.add(f"email:{email}")
+    # A whatsapp_id is the phone number's digits, so both share one key space
+    for digits in (phone_digits, whatsapp_id):
+        if digits:
+            keys.add(f"phone:{digits}")
+    return keys
+
+async def _copy_to_staging(db: AsyncSession, records: List[tuple]):
+    connection = await db.connection()
+    await connection.run_sync(staging.create)
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(staging.name, records=records, columns=COPY_COLUMNS)
+
+async def _match_existing(db: AsyncSession, workspace_id: uuid.UUID):
+    """Point staging rows at the existing contact sharing a whatsapp_id, email or phone"""
+    matches = (
+        (staging.c.whatsapp_id, Contact.whatsapp_id),
+        (staging.c.phone_digits, Contact.whatsapp_id),
+        (staging.c.email, func.lower(Contact.email)),
+        (staging.c.phone_digits, Contact.phone_digits)
+    )
+    # One indexed join per key, strongest identity first
+    for staged, existing in matches:
+        await db.execute(
+            update(staging)
+            .where(
+                staging.c.contact_id.is_(None),
+                staged.isnot(None),
+                Contact.workspace_id == workspace_id,
+                existing == staged
+            )
+            .values(contact_id=Contact.id)
+        )
+
+async def _drop_shared_matches(db: AsyncSession) -> List[dict]:
+    """Drop rows matched to a contact an earlier row of the chunk already matched; -> row errors
+
+    Each matched their own key (say one by email, one by phone), but UPDATE ... FROM applies
+    only one arbitrary row per contact, so the later ones are reported like in-file duplicates.
+    """
+    ranked = select(
+        staging.c.row_number,
+        func.min(staging.c.row_number).over(partition_by=staging.c.contact_id).label("first_row")
+    ).where(staging.c.contact_id.isnot(None)).subquery()
+    result = await db.execute(
+        delete(staging)
+        .where(staging.c.row_number == ranked.c.row_number, ranked.c.row_number > ranked.c.first_row)
+        .returning(staging.c.row_number, ranked.c.first_row)
+    )
+    return [
+        {"row": row_number, "error": f"Duplicate of row {first_row}"}
+        for row_number, first_row in sorted(result.all())
+    ]
+
+async def _update_existing(db: AsyncSession) -> int:
+    """Fill in blanks of matched contacts; values already on the contact win"""
+    tags = func.jsonb_array_elements_text(
+        func.coalesce(Contact.tags, cast(literal("[]"), JSONB)).op("||")(staging.c.tags)
+    ).table_valued("value")
+    merged_tags = select(func.jsonb_agg(distinct(tags.c.value))).correlate(Contact, staging).scalar_subquery()
+
+    values = {
+        name: func.coalesce(getattr(Contact, name), staging.c[name])
+        for name in ("email", "phone", "whatsapp_id", *TEXT_COLUMNS)
+    }
+    result = await db.execute(
+        update(Contact)
+        .where(Contact.id == staging.c.contact_id)
+        .values(
+            **values,
+            tags=func.coalesce(merged_tags, Contact.tags),
+            custom_fields=func.coalesce(staging.c.custom_fields, cast(literal("{}"), JSONB)).op("||")(
+                func.coalesce(Contact.custom_fields, cast(literal("{}"), JSONB))
+            ),
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def _insert_new(db: AsyncSession, workspace_id: uuid.UUID) -> int:
+    now = datetime.utcnow()
+    new_contacts = select(
+        func.gen_random_uuid(),
+        literal(workspace_id, UUID(as_uuid=True)),
+        staging.c.email,
+        staging.c.phone,
+        staging.c.whatsapp_id,
+        *(staging.c[name] for name in TEXT_COLUMNS),
+        cast(staging.c.stage, Contact.__table__.c.stage.type),
+        literal(0),
+        func.coalesce(staging.c.tags, cast(literal("[]"), JSONB)),
+        func.coalesce(staging.c.custom_fields, cast(literal("{}"), JSONB)),
+        literal(now),
+        literal(now)
+    ).where(staging.c.contact_id.is_(None))
+
+    result = await db.execute(
+        insert(Contact.__table__)
+        .from_select(
+            [
+                "id", "workspace_id", "email", "phone", "whatsapp_id", *TEXT_COLUMNS,
+                "stage", "lead_score", "tags", "custom_fields", "created_at", "updated_at"
+            ],
+            new_contacts
+        )
+        # A channel message may have created the contact since it was matched
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
+
+async def merge_chunk(
+    db: AsyncSession, workspace_id: uuid.UUID, records: List[tuple]
+) -> Tuple[int, int, List[dict]]:
+    """COPY records into staging and merge them into contacts (commits)
+
+    -> (created, updated, errors of rows that were not merged)
+    """
+    await _copy_to_staging(db, records)
+    await _match_existing(db, workspace_id)
+    errors = await _drop_shared_matches(db)
+    updated = await _update_existing(db)
+    created = await _insert_new(db, workspace_id)
+    await db.commit()
+    return created, updated, errors
+
+async def import_contacts(path: str, import_format: str, workspace_id: uuid.UUID, job: Job) -> dict:
+    """Stream an uploaded CSV/NDJSON file into contacts, one COPY + merge transaction per chunk"""
+    counts = {"rows": 0, "created": 0, "updated": 0, "invalid": 0}
+    reader = ImportReader(path, import_format)
+    try:
+        async with AsyncSessionLocal() as db:
+            while True:
+                # Parsing and normalizing is CPU work; keep it off the event loop
+                records, errors, read = await asyncio.to_thread(reader.next_chunk, settings.CONTACT_IMPORT_CHUNK)
+                if not read:
+                    break
+                if records:
+                    created, updated, merge_errors = await merge_chunk(db, workspace_id, records)
+                    counts["created"] += created
+                    counts["updated"] += updated
+                    errors.extend(merge_errors)
+
+                counts["rows"] += read
+                counts["invalid"] += len(errors)
+                for error in errors:
+                    job.add_error(error)
+                job.processed = reader.position
+                job.result = dict(counts)
+                await job_store.save(job)
+    finally:
+        reader.close()
+    return counts
+
+async def run_contact_import(job_id: str, workspace_id: str, path: str, import_format: str):
+    """Background half of the streaming import endpoint; removes the spooled upload when done"""
+    job = await job_store.get(job_id)
+    job.status = JobStatus.RUNNING
+    await job_store.save(job)
+
+    try:
+        counts = await import_contacts(path, import_format, uuid.UUID(str(workspace_id)), job)
+    except Exception as e:
+        logger.exception("Contact import %s failed", job_id)
+        job.status = JobStatus.FAILED
+        job.error = str(e)
+    else:
+        job.status = JobStatus.COMPLETED
+        job.result = counts
+        job.processed = job.total or job.processed
+    finally:
+        os.unlink(path)
+    await job_store.save(job)
@@ -0,0 +1,84 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import text
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+from uuid import UUID
+
+from app.models.conversation import Conversation, ChannelType, ConversationStatus, OPEN_CONVERSATION_PREDICATE
+from app.models.contact import Contact
+
+CHANNEL_ID_COLUMNS = {
+    ChannelType.WHATSAPP: Contact.whatsapp_id,
+    ChannelType.INSTAGRAM: Contact.instagram_id,
+    ChannelType.MESSENGER: Contact.messenger_id,
+}
+
+async def resolve_contacts(
+    db: AsyncSession,
+    channel: ChannelType,
+    keys: Iterable[Tuple[UUID, str]]
+) -> Dict[Tuple[UUID, str], UUID]:
+    """Find-or-create contacts by (workspace_id, channel identity) in one upsert statement"""
+    column = CHANNEL_ID_COLUMNS[channel]
+    # Sorted so concurrent batches lock conflicting rows in the same order
+    keys = sorted(set(keys), key=lambda key: (str(key[0]), key[1]))
+    if not keys:
+        return {}
+
+    rows = []
+    for workspace_id, external_id in keys:
+        row = {"workspace_id": workspace_id, column.key: external_id}
+        if channel == ChannelType.WHATSAPP:
+            row["phone"] = external_id
+        rows.append(row)
+
+    # Core insert against the table so the batch runs as one executemany with RETURNING
+    stmt = insert(Contact.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Contact.workspace_id, column],
+        index_where=column.isnot(None),
+        # No-op update so RETURNING also yields the pre-existing rows
+        set_={column.key: stmt.excluded[column.key]}
+    ).returning(Contact.workspace_id, column, Contact.id)
+
+    result = await db.execute(stmt, rows)
+    return {(workspace_id, external_id): contact_id for workspace_id, external_id, contact_id in result.all()}
+
+async def resolve_conversations(
+    db: AsyncSession,
+    channel: ChannelType,
+    contacts: Iterable[Tuple[UUID, UUID, str]],
+    last_message_at: datetime = None
+) -> Dict[UUID, UUID]:
+    """Find-or-create the open conversation of each (workspace_id, contact_id, channel_conversation_id)
+
+    Also bumps last_message_at on conversations that already existed, so no separate UPDATE is needed.
+    """
+    contacts = sorted({(workspace_id, contact_id): conversation_key
+                       for workspace_id, contact_id, conversation_key in contacts}.items(),
+                      key=lambda item: str(item[0][1]))
+    if not contacts:
+        return {}
+
+    last_message_at = last_message_at or datetime.utcnow()
+    rows = [
+        {
+            "workspace_id": workspace_id,
+            "contact_id": contact_id,
+            "channel": channel,
+            "channel_conversation_id": conversation_key,
+            "status": ConversationStatus.ACTIVE,
+            "last_message_at": last_message_at
+        }
+        for (workspace_id, contact_id), conversation_key in contacts
+    ]
+    stmt = insert(Conversation.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Conversation.workspace_id, Conversation.contact_id, Conversation.channel],
+        index_where=text(OPEN_CONVERSATION_PREDICATE),
+        set_={"last_message_at": stmt.excluded.last_message_at}
+    ).returning(Conversation.contact_id, Conversation.id)
+
+    result = await db.execute(stmt, rows)
+    return dict(result.all())
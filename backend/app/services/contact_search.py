@@ -0,0 +1,66 @@
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import or_, func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.contact import Contact
+from app.services.segments import false_clause
+
+# Something a user types when looking for a phone number: digits and phone punctuation only
+PHONE_QUERY = re.compile(r"^\+?[\d\s().\-]+$")
+NON_DIGITS = re.compile(r"[^0-9]")
+# Characters with a meaning in tsquery syntax; terms are split on them
+TSQUERY_SEPARATORS = re.compile(r"[\s&|!():*<>'\\]+")
+
+MIN_PHONE_DIGITS = 3
+MIN_SUFFIX_DIGITS = 4
+# Trigram indexes only help with at least one full trigram
+MIN_SUBSTRING_LENGTH = 3
+MAX_TERMS = 8
+
+def prefix_tsquery(search: str) -> Optional[str]:
+    """'ada lov' -> "'ada':* & 'lov':*" (every term must prefix-match a word)"""
+    terms = [term for term in TSQUERY_SEPARATORS.split(search.lower()) if term][:MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"'{term}':*" for term in terms)
+
+def _phone_clause(digits: str) -> ColumnElement:
+    clauses = [
+        Contact.phone_digits.startswith(digits, autoescape=True),
+        Contact.whatsapp_id == digits
+    ]
+    if len(digits) >= MIN_SUFFIX_DIGITS:
+        # National numbers and trailing digits, via the reverse(phone_digits) index
+        clauses.append(func.reverse(Contact.phone_digits).startswith(digits[::-1], autoescape=True))
+    return or_(*clauses)
+
+def contact_search(search: str, autocomplete: bool = False) -> Tuple[ColumnElement, List[ColumnElement]]:
+    """Predicate and ORDER BY for a free-text contact search
+
+    Phone-looking input matches phone digits by prefix or suffix. Anything else matches the
+    search document by word prefix (GIN tsvector index) or, for full search, as a substring of
+    name, email and company (GIN trigram index); results are ranked by field weight and then by
+    similarity. Autocomplete only uses word prefixes, the cheapest and most selective match.
+    """
+    search = search.strip()
+    digits = NON_DIGITS.sub("", search)
+    if PHONE_QUERY.match(search) and len(digits) >= MIN_PHONE_DIGITS:
+        return _phone_clause(digits), [Contact.phone_digits, Contact.id]
+
+    query = prefix_tsquery(search)
+    clauses = []
+    ranking = []
+    if query is not None:
+        tsquery = func.to_tsquery(literal_column("'simple'"), query)
+        clauses.append(Contact.search_vector.op("@@")(tsquery))
+        ranking.append(func.ts_rank_cd(Contact.search_vector, tsquery).desc())
+
+    if not autocomplete and len(search) >= MIN_SUBSTRING_LENGTH:
+        clauses.append(Contact.search_text.contains(search.lower(), autoescape=True))
+        ranking.append(func.similarity(Contact.search_text, search.lower()).desc())
+
+    if not clauses:
+        return false_clause(), [Contact.id]
+    return or_(*clauses), [*ranking, Contact.id]
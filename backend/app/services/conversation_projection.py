@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, func, or_, select, tuple_, update, values, column, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation, Message, MessageRole
+
+# Characters of the latest message kept on its conversation for the inbox list
+PREVIEW_LENGTH = 140
+
+def message_preview(content: str) -> str:
+    preview = " ".join((content or "").split())
+    return preview if len(preview) <= PREVIEW_LENGTH else preview[:PREVIEW_LENGTH - 1] + "…"
+
+async def apply_new_messages(db: AsyncSession, messages: Iterable) -> Dict[uuid.UUID, int]:
+    """Fold newly inserted messages into their conversations' list projection (caller commits)
+
+    messages are Message rows or RETURNING rows with conversation_id, role, content and
+    created_at. One UPDATE ... FROM (VALUES ...) adds to the counts and moves the preview to each
+    conversation's newest message; counts are increments, so concurrent writers never lose one.
+    Returns each conversation's unread count.
+    """
+    summaries: Dict[uuid.UUID, list] = {}
+    for message in messages:
+        summary = summaries.setdefault(message.conversation_id, [0, 0, None])
+        summary[0] += 1
+        if message.role == MessageRole.USER:
+            summary[1] += 1
+        if summary[2] is None or message.created_at >= summary[2].created_at:
+            summary[2] = message
+    if not summaries:
+        return {}
+
+    v = values(
+        column("conversation_id", UUID(as_uuid=True)),
+        column("added", Integer),
+        column("unread", Integer),
+        column("preview", String),
+        column("role", Conversation.__table__.c.last_message_role.type),
+        column("created_at", DateTime),
+        name="m"
+    ).data([
+        (conversation_id, added, unread, message_preview(latest.content), latest.role, latest.created_at)
+        # Same lock order in every transaction
+        for conversation_id, (added, unread, latest) in sorted(summaries.items(), key=lambda item: str(item[0]))
+    ])
+    # SET expressions all read the row as it was before this UPDATE
+    newer = or_(Conversation.last_message_preview.is_(None), Conversation.last_message_at.is_(None),
+                v.c.created_at >= Conversation.last_message_at)
+    result = await db.execute(
+        update(Conversation)
+        .where(Conversation.id == v.c.conversation_id)
+        .values(
+            message_count=Conversation.message_count + v.c.added,
+            unread_count=Conversation.unread_count + v.c.unread,
+            last_message_preview=case((newer, v.c.preview), else_=Conversation.last_message_preview),
+            last_message_role=case((newer, v.c.role), else_=Conversation.last_message_role),
+            last_message_at=func.greatest(Conversation.last_message_at, v.c.created_at)
+        )
+        .returning(Conversation.id, Conversation.unread_count)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(result.all())
+
+async def mark_read(
+    db: AsyncSession,
+    workspace_id,
+    conversation_ids: Iterable,
+    up_to: Optional[datetime] = None,
+    up_to_id: Optional[uuid.UUID] = None
+) -> Dict[uuid.UUID, int]:
+    """Mark the contact's messages in the workspace's conversations read (caller commits)
+
+    With up_to, only messages up to that point of the history are marked: created at or before
+    up_to, or at or before the message (up_to, up_to_id) when an id is given. A single statement:
+    the message UPDATE runs in a CTE whose flipped rows lower each unread_count by exactly their
+    number, so a message arriving concurrently stays counted. Returns the new unread count of
+    every conversation that had messages flipped.
+    """
+    conversations = select(Conversation.id).where(
+        Conversation.workspace_id == workspace_id,
+        Conversation.id.in_(list(conversation_ids))
+    )
+    flip = (
+        update(Message)
+        .where(
+            Message.conversation_id.in_(conversations),
+            Message.role == MessageRole.USER,
+            Message.is_read.is_(False)
+        )
+        .values(is_read=True)
+        .returning(Message.conversation_id)
+    )
+    if up_to_id is not None:
+        flip = flip.where(tuple_(Message.created_at, Message.id) <= (up_to, up_to_id))
+    elif up_to is not None:
+        flip = flip.where(Message.created_at <= up_to)
+    flipped = flip.cte("flipped")
+    counts = (
+        select(flipped.c.conversation_id, func.count().label("flipped"))
+        .group_by(flipped.c.conversation_id)
+        .subquery("counts")
+    )
+    result = await db.execute(
+        update(Conversation)
+        .add_cte(flipped)
+        .where(Conversation.id == counts.c.conversation_id)
+        .values(unread_count=func.greatest(Conversation.unread_count - counts.c.flipped, 0))
+        .returning(Conversation.id, Conversation.unread_count)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(result.all())
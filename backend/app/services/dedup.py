@@ -0,0 +1,94 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import redis_manager
+
+logger = logging.getLogger(__name__)
+
+class RedisDeduplicator:
+    """Pre-filter of already-ingested channel message ids backed by expiring Redis keys
+
+    Ids are only recorded after the ingest transaction commits, so a failed batch is never
+    suppressed on redelivery. The filter is advisory: concurrent duplicates that slip past it
+    are dropped by the unique index on messages.
+    """
+
+    def __init__(self, prefix: str, ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, channel: str, message_id: str) -> str:
+        return f"{self.prefix}:{channel}:{message_id}"
+
+    async def seen(self, channel: str, message_ids: List[str]) -> Set[str]:
+        if not message_ids:
+            return set()
+        try:
+            values = await redis_manager.client.mget([self._key(channel, mid) for mid in message_ids])
+        except Exception:
+            logger.exception("Dedup pre-filter unavailable; relying on the unique index")
+            return set()
+        return {mid for mid, value in zip(message_ids, values) if value is not None}
+
+    async def mark_seen(self, channel: str, message_ids: Iterable[str]):
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+        try:
+            async with redis_manager.client.pipeline(transaction=False) as pipe:
+                for mid in message_ids:
+                    pipe.set(self._key(channel, mid), 1, ex=self.ttl)
+                await pipe.execute()
+        except Exception:
+            logger.exception("Failed to record ingested message ids")
+
+class InMemoryDeduplicator:
+    """Single-process pre-filter with the same interface"""
+
+    def __init__(self, ttl: int, max_size: int = 1000000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expires: Dict[tuple, float] = {}
+
+    async def seen(self, channel: str, message_ids: List[str]) -> Set[str]:
+        now = time.monotonic()
+        return {mid for mid in message_ids if self._expires.get((channel, mid), 0) > now}
+
+    async def mark_seen(self, channel: str, message_ids: Iterable[str]):
+        now = time.monotonic()
+        if len(self._expires) > self.max_size:
+            self._expires = {key: expires for key, expires in self._expires.items() if expires > now}
+        for mid in message_ids:
+            self._expires[(channel, mid)] = now + self.ttl
+
+def create_deduplicator():
+    if settings.DEDUP_BACKEND == "memory":
+        return InMemoryDeduplicator(settings.DEDUP_TTL_SECONDS)
+    return RedisDeduplicator("dedup", settings.DEDUP_TTL_SECONDS)
+
+message_dedup = create_deduplicator()
+
+async def filter_duplicates(channel: str, items: list, message_id) -> list:
+    """Drop items redelivered within the batch or already ingested according to the pre-filter"""
+    unique = {}
+    anonymous = []
+    for item in items:
+        mid = message_id(item)
+        if mid is None:
+            anonymous.append(item)
+        elif mid not in unique:
+            unique[mid] = item
+    in_batch = len(items) - len(unique) - len(anonymous)
+
+    seen = await message_dedup.seen(channel, list(unique))
+    fresh = anonymous + [item for mid, item in unique.items() if mid not in seen]
+
+    metrics.incr("dedup.checked", len(items))
+    if in_batch:
+        metrics.incr("dedup.in_batch_hits", in_batch)
+    if seen:
+        metrics.incr("dedup.prefilter_hits", len(seen))
+    return fresh
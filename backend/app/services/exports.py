@@ -0,0 +1,217 @@
+import csv
+import enum
+import io
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List
+
+import orjson
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.contact import Contact
+from app.models.conversation import Conversation, Message
+from app.models.deal import Deal
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+def _contacts(workspace_id: uuid.UUID) -> Select:
+    table = Contact.__table__
+    # Walks the (workspace_id, id) index, so rows start flowing without a sort
+    return (
+        select(*(table.c[name] for name in CONTACT_COLUMNS))
+        .where(table.c.workspace_id == workspace_id)
+        .order_by(table.c.id)
+    )
+
+def _deals(workspace_id: uuid.UUID) -> Select:
+    table = Deal.__table__
+    return select(*(table.c[name] for name in DEAL_COLUMNS)).where(table.c.workspace_id == workspace_id)
+
+def _conversation_messages(workspace_id: uuid.UUID) -> Select:
+    """One row per message, carrying its conversation's fields; conversations without messages are skipped"""
+    conversations = Conversation.__table__
+    messages = Message.__table__
+    return (
+        select(
+            conversations.c.id.label("conversation_id"),
+            conversations.c.contact_id,
+            conversations.c.channel,
+            conversations.c.status,
+            conversations.c.subject,
+            messages.c.id.label("message_id"),
+            messages.c.role,
+            messages.c.content,
+            messages.c.channel_message_id,
+            messages.c.attachments,
+            messages.c.is_read,
+            messages.c.created_at
+        )
+        .join(messages, messages.c.conversation_id == conversations.c.id)
+        .where(conversations.c.workspace_id == workspace_id)
+        # Per conversation, the (conversation_id, created_at, id) index yields messages in order
+        .order_by(conversations.c.id, messages.c.created_at, messages.c.id)
+    )
+
+CONTACT_COLUMNS = (
+    "id", "first_name", "last_name", "email", "phone", "company", "job_title", "whatsapp_id",
+    "instagram_id", "messenger_id", "stage", "lead_score", "tags", "custom_fields", "notes",
+    "last_contacted_at", "created_at", "updated_at"
+)
+DEAL_COLUMNS = (
+    "id", "contact_id", "assigned_user_id", "title", "description", "value", "currency", "stage",
+    "probability", "expected_close_date", "closed_at", "created_at", "updated_at"
+)
+
+# Entity -> workspace-scoped query; output columns are the query's selected columns
+EXPORTS: Dict[str, Callable[[uuid.UUID], Select]] = {
+    "contacts": _contacts,
+    "deals": _deals,
+    "conversations": _conversation_messages,
+}
+
+def export_query(entity: str, workspace_id: str) -> Select:
+    return EXPORTS[entity](uuid.UUID(str(workspace_id)))
+
+def _plain(value):
+    """Scalar for CSV/Parquet cells: ids and enums as text, JSON as JSON text"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+def _csv_cell(value):
+    value = _plain(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+class CsvEncoder:
+    def __init__(self, query: Select):
+        self.columns = [column.key for column in query.selected_columns]
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._write([self.columns])
+
+    def encode(self, rows) -> bytes:
+        return self._write([_csv_cell(value) for value in row] for row in rows)
+
+    def footer(self) -> bytes:
+        return b""
+
+class NdjsonEncoder:
+    def __init__(self, query: Select):
+        self.columns = [column.key for column in query.selected_columns]
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows) -> bytes:
+        columns = self.columns
+        return b"".join(
+            orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+        )
+
+    def footer(self) -> bytes:
+        return b""
+
+class ParquetEncoder:
+    """One row group per fetched batch, written through a sink that is drained after each one"""
+
+    def __init__(self, query: Select):
+        # Imported lazily: pyarrow is large and only needed for Parquet exports
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pyarrow = pyarrow
+        self.schema = pyarrow.schema([
+            (column.key, self._arrow_type(column.type)) for column in query.selected_columns
+        ])
+        self._sink = _ChunkSink()
+        self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def _arrow_type(self, column_type):
+        pyarrow = self._pyarrow
+        if isinstance(column_type, JSONB):
+            return pyarrow.string()
+        if isinstance(column_type, DateTime):
+            return pyarrow.timestamp("us")
+        if isinstance(column_type, Boolean):
+            return pyarrow.bool_()
+        if isinstance(column_type, Integer):
+            return pyarrow.int64()
+        if isinstance(column_type, Float):
+            return pyarrow.float64()
+        return pyarrow.string()
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows) -> bytes:
+        arrays = [
+            self._pyarrow.array([_plain(row[i]) for row in rows], type=field.type)
+            for i, field in enumerate(self.schema)
+        ]
+        self._writer.write_table(self._pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+ENCODERS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "parquet": ParquetEncoder}
+
+def create_encoder(export_format: str, query: Select):
+    """Raises ImportError for Parquet when pyarrow is missing, before any response is sent"""
+    return ENCODERS[export_format](query)
+
+async def stream_export(query: Select, encoder) -> AsyncIterator[bytes]:
+    """Yield the encoded export batch by batch from a server-side cursor
+
+    Memory stays at one batch (EXPORT_BATCH_SIZE rows) however large the export is. The stream
+    opens its own session: request-scoped sessions are closed before the body is sent.
+    """
+    yield encoder.header()
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield encoder.encode(rows)
+    yield encoder.footer()
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Dict, List, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.events import event_bus
+
+logger = logging.getLogger(__name__)
+
+# Realtime inbox events of one workspace: {"events": [{"type": ..., ...}, ...]}
+INBOX_TOPIC_PREFIX = "inbox:"
+
+def inbox_topic(workspace_id) -> str:
+    return f"{INBOX_TOPIC_PREFIX}{workspace_id}"
+
+def message_event(message) -> dict:
+    return {
+        "type": "message.created",
+        "conversation_id": str(message.conversation_id),
+        "message": {
+            "id": str(message.id),
+            "role": message.role.value,
+            "content": message.content,
+            "status": message.status.value if message.status else None,
+            "created_at": message.created_at.isoformat() if message.created_at else None
+        }
+    }
+
+def message_status_event(conversation_id, message_id, status, channel_message_id=None) -> dict:
+    return {
+        "type": "message.updated",
+        "conversation_id": str(conversation_id),
+        "message": {"id": str(message_id), "status": status.value, "channel_message_id": channel_message_id}
+    }
+
+def conversation_event(conversation_id, **changes) -> dict:
+    return {"type": "conversation.updated", "conversation_id": str(conversation_id), "changes": changes}
+
+async def publish_inbox_events(workspace_id, events: List[dict]):
+    """Publish a batch of events to every socket of the workspace, on every API worker"""
+    try:
+        await event_bus.publish(inbox_topic(workspace_id), {"events": events})
+    except Exception:
+        logger.exception("Failed to publish inbox events of workspace %s", workspace_id)
+
+def record_inbox_event(db: AsyncSession, workspace_id, event_data: dict):
+    """Publish the event once db's transaction commits (one message per workspace per commit)"""
+    db.info.setdefault("inbox_events", {}).setdefault(str(workspace_id), []).append(event_data)
+
+_publishing: Set[asyncio.Task] = set()
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session):
+    pending: Dict[str, List[dict]] = session.info.pop("inbox_events", None)
+    if not pending:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for workspace_id, events in pending.items():
+        task = loop.create_task(publish_inbox_events(workspace_id, events))
+        # Keep a reference until done so the task isn't collected mid-publish
+        _publishing.add(task)
+        task.add_done_callback(_publishing.discard)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session: Session):
+    session.info.pop("inbox_events", None)
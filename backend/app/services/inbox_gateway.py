@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.core.metrics import metrics
+from app.services.inbox_events import INBOX_TOPIC_PREFIX, publish_inbox_events
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_CLOSE_CODE = status.WS_1013_TRY_AGAIN_LATER
+
+class InboxConnection:
+    """One agent's socket: a bounded queue of encoded frames drained by a writer task"""
+
+    def __init__(self, websocket: WebSocket, workspace_id: str, user_id: str):
+        self.websocket = websocket
+        self.workspace_id = workspace_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+        self.evicted = False
+        self._typing_sent: Dict[Tuple[str, bool], float] = {}
+
+    def offer(self, frame: str) -> bool:
+        """Queue a frame without waiting; False when the queue is full"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def write(self):
+        while True:
+            frame = await self.queue.get()
+            # A socket that can't take a frame in time is as slow as one with a full queue
+            await asyncio.wait_for(self.websocket.send_text(frame), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+
+    def typing_allowed(self, conversation_id: str, is_typing: bool) -> bool:
+        """At most one started (and one stopped) typing event per conversation per WS_TYPING_INTERVAL_SECONDS"""
+        key = (conversation_id, is_typing)
+        now = time.monotonic()
+        if now - self._typing_sent.get(key, 0.0) < settings.WS_TYPING_INTERVAL_SECONDS:
+            return False
+        self._typing_sent[key] = now
+        return True
+
+class InboxGateway:
+    """Pushes workspace inbox events to the WebSockets connected to this worker
+
+    Each worker holds one pattern subscription to every workspace's inbox topic, however many
+    sockets it serves, and encodes each event batch once. Frames are handed to sockets through
+    bounded queues without waiting; a socket whose queue is full, or whose send times out, is
+    evicted so one slow client can't hold up the rest or grow memory without bound.
+    """
+
+    def __init__(self):
+        self._connections: Dict[str, Set[InboxConnection]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self._connections.values())
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        for connections in list(self._connections.values()):
+            for connection in list(connections):
+                self.evict(connection, status.WS_1001_GOING_AWAY)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with event_bus.subscribe(f"{INBOX_TOPIC_PREFIX}*") as events:
+                    async for topic, message in events:
+                        self.dispatch(topic[len(INBOX_TOPIC_PREFIX):], message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Inbox event listener failed; resubscribing")
+                await asyncio.sleep(1)
+
+    def dispatch(self, workspace_id: str, message: dict):
+        connections = self._connections.get(workspace_id)
+        if not connections:
+            return
+        frame = orjson.dumps(message).decode()
+        for connection in list(connections):
+            if not connection.offer(frame):
+                metrics.incr("ws.slow_consumer_evictions")
+                self.evict(connection, SLOW_CONSUMER_CLOSE_CODE)
+
+    def _register(self, connection: InboxConnection):
+        self._connections.setdefault(connection.workspace_id, set()).add(connection)
+        metrics.set_gauge("ws.connections", self.connection_count)
+
+    def _unregister(self, connection: InboxConnection):
+        connections = self._connections.get(connection.workspace_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.workspace_id]
+        metrics.set_gauge("ws.connections", self.connection_count)
+
+    def evict(self, connection: InboxConnection, code: int):
+        """Drop a connection now and close its socket in the background"""
+        if connection.evicted:
+            return
+        connection.evicted = True
+        self._unregister(connection)
+        if connection.writer:
+            connection.writer.cancel()
+        task = asyncio.create_task(self._close(connection, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _writer_done(self, connection: InboxConnection, writer: asyncio.Task):
+        if writer.cancelled():
+            return
+        if isinstance(writer.exception(), asyncio.TimeoutError):
+            metrics.incr("ws.slow_consumer_evictions")
+        # The send timed out or the socket broke
+        self.evict(connection, SLOW_CONSUMER_CLOSE_CODE)
+
+    async def _close(self, connection: InboxConnection, code: int):
+        try:
+            await asyncio.wait_for(connection.websocket.close(code=code), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            # Already gone, or too stuck to take a close frame; the read loop ends either way
+            pass
+
+    async def _handle(self, connection: InboxConnection, data: dict):
+        if data.get("type") == "typing":
+            conversation_id = data.get("conversation_id")
+            is_typing = bool(data.get("is_typing", True))
+            if isinstance(conversation_id, str) and connection.typing_allowed(conversation_id, is_typing):
+                await publish_inbox_events(connection.workspace_id, [{
+                    "type": "typing",
+                    "conversation_id": conversation_id,
+                    "user_id": connection.user_id,
+                    "is_typing": is_typing
+                }])
+        elif data.get("type") == "ping":
+            connection.offer('{"type":"pong"}')
+
+    async def serve(self, websocket: WebSocket, workspace_id: str, user_id: str):
+        """Run an accepted socket until the client leaves or is evicted"""
+        connection = InboxConnection(websocket, workspace_id, user_id)
+        connection.writer = asyncio.create_task(connection.write())
+        connection.writer.add_done_callback(lambda writer: self._writer_done(connection, writer))
+        self._register(connection)
+        try:
+            while not connection.evicted:
+                try:
+                    data = orjson.loads(await websocket.receive_text())
+                except orjson.JSONDecodeError:
+                    continue
+                if isinstance(data, dict):
+                    await self._handle(connection, data)
+        except (WebSocketDisconnect, RuntimeError):
+            # RuntimeError: receiving on a socket the gateway already closed
+            pass
+        finally:
+            if not connection.evicted:
+                connection.evicted = True
+                self._unregister(connection)
+                connection.writer.cancel()
+
+inbox_gateway = InboxGateway()
@@ -0,0 +1,94 @@
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+
+logger = logging.getLogger(__name__)
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+@dataclass
+class Job:
+    """Progress record of a long-running operation started by a request"""
+    id: str
+    kind: str
+    workspace_id: str
+    status: str = JobStatus.QUEUED
+    total: Optional[int] = None
+    processed: int = 0
+    result: Dict[str, Any] = field(default_factory=dict)
+    errors: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def progress(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(1.0, self.processed / self.total)
+
+    def add_error(self, error: dict):
+        # Keep the record small; the count is still reported in result
+        if len(self.errors) < settings.JOB_MAX_ERRORS:
+            self.errors.append(error)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["progress"] = self.progress
+        return data
+
+class RedisJobStore:
+    """Job records as expiring JSON values, readable from any worker"""
+
+    def __init__(self, prefix: str, ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def save(self, job: Job):
+        job.updated_at = time.time()
+        await redis_manager.client.set(f"{self.prefix}:{job.id}", orjson.dumps(asdict(job)), ex=self.ttl)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await redis_manager.client.get(f"{self.prefix}:{job_id}")
+        return Job(**orjson.loads(data)) if data else None
+
+class InMemoryJobStore:
+    """Single-process store with the same interface"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+
+    async def save(self, job: Job):
+        job.updated_at = time.time()
+        self._jobs[job.id] = Job(**asdict(job))
+        expired = [job_id for job_id, stored in self._jobs.items() if time.time() - stored.updated_at > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        return Job(**asdict(job)) if job else None
+
+def create_job_store():
+    if settings.JOBS_BACKEND == "memory":
+        return InMemoryJobStore(settings.JOB_TTL_SECONDS)
+    return RedisJobStore("jobs", settings.JOB_TTL_SECONDS)
+
+job_store = create_job_store()
+
+async def create_job(kind: str, workspace_id: str, total: Optional[int] = None) -> Job:
+    job = Job(id=str(uuid.uuid4()), kind=kind, workspace_id=str(workspace_id), total=total)
+    await job_store.save(job)
+    return job
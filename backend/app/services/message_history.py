@@ -0,0 +1,36 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Message
+
+async def message_window(
+    db: AsyncSession,
+    conversation_id: str,
+    limit: int,
+    before: Optional[Message] = None,
+    after: Optional[Message] = None
+) -> Tuple[List[Message], bool]:
+    """Up to `limit` messages next to an anchor (or the latest), oldest first, and whether more exist beyond them
+
+    Walks the (conversation_id, created_at, id) index from the anchor, so the cost is the
+    window size however long the conversation is.
+    """
+    query = select(Message).where(Message.conversation_id == conversation_id)
+    position = tuple_(Message.created_at, Message.id)
+    if after is not None:
+        query = query.where(position > (after.created_at, after.id)).order_by(Message.created_at, Message.id)
+    else:
+        if before is not None:
+            query = query.where(position < (before.created_at, before.id))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+    # One extra row tells whether there is another page
+    result = await db.execute(query.limit(limit + 1))
+    messages = result.scalars().all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if after is None:
+        messages.reverse()
+    return messages, has_more
@@ -0,0 +1,272 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Set
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models.conversation import Message, ChannelType, MessageRole
+from app.services.channel_routes import channel_routes
+from app.services.contact_resolver import resolve_contacts, resolve_conversations
+from app.services.conversation_projection import apply_new_messages
+from app.services.dedup import filter_duplicates, message_dedup
+from app.services.inbox_events import message_event, record_inbox_event
+from app.services.status_ingest import StatusEvent, apply_status_events, status_retry_buffer, whatsapp_status_adapter
+
+@dataclass(frozen=True, slots=True)
+class InboundMessage:
+    """Channel-agnostic inbound message produced by the per-channel adapters"""
+    channel: ChannelType
+    account_id: str  # Channel.external_id: WhatsApp phone number ID, page or Instagram account ID
+    sender_id: str  # Contact identity on the channel (wa_id, PSID, IGSID)
+    text: str
+    message_id: str
+
+def whatsapp_adapter(data: dict) -> List[InboundMessage]:
+    """Normalize a WhatsApp Cloud API webhook payload"""
+    items = []
+    for entry in data.get("entry", []):
+        for change in entry.get("changes", []):
+            if change.get("field") == "messages":
+                value = change.get("value", {})
+                phone_number_id = value.get("metadata", {}).get("phone_number_id")
+
+                for message in value.get("messages", []):
+                    items.append(InboundMessage(
+                        channel=ChannelType.WHATSAPP,
+                        account_id=phone_number_id,
+                        sender_id=message.get("from"),
+                        text=message.get("text", {}).get("body", ""),
+                        message_id=message.get("id")
+                    ))
+    return items
+
+def _messaging_adapter(channel: ChannelType) -> Callable[[dict], List[InboundMessage]]:
+    def adapter(data: dict) -> List[InboundMessage]:
+        """Normalize a Messenger Platform / Instagram Messaging webhook payload"""
+        items = []
+        for entry in data.get("entry", []):
+            for event in entry.get("messaging", []):
+                message = event.get("message")
+                # Skip echoes of our own sends and non-message events (reads, reactions, postbacks)
+                if not message or message.get("is_echo"):
+                    continue
+
+                items.append(InboundMessage(
+                    channel=channel,
+                    account_id=event.get("recipient", {}).get("id") or entry.get("id"),
+                    sender_id=event.get("sender", {}).get("id"),
+                    text=message.get("text", ""),
+                    message_id=message.get("mid")
+                ))
+        return items
+    return adapter
+
+ADAPTERS = {
+    "whatsapp": whatsapp_adapter,
+    "instagram": _messaging_adapter(ChannelType.INSTAGRAM),
+    "messenger": _messaging_adapter(ChannelType.MESSENGER),
+}
+
+STATUS_ADAPTERS = {
+    "whatsapp": whatsapp_status_adapter,
+}
+
+async def _resolve_channel(
+    channel: ChannelType,
+    items: List[InboundMessage],
+    db: AsyncSession,
+    now: datetime,
+    conversation_workspaces: dict
+) -> list:
+    """Message rows for the items; fills conversation_workspaces with each conversation's workspace"""
+    # Resolve channels from the in-memory routing table
+    routes = await channel_routes.get_many(channel, {item.account_id for item in items}, db)
+    # Deliveries to a disabled channel are dropped
+    workspaces = {external_id: route.workspace_id for external_id, route in routes.items() if route.is_active}
+    items = [item for item in items if item.account_id in workspaces and item.sender_id]
+    if not items:
+        return []
+
+    # Resolve contacts and open conversations with one upsert each
+    contacts = await resolve_contacts(
+        db, channel,
+        ((workspaces[item.account_id], item.sender_id) for item in items)
+    )
+    conversations = await resolve_conversations(
+        db, channel,
+        ((workspace_id, contact_id, sender_id) for (workspace_id, sender_id), contact_id in contacts.items()),
+        last_message_at=now
+    )
+    for (workspace_id, sender_id), contact_id in contacts.items():
+        conversation_workspaces[conversations[contact_id]] = workspace_id
+
+    return [
+        {
+            "conversation_id": conversations[contacts[(workspaces[item.account_id], item.sender_id)]],
+            "role": MessageRole.USER,
+            "content": item.text,
+            "channel_message_id": item.message_id
+        }
+        for item in items
+    ]
+
+async def ingest_messages(items: List[InboundMessage], db: AsyncSession) -> int:
+    """Persist a batch of normalized inbound messages with set-based queries (caller commits)"""
+    by_channel: Dict[ChannelType, List[InboundMessage]] = {}
+    for item in items:
+        by_channel.setdefault(item.channel, []).append(item)
+
+    now = datetime.utcnow()
+    rows = []
+    conversation_workspaces = {}
+    for channel in list(by_channel):
+        # Drop webhook redeliveries before any DB work
+        by_channel[channel] = await filter_duplicates(channel.value, by_channel[channel], lambda item: item.message_id)
+        if by_channel[channel]:
+            rows.extend(await _resolve_channel(channel, by_channel[channel], db, now, conversation_workspaces))
+
+    if not rows:
+        return 0
+    # One clock reading for the batch, stepped per message so (created_at, id) keeps webhook order
+    for sequence, row in enumerate(rows):
+        row["created_at"] = now + timedelta(microseconds=sequence)
+
+    # Bulk insert the messages of every channel in one statement
+    result = await db.execute(
+        insert(Message.__table__)
+        .on_conflict_do_nothing(
+            index_elements=[Message.conversation_id, Message.channel_message_id],
+            index_where=Message.channel_message_id.isnot(None)
+        )
+        .returning(Message.id, Message.conversation_id, Message.role, Message.content, Message.status, Message.created_at),
+        rows
+    )
+    messages = result.all()
+    inserted = len(messages)
+    if inserted < len(rows):
+        metrics.incr("dedup.db_conflicts", len(rows) - inserted)
+
+    # Recorded in the pre-filter once the caller commits (see commit_ingest)
+    ingested = db.info.setdefault("ingested_message_ids", {})
+    for channel, channel_items in by_channel.items():
+        ingested.setdefault(channel.value, set()).update(item.message_id for item in channel_items if item.message_id)
+        metrics.incr(f"ingest.{channel.value}.messages", len(channel_items))
+
+    await apply_new_messages(db, messages)
+
+    # Pushed to the workspace's inbox sockets once the caller commits
+    for message in messages:
+        record_inbox_event(db, conversation_workspaces[message.conversation_id], message_event(message))
+
+    # TODO: Trigger AI response if enabled
+
+    return inserted
+
+async def ingest_statuses(events: List[StatusEvent], db: AsyncSession) -> int:
+    """Apply delivery status callbacks in bulk (caller commits)"""
+    updated, unmatched = await apply_status_events(events, db)
+    if unmatched:
+        # Retried after commit in case the sender hasn't written the message ids back yet
+        db.info.setdefault("unmatched_statuses", []).extend(unmatched)
+    return updated
+
+async def commit_ingest(db: AsyncSession):
+    """Commit an ingest transaction, then record its message ids in the dedup pre-filter"""
+    await db.commit()
+    for channel, message_ids in db.info.pop("ingested_message_ids", {}).items():
+        await message_dedup.mark_seen(channel, message_ids)
+    unmatched = db.info.pop("unmatched_statuses", None)
+    if unmatched:
+        status_retry_buffer.add(unmatched)
+
+def _payload_handler(adapter: Callable[[dict], List[InboundMessage]], status_adapter=None):
+    async def handler(payloads: List[dict], db: AsyncSession) -> int:
+        """Ingest the messages and status callbacks of one or more webhook deliveries as a single batch"""
+        items = []
+        statuses = []
+        for data in payloads:
+            items.extend(adapter(data))
+            if status_adapter:
+                statuses.extend(status_adapter(data))
+
+        count = await ingest_messages(items, db)
+        if statuses:
+            await ingest_statuses(statuses, db)
+        return count
+    return handler
+
+INGEST_HANDLERS = {
+    channel: _payload_handler(adapter, STATUS_ADAPTERS.get(channel))
+    for channel, adapter in ADAPTERS.items()
+}
+
+class IngestBatcher:
+    """Coalesces inline webhook deliveries arriving within a short window into one ingest batch"""
+
+    def __init__(self, handler, window_ms: int, max_payloads: int):
+        self.handler = handler
+        self.window = window_ms / 1000
+        self.max_payloads = max_payloads
+        self._pending = []
+        self._flush_handle = None
+        self._flushing: Set[asyncio.Task] = set()
+
+    async def submit(self, data: dict):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((data, future))
+
+        if len(self._pending) >= self.max_payloads:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(self.window)
+
+        await future
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(delay, self._start_flush, loop)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop):
+        task = loop.create_task(self._flush())
+        # Keep a reference until done so the task isn't collected mid-flush
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.handler([data for data, _ in batch], db)
+                await commit_ingest(db)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        metrics.observe("ingest.batch_payloads", len(batch))
+
+INGEST_BATCHERS = {
+    channel: IngestBatcher(handler, settings.WEBHOOK_BATCH_WINDOW_MS, settings.WEBHOOK_BATCH_SIZE)
+    for channel, handler in INGEST_HANDLERS.items()
+}
+
+async def ingest_webhook(channel: str, data: dict, db: AsyncSession):
+    """Inline ingest of one verified delivery, optionally coalesced with concurrent deliveries"""
+    if settings.WEBHOOK_BATCH_WINDOW_MS:
+        await INGEST_BATCHERS[channel].submit(data)
+    else:
+        await INGEST_HANDLERS[channel]([data], db)
+        await commit_ingest(db)
@@ -0,0 +1,375 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, exists, select, update, values, column, tuple_, String, DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.rate_limit import rate_limiters
+from app.core.retry import backoff_delay
+from app.models.channel import Channel, ChannelStatus, ChannelType
+from app.models.contact import Contact
+from app.models.conversation import (
+    ChannelType as ConversationChannel,
+    Conversation,
+    Message,
+    MessageRole,
+    MessageStatus,
+    OutboundMessage,
+    OutboundStatus
+)
+from app.services.broadcast_dispatcher import DESTINATION_COLUMNS
+from app.services.broadcast_ranges import INTERRUPTED_SEND_ERROR, WORKER_ID
+from app.services.channel_service import (
+    ChannelAPIError,
+    instagram_service,
+    is_transient_error,
+    message_id_from_response,
+    messenger_service,
+    whatsapp_service
+)
+from app.services.inbox_events import message_status_event, record_inbox_event
+
+logger = logging.getLogger(__name__)
+
+# Conversation channels with a send API; messages on other channels are stored only
+SENDABLE_CHANNELS = {channel_type.value for channel_type in DESTINATION_COLUMNS}
+
+# Recipient address of a conversation's contact on the conversation's channel
+DESTINATION = case(
+    *((Conversation.channel == ConversationChannel(channel_type.value), destination)
+      for channel_type, destination in DESTINATION_COLUMNS.items())
+)
+
+@dataclass(slots=True)
+class OutboundJob:
+    id: uuid.UUID
+    message_id: uuid.UUID
+    conversation_id: uuid.UUID
+    workspace_id: uuid.UUID
+    attempts: int  # Including the current one
+    channel: ChannelType
+    destination: Optional[str]
+    content: str
+
+@dataclass(slots=True)
+class DeliveryOutcome:
+    job: OutboundJob
+    status: OutboundStatus  # PENDING: retry at next_attempt_at
+    channel_message_id: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+def enqueue_outbound(db: AsyncSession, conversation: Conversation, message: Message) -> bool:
+    """Queue an agent's reply for delivery to the conversation's channel (caller commits)
+
+    The message must be flushed. Returns False for messages that stay in the inbox only: notes,
+    and conversations on channels without a send API.
+    """
+    if message.role != MessageRole.ASSISTANT or conversation.channel.value not in SENDABLE_CHANNELS:
+        return False
+    message.status = MessageStatus.PENDING
+    db.add(OutboundMessage(
+        message_id=message.id,
+        conversation_id=conversation.id,
+        workspace_id=conversation.workspace_id,
+        next_attempt_at=message.created_at,
+        created_at=message.created_at
+    ))
+    return True
+
+async def _send(channel: Channel, to: str, text: str) -> dict:
+    if channel.channel_type == ChannelType.WHATSAPP:
+        return await whatsapp_service.send_message(channel.external_id, channel.access_token, to, text)
+    if channel.channel_type == ChannelType.INSTAGRAM:
+        return await instagram_service.send_message(channel.external_id, channel.access_token, to, text)
+    return await messenger_service.send_message(channel.external_id, channel.access_token, to, text)
+
+class OutboundDeliveryPool:
+    """Workers that deliver queued inbox messages to their channels
+
+    Jobs are rows of outbound_messages, so they survive restarts and any number of API processes
+    can work the queue. A worker claims due jobs with FOR UPDATE SKIP LOCKED, taking only the
+    first unfinished job of each conversation: a conversation's messages go out one at a time,
+    in the order they were written, while different conversations are sent concurrently. Failed
+    sends are retried with jittered exponential backoff by rescheduling the job, so a retry holds
+    no worker in the meantime. Outcomes are written back in one transaction per batch.
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+        self._wakeup = asyncio.Event()
+
+    async def start(self, workers: int = None):
+        self._running = True
+        workers = workers or settings.OUTBOUND_WORKERS
+        for index in range(workers):
+            self._tasks.append(asyncio.create_task(self._run(f"outbound-{index}")))
+        self._tasks.append(asyncio.create_task(self._recover()))
+
+    async def stop(self):
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self):
+        """Start on newly committed jobs now rather than at the next poll"""
+        self._wakeup.set()
+
+    async def _idle(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=settings.OUTBOUND_POLL_MS / 1000)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self, name: str):
+        while self._running:
+            try:
+                async with AsyncSessionLocal() as db:
+                    jobs = await self.claim(db)
+                    if jobs:
+                        await self.deliver(db, jobs)
+                if len(jobs) < settings.OUTBOUND_BATCH_SIZE:
+                    await self._idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbound delivery worker %s failed", name)
+                await asyncio.sleep(1)
+
+    async def _recover(self):
+        while self._running:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.fail_interrupted(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to recover interrupted outbound sends")
+            await asyncio.sleep(settings.OUTBOUND_LEASE_SECONDS)
+
+    async def claim(self, db: AsyncSession) -> List[OutboundJob]:
+        """Lease up to OUTBOUND_BATCH_SIZE due jobs, at most one per conversation (commits)"""
+        now = datetime.utcnow()
+        job = aliased(OutboundMessage)
+        earlier = aliased(OutboundMessage)
+        heads = (
+            select(job.id)
+            .where(
+                job.status == OutboundStatus.PENDING,
+                job.next_attempt_at <= now,
+                # An earlier unfinished job of the conversation goes first
+                ~exists().where(
+                    earlier.conversation_id == job.conversation_id,
+                    earlier.status.in_([OutboundStatus.PENDING, OutboundStatus.SENDING]),
+                    tuple_(earlier.created_at, earlier.id) < tuple_(job.created_at, job.id)
+                )
+            )
+            .order_by(job.next_attempt_at)
+            .limit(settings.OUTBOUND_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id.in_(heads))
+            .values(
+                status=OutboundStatus.SENDING,
+                attempts=OutboundMessage.attempts + 1,
+                lease_owner=WORKER_ID,
+                lease_expires_at=now + timedelta(seconds=settings.OUTBOUND_LEASE_SECONDS),
+                updated_at=now
+            )
+            .returning(OutboundMessage.id, OutboundMessage.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        attempts = dict(result.all())
+        if not attempts:
+            await db.commit()
+            return []
+
+        rows = (await db.execute(
+            select(
+                OutboundMessage.id,
+                OutboundMessage.message_id,
+                OutboundMessage.conversation_id,
+                OutboundMessage.workspace_id,
+                Conversation.channel,
+                DESTINATION.label("destination"),
+                Message.content
+            )
+            .join(Message, Message.id == OutboundMessage.message_id)
+            .join(Conversation, Conversation.id == OutboundMessage.conversation_id)
+            .outerjoin(Contact, Contact.id == Conversation.contact_id)
+            .where(OutboundMessage.id.in_(list(attempts)))
+        )).all()
+        await db.commit()
+        return [
+            OutboundJob(
+                row.id, row.message_id, row.conversation_id, row.workspace_id, attempts[row.id],
+                ChannelType(row.channel.value), row.destination, row.content
+            )
+            for row in rows
+        ]
+
+    async def _channels(self, db: AsyncSession, jobs: List[OutboundJob]) -> Dict[Tuple[uuid.UUID, ChannelType], Channel]:
+        """The connected channel each job is sent through, oldest first per workspace and type"""
+        keys = {(job.workspace_id, job.channel) for job in jobs}
+        result = await db.execute(
+            select(Channel)
+            .where(
+                tuple_(Channel.workspace_id, Channel.channel_type).in_(list(keys)),
+                Channel.status == ChannelStatus.CONNECTED,
+                Channel.is_active.is_(True)
+            )
+            .order_by(Channel.created_at)
+        )
+        channels = {}
+        for channel in result.scalars():
+            channels.setdefault((channel.workspace_id, channel.channel_type), channel)
+        await db.commit()
+        return channels
+
+    async def _deliver_one(self, job: OutboundJob, channel: Optional[Channel]) -> DeliveryOutcome:
+        if channel is None:
+            return DeliveryOutcome(job, OutboundStatus.FAILED, error=f"No connected {job.channel.value} channel")
+        if not job.destination:
+            return DeliveryOutcome(job, OutboundStatus.FAILED, error="Contact has no address on this channel")
+
+        rate = float((channel.config or {}).get("throughput_mps") or settings.BROADCAST_DEFAULT_MPS)
+        # Shares the sender's bucket with broadcasts from the same number or page
+        bucket = rate_limiters.get((channel.channel_type.value, channel.external_id), rate)
+        await bucket.acquire()
+        try:
+            response = await _send(channel, job.destination, job.content)
+        except Exception as e:
+            error = str(e)[:1000] or e.__class__.__name__
+            retry_after = getattr(e, "retry_after", None)
+            if isinstance(e, ChannelAPIError) and e.throttled:
+                bucket.pause(retry_after or settings.OUTBOUND_RETRY_BASE_MS / 1000)
+            if not is_transient_error(e) or job.attempts >= settings.OUTBOUND_MAX_ATTEMPTS:
+                return DeliveryOutcome(job, OutboundStatus.FAILED, error=error)
+
+            max_delay = settings.OUTBOUND_RETRY_MAX_MS / 1000
+            delay = backoff_delay(job.attempts - 1, settings.OUTBOUND_RETRY_BASE_MS / 1000, max_delay)
+            delay = max(delay, min(retry_after or 0, max_delay))
+            metrics.incr("outbound.retries")
+            return DeliveryOutcome(
+                job, OutboundStatus.PENDING, next_attempt_at=datetime.utcnow() + timedelta(seconds=delay), error=error
+            )
+        return DeliveryOutcome(job, OutboundStatus.SENT, channel_message_id=message_id_from_response(response))
+
+    async def deliver(self, db: AsyncSession, jobs: List[OutboundJob]):
+        """Send claimed jobs concurrently and write the outcomes back"""
+        channels = await self._channels(db, jobs)
+        outcomes = await asyncio.gather(*(
+            self._deliver_one(job, channels.get((job.workspace_id, job.channel))) for job in jobs
+        ))
+        await self._write_back(db, outcomes)
+
+        for outcome in outcomes:
+            metrics.incr(f"outbound.{outcome.status.value}")
+
+    async def _write_back(self, db: AsyncSession, outcomes: List[DeliveryOutcome]):
+        """Update the jobs, then the messages that reached a final status, in one transaction"""
+        now = datetime.utcnow()
+        v = values(
+            column("id", UUID(as_uuid=True)),
+            column("status", OutboundMessage.__table__.c.status.type),
+            column("next_attempt_at", DateTime),
+            column("error", Text),
+            name="o"
+        ).data([
+            (outcome.job.id, outcome.status, outcome.next_attempt_at or now, outcome.error)
+            for outcome in outcomes
+        ])
+        await db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == v.c.id)
+            .values(
+                status=v.c.status,
+                next_attempt_at=v.c.next_attempt_at,
+                error_message=v.c.error,
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        final = [outcome for outcome in outcomes if outcome.status != OutboundStatus.PENDING]
+        if final:
+            m = values(
+                column("id", UUID(as_uuid=True)),
+                column("status", Message.__table__.c.status.type),
+                column("channel_message_id", String),
+                name="m"
+            ).data([
+                (
+                    outcome.job.message_id,
+                    MessageStatus.SENT if outcome.status == OutboundStatus.SENT else MessageStatus.FAILED,
+                    outcome.channel_message_id
+                )
+                for outcome in final
+            ])
+            await db.execute(
+                update(Message)
+                .where(Message.id == m.c.id)
+                .values(status=m.c.status, channel_message_id=m.c.channel_message_id)
+                .execution_options(synchronize_session=False)
+            )
+            for outcome in final:
+                status = MessageStatus.SENT if outcome.status == OutboundStatus.SENT else MessageStatus.FAILED
+                record_inbox_event(db, outcome.job.workspace_id, message_status_event(
+                    outcome.job.conversation_id, outcome.job.message_id, status, outcome.channel_message_id
+                ))
+        await db.commit()
+
+    async def fail_interrupted(self, db: AsyncSession) -> int:
+        """Fail jobs whose worker died mid-send (commits)
+
+        Whether the channel got the message is unknown, so like interrupted broadcast sends these
+        are not retried; the agent sees the message as failed and can resend it.
+        """
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.status == OutboundStatus.SENDING, OutboundMessage.lease_expires_at < now)
+            .values(
+                status=OutboundStatus.FAILED,
+                error_message=INTERRUPTED_SEND_ERROR,
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=now
+            )
+            .returning(OutboundMessage.message_id, OutboundMessage.conversation_id, OutboundMessage.workspace_id)
+            .execution_options(synchronize_session=False)
+        )
+        interrupted = result.all()
+        if interrupted:
+            await db.execute(
+                update(Message)
+                .where(Message.id.in_([row.message_id for row in interrupted]))
+                .values(status=MessageStatus.FAILED)
+                .execution_options(synchronize_session=False)
+            )
+            for row in interrupted:
+                record_inbox_event(db, row.workspace_id, message_status_event(
+                    row.conversation_id, row.message_id, MessageStatus.FAILED
+                ))
+            metrics.incr("outbound.interrupted", len(interrupted))
+        await db.commit()
+        return len(interrupted)
+
+outbound_delivery = OutboundDeliveryPool()
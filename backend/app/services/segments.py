@@ -0,0 +1,154 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+import orjson
+from sqlalchemy import and_, or_, not_, case, cast, func, select, true, Numeric, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.redis import redis_manager
+from app.models.contact import Contact, ContactStage
+from app.schemas.segment import AudienceFilter, CustomFieldFilter
+
+logger = logging.getLogger(__name__)
+
+def _text_array(values) -> ColumnElement:
+    return cast(list(values), ARRAY(String))
+
+def _naive_utc(value: datetime) -> datetime:
+    # last_contacted_at is stored as naive UTC
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def false_clause() -> ColumnElement:
+    return not_(true())
+
+def _custom_field_clause(criterion: CustomFieldFilter) -> ColumnElement:
+    fields = Contact.custom_fields
+    name = criterion.field
+
+    # Equality and key checks use containment/existence operators served by the GIN index.
+    # Negations also match contacts without custom fields (NULL would drop them from NOT ...)
+    if criterion.op == "eq":
+        return fields.contains({name: criterion.value})
+    if criterion.op == "ne":
+        return or_(fields.is_(None), not_(fields.contains({name: criterion.value})))
+    if criterion.op == "in":
+        return or_(*(fields.contains({name: value}) for value in criterion.value)) if criterion.value else false_clause()
+    if criterion.op == "exists":
+        return fields.has_key(name)
+    if criterion.op == "not_exists":
+        return or_(fields.is_(None), not_(fields.has_key(name)))
+    if criterion.op == "contains":
+        # Escape % and _ so the value matches literally
+        return fields[name].astext.icontains(criterion.value, autoescape=True)
+
+    # Numeric comparisons only apply to numeric values; CASE keeps the cast from seeing strings
+    number = case(
+        (func.jsonb_typeof(fields[name]) == "number", cast(fields[name].astext, Numeric)),
+        else_=None
+    )
+    return {
+        "gt": number > criterion.value,
+        "gte": number >= criterion.value,
+        "lt": number < criterion.value,
+        "lte": number <= criterion.value,
+    }[criterion.op]
+
+def compile_filter(audience_filter: AudienceFilter, now: Optional[datetime] = None) -> ColumnElement:
+    """Compile an audience filter into a single SQL predicate on contacts"""
+    now = now or datetime.utcnow()
+    clauses = []
+
+    if audience_filter.tags:
+        if audience_filter.tags.any:
+            clauses.append(Contact.tags.has_any(_text_array(audience_filter.tags.any)))
+        if audience_filter.tags.all:
+            clauses.append(Contact.tags.contains(audience_filter.tags.all))
+        if audience_filter.tags.none:
+            clauses.append(or_(Contact.tags.is_(None), not_(Contact.tags.has_any(_text_array(audience_filter.tags.none)))))
+
+    if audience_filter.stages:
+        clauses.append(Contact.stage.in_([ContactStage(stage.value) for stage in audience_filter.stages]))
+
+    if audience_filter.lead_score:
+        if audience_filter.lead_score.gte is not None:
+            clauses.append(Contact.lead_score >= audience_filter.lead_score.gte)
+        if audience_filter.lead_score.lte is not None:
+            clauses.append(Contact.lead_score <= audience_filter.lead_score.lte)
+
+    clauses.extend(_custom_field_clause(criterion) for criterion in audience_filter.custom_fields)
+
+    window = audience_filter.last_contacted_at
+    if window:
+        if window.after:
+            clauses.append(Contact.last_contacted_at >= _naive_utc(window.after))
+        if window.before:
+            clauses.append(Contact.last_contacted_at < _naive_utc(window.before))
+        if window.within_days is not None:
+            clauses.append(Contact.last_contacted_at >= now - timedelta(days=window.within_days))
+        if window.not_within_days is not None:
+            cutoff = now - timedelta(days=window.not_within_days)
+            clauses.append(or_(Contact.last_contacted_at.is_(None), Contact.last_contacted_at < cutoff))
+
+    return and_(true(), *clauses)
+
+def parse_filter(audience_type: Optional[str], audience_filter: Optional[dict]) -> Optional[AudienceFilter]:
+    """Validated filter of an audience, or None when it targets the whole workspace"""
+    if audience_type in (None, "", "all"):
+        return None
+    return AudienceFilter.model_validate(audience_filter or {})
+
+def compile_audience(workspace_id, audience_type: Optional[str], audience_filter: Optional[dict]) -> ColumnElement:
+    """Predicate on contacts selecting an audience within a workspace"""
+    clause = Contact.workspace_id == workspace_id
+    parsed = parse_filter(audience_type, audience_filter)
+    if parsed is None:
+        return clause
+    return and_(clause, compile_filter(parsed))
+
+class SegmentSizeCache:
+    """Short-lived cache of audience counts keyed by workspace and canonical filter
+
+    Counts are previews, so a TTL is enough; Redis failures fall back to counting.
+    """
+
+    def __init__(self, prefix: str, ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, workspace_id, audience_type: Optional[str], audience_filter: Optional[AudienceFilter]) -> str:
+        canonical = orjson.dumps(
+            [audience_type or "all", audience_filter.model_dump(mode="json") if audience_filter else None],
+            option=orjson.OPT_SORT_KEYS
+        )
+        return f"{self.prefix}:{workspace_id}:{hashlib.sha1(canonical).hexdigest()}"
+
+    async def count(self, db: AsyncSession, workspace_id, audience_type: Optional[str], audience_filter: Optional[dict]) -> Tuple[int, bool]:
+        """Audience size and whether it came from the cache"""
+        parsed = parse_filter(audience_type, audience_filter)
+        key = self._key(workspace_id, audience_type, parsed)
+        try:
+            cached = await redis_manager.client.get(key)
+        except Exception:
+            logger.exception("Segment size cache unavailable")
+            cached = None
+        if cached is not None:
+            return int(cached), True
+
+        size = await db.scalar(
+            select(func.count()).select_from(Contact).where(compile_audience(workspace_id, audience_type, audience_filter))
+        )
+
+        try:
+            await redis_manager.client.set(key, size, ex=self.ttl)
+        except Exception:
+            logger.exception("Failed to cache segment size")
+        return size, False
+
+segment_sizes = SegmentSizeCache("segments:size", settings.SEGMENT_COUNT_TTL)
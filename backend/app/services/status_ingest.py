@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, values, column, case, cast, func, String, DateTime, Integer, Text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models.broadcast import Broadcast, BroadcastRecipient, RecipientStatus
+from app.models.conversation import Conversation, Message, MessageStatus
+from app.services.broadcast_progress import record_progress
+from app.services.inbox_events import message_status_event, record_inbox_event
+
+logger = logging.getLogger(__name__)
+
+# A status only ever moves forward; late or duplicate callbacks are ignored
+STATUS_RANK = {
+    RecipientStatus.PENDING: 0,
+    RecipientStatus.SENT: 1,
+    RecipientStatus.FAILED: 2,
+    RecipientStatus.DELIVERED: 3,
+    RecipientStatus.READ: 4,
+}
+def status_rank(status):
+    """SQL rank of a status column; enum columns store the member names"""
+    return case({member.name: rank for member, rank in STATUS_RANK.items()}, value=cast(status, String), else_=0)
+
+@dataclass(frozen=True, slots=True)
+class StatusEvent:
+    """Delivery status callback for an outbound message"""
+    message_id: str
+    status: RecipientStatus
+    timestamp: datetime
+    error: Optional[str] = None
+
+def whatsapp_status_adapter(data: dict) -> List[StatusEvent]:
+    """Extract sent/delivered/read/failed callbacks from a WhatsApp webhook payload"""
+    events = []
+    for entry in data.get("entry", []):
+        for change in entry.get("changes", []):
+            if change.get("field") != "messages":
+                continue
+            for status in change.get("value", {}).get("statuses", []):
+                try:
+                    recipient_status = RecipientStatus(status.get("status"))
+                except ValueError:
+                    continue
+                errors = status.get("errors") or []
+                events.append(StatusEvent(
+                    message_id=status.get("id"),
+                    status=recipient_status,
+                    timestamp=datetime.utcfromtimestamp(int(status.get("timestamp", 0)) or time.time()),
+                    error="; ".join(f"{e.get('code')}: {e.get('title')}" for e in errors) or None
+                ))
+    return events
+
+def _collapse(events: List[StatusEvent]) -> Dict[str, dict]:
+    """Reduce the events of a batch to one row per message id"""
+    rows: Dict[str, dict] = {}
+    for event in events:
+        if not event.message_id:
+            continue
+        row = rows.setdefault(event.message_id, {
+            "channel_message_id": event.message_id,
+            "status": RecipientStatus.PENDING,
+            "rank": 0,
+            "delivered_at": None,
+            "read_at": None,
+            "error": None
+        })
+        rank = STATUS_RANK[event.status]
+        if rank > row["rank"]:
+            row["status"] = event.status
+            row["rank"] = rank
+        if event.status in (RecipientStatus.DELIVERED, RecipientStatus.READ):
+            row["delivered_at"] = min(filter(None, [row["delivered_at"], event.timestamp]))
+        if event.status == RecipientStatus.READ:
+            row["read_at"] = event.timestamp
+        if event.error:
+            row["error"] = event.error
+    return rows
+
+async def apply_status_events(events: List[StatusEvent], db: AsyncSession) -> Tuple[int, List[StatusEvent]]:
+    """Apply status callbacks to broadcast recipients with one UPDATE ... FROM (VALUES ...)
+
+    Returns the number of recipients updated and the events whose message id matched no recipient
+    or inbox reply. Broadcast counters are incremented with a second set-based UPDATE (caller commits).
+    """
+    rows = _collapse(events)
+    if not rows:
+        return 0, []
+
+    recipient_status = BroadcastRecipient.__table__.c.status.type
+    v = values(
+        column("channel_message_id", String),
+        column("status", recipient_status),
+        column("rank", Integer),
+        column("delivered_at", DateTime),
+        column("read_at", DateTime),
+        column("error", Text),
+        name="v"
+    ).data([
+        (row["channel_message_id"], row["status"], row["rank"], row["delivered_at"], row["read_at"], row["error"])
+        for row in rows.values()
+    ])
+
+    # Lock the recipients to move (in id order, so concurrent consumers can't deadlock) and keep
+    # their status as of the lock: a consumer that waited re-reads the row another one just moved,
+    # so every transition is counted by exactly one of them
+    locked = (
+        select(
+            BroadcastRecipient.id,
+            BroadcastRecipient.status.label("old_status"),
+            v.c.status,
+            cast(v.c.delivered_at, DateTime).label("delivered_at"),
+            cast(v.c.read_at, DateTime).label("read_at"),
+            cast(v.c.error, Text).label("error")
+        )
+        .join(v, BroadcastRecipient.channel_message_id == v.c.channel_message_id)
+        .where(status_rank(BroadcastRecipient.status) < v.c.rank)
+        .order_by(BroadcastRecipient.id)
+        .with_for_update(of=BroadcastRecipient)
+        .cte("locked")
+    )
+    stmt = (
+        update(BroadcastRecipient)
+        .where(BroadcastRecipient.id == locked.c.id)
+        .values(
+            status=locked.c.status,
+            delivered_at=func.coalesce(BroadcastRecipient.delivered_at, locked.c.delivered_at),
+            read_at=func.coalesce(BroadcastRecipient.read_at, locked.c.read_at),
+            error_message=func.coalesce(locked.c.error, BroadcastRecipient.error_message)
+        )
+        .returning(BroadcastRecipient.broadcast_id, BroadcastRecipient.channel_message_id, locked.c.old_status, BroadcastRecipient.status)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    changed = result.all()
+
+    # Aggregate counter deltas per broadcast from the old -> new transitions
+    deltas: Dict[object, List[int]] = {}
+    reached = {RecipientStatus.DELIVERED, RecipientStatus.READ}
+    for broadcast_id, _, old, new in changed:
+        delta = deltas.setdefault(broadcast_id, [0, 0, 0, 0])
+        if old == RecipientStatus.PENDING and new != RecipientStatus.FAILED:
+            delta[0] += 1
+        if new in reached and old not in reached:
+            delta[1] += 1
+        if new == RecipientStatus.READ:
+            delta[2] += 1
+        if new == RecipientStatus.FAILED:
+            delta[3] += 1
+        elif old == RecipientStatus.FAILED:
+            # Reported failed, then delivered after all: no longer counts as failed
+            delta[3] -= 1
+
+    if deltas:
+        await increment_broadcast_counters(db, deltas)
+
+    # Events already at (or past) their status are matched but unchanged; only report unknown ids
+    matched = {message_id for _, message_id, _, _ in changed}
+    unmatched_ids = set(rows) - matched
+    if unmatched_ids:
+        existing = await db.execute(
+            select(BroadcastRecipient.channel_message_id)
+            .where(BroadcastRecipient.channel_message_id.in_(unmatched_ids))
+        )
+        unmatched_ids -= set(existing.scalars().all())
+    if unmatched_ids:
+        unmatched_ids -= await _apply_to_messages(db, rows, unmatched_ids)
+    unmatched = [event for event in events if event.message_id in unmatched_ids]
+
+    metrics.incr("status_ingest.events", len(events))
+    metrics.incr("status_ingest.updated", len(changed))
+    return len(changed), unmatched
+
+async def _apply_to_messages(db: AsyncSession, rows: Dict[str, dict], message_ids: Set[str]) -> Set[str]:
+    """Move inbox replies (see outbound_delivery) forward to their callback status
+
+    One UPDATE ... FROM (VALUES ...); each change is pushed to the workspace's inbox once the
+    caller commits. Returns the channel message ids that belong to an inbox reply.
+    """
+    v = values(
+        column("channel_message_id", String),
+        column("status", Message.__table__.c.status.type),
+        column("rank", Integer),
+        name="v"
+    ).data([
+        (message_id, MessageStatus(rows[message_id]["status"].value), rows[message_id]["rank"])
+        for message_id in message_ids
+    ])
+    # UPDATE ... FROM conversations can't return the joined table's columns; a correlated subquery can
+    workspace_id = (
+        select(Conversation.workspace_id)
+        .where(Conversation.id == Message.conversation_id)
+        .scalar_subquery()
+        .label("workspace_id")
+    )
+    result = await db.execute(
+        update(Message)
+        .where(
+            Message.channel_message_id == v.c.channel_message_id,
+            # Only replies sent from the inbox carry a status (partial index)
+            Message.status.isnot(None),
+            status_rank(Message.status) < v.c.rank
+        )
+        .values(status=v.c.status)
+        .returning(Message.id, Message.conversation_id, Message.channel_message_id, Message.status, workspace_id)
+        .execution_options(synchronize_session=False)
+    )
+    changed = result.all()
+    for row in changed:
+        record_inbox_event(db, row.workspace_id, message_status_event(
+            row.conversation_id, row.id, row.status, row.channel_message_id
+        ))
+
+    matched = {row.channel_message_id for row in changed}
+    if len(matched) < len(message_ids):
+        existing = await db.execute(
+            select(Message.channel_message_id)
+            .where(Message.channel_message_id.in_(message_ids - matched), Message.status.isnot(None))
+        )
+        matched.update(existing.scalars().all())
+    metrics.incr("status_ingest.messages_updated", len(changed))
+    return matched
+
+async def increment_broadcast_counters(db: AsyncSession, deltas: Dict[object, List[int]]):
+    """Add (sent, delivered, read, failed) deltas to broadcasts in one UPDATE ... FROM (VALUES ...)"""
+    v = values(
+        column("id", Broadcast.__table__.c.id.type),
+        column("sent", Integer),
+        column("delivered", Integer),
+        column("read", Integer),
+        column("failed", Integer),
+        name="d"
+    ).data([(broadcast_id, *delta) for broadcast_id, delta in sorted(deltas.items(), key=lambda item: str(item[0]))])
+
+    result = await db.execute(
+        update(Broadcast)
+        .where(Broadcast.id == v.c.id)
+        .values(
+            sent_count=Broadcast.sent_count + v.c.sent,
+            delivered_count=Broadcast.delivered_count + v.c.delivered,
+            read_count=Broadcast.read_count + v.c.read,
+            failed_count=Broadcast.failed_count + v.c.failed
+        )
+        .returning(
+            Broadcast.id, Broadcast.total_recipients,
+            Broadcast.sent_count, Broadcast.delivered_count, Broadcast.read_count, Broadcast.failed_count
+        )
+        .execution_options(synchronize_session=False)
+    )
+    record_progress(db, {row[0]: row[1:] for row in result.all()})
+
+class StatusRetryBuffer:
+    """Holds callbacks that raced ahead of the sender's bulk write-back and retries them shortly
+
+    A status can arrive before the dispatcher has stored the recipient's channel_message_id.
+    Such events are retried every STATUS_RETRY_INTERVAL_MS until STATUS_RETRY_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self):
+        self._events: List[Tuple[float, StatusEvent]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, events: List[StatusEvent]):
+        now = time.monotonic()
+        room = settings.STATUS_RETRY_MAX_EVENTS - len(self._events)
+        if len(events) > room:
+            metrics.incr("status_ingest.unmatched_dropped", len(events) - max(room, 0))
+            events = events[:max(room, 0)]
+        self._events.extend((now, event) for event in events)
+        metrics.set_gauge("status_ingest.retry_buffer", len(self._events))
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass
+
+    async def _run(self):
+        while self._events:
+            await asyncio.sleep(settings.STATUS_RETRY_INTERVAL_MS / 1000)
+            await self.flush()
+
+    async def flush(self):
+        buffered, self._events = self._events, []
+        if not buffered:
+            return
+        first_seen = {}
+        for seen_at, event in buffered:
+            first_seen.setdefault(event.message_id, seen_at)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                _, unmatched = await apply_status_events([event for _, event in buffered], db)
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to apply buffered status events")
+            unmatched = [event for _, event in buffered]
+
+        now = time.monotonic()
+        expired = 0
+        for event in unmatched:
+            seen_at = first_seen.get(event.message_id, now)
+            if now - seen_at < settings.STATUS_RETRY_MAX_AGE_SECONDS:
+                self._events.append((seen_at, event))
+            else:
+                expired += 1
+        if expired:
+            metrics.incr("status_ingest.unmatched_dropped", expired)
+        metrics.set_gauge("status_ingest.retry_buffer", len(self._events))
+
+status_retry_buffer = StatusRetryBuffer()
@@ -0,0 +1,117 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+# Contact fields available to message templates; custom fields are addressed as custom_fields.<key>
+TEMPLATE_FIELDS = ("first_name", "last_name", "email", "phone", "company", "job_title")
+CUSTOM_FIELDS = "custom_fields"
+
+PLACEHOLDER = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_\- ]+)?$")
+
+class TemplateError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A message template compiled to a render function over a row tuple
+
+    `fields` lists the contact columns the row must hold, in order; `render(row)` takes the values
+    of exactly those columns (custom_fields as the whole dict) and returns the message text.
+    """
+    source: str
+    fields: Tuple[str, ...]
+    render: Callable[[tuple], str]
+
+    @property
+    def is_static(self) -> bool:
+        return not self.fields
+
+def _custom_field(values, key: str) -> str:
+    if not values:
+        return ""
+    value = values.get(key)
+    if value is None:
+        return ""
+    return value if type(value) is str else str(value)
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    return value if type(value) is str else str(value)
+
+def _parse_placeholder(inner: str) -> Tuple[List[str], str]:
+    """`a | b | "fallback"` -> (["a", "b"], "fallback")"""
+    options = [option.strip() for option in inner.split("|")]
+    fallback = ""
+    if len(options) > 1 and options[-1][:1] in ("'", '"'):
+        quoted = options.pop()
+        if len(quoted) < 2 or quoted[-1] != quoted[0]:
+            raise TemplateError(f"Unterminated fallback in {{{{{inner}}}}}")
+        fallback = quoted[1:-1]
+
+    for name in options:
+        if not name:
+            raise TemplateError(f"Empty field in {{{{{inner}}}}}")
+        if not FIELD.match(name):
+            raise TemplateError(f"Invalid field '{name}'")
+        base, _, key = name.partition(".")
+        if base == CUSTOM_FIELDS and key:
+            continue
+        if key or base not in TEMPLATE_FIELDS:
+            raise TemplateError(
+                f"Unknown field '{name}'; use one of {', '.join(TEMPLATE_FIELDS)} or {CUSTOM_FIELDS}.<key>"
+            )
+    return options, fallback
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str) -> CompiledTemplate:
+    """Compile (and cache) a template into a generated render function
+
+    Placeholders are `{{field}}`, `{{custom_fields.key}}` and fallback chains such as
+    `{{first_name | company | "there"}}`: the first non-empty value wins, then the quoted literal.
+    """
+    pieces = []
+    fields: List[str] = []
+
+    def column(name: str) -> int:
+        if name not in fields:
+            fields.append(name)
+        return fields.index(name)
+
+    def literal(text: str):
+        if "{{" in text or "}}" in text:
+            raise TemplateError("Unbalanced '{{' / '}}' in message template")
+        if text:
+            pieces.append(repr(text))
+
+    position = 0
+    for match in PLACEHOLDER.finditer(source):
+        literal(source[position:match.start()])
+        position = match.end()
+
+        options, fallback = _parse_placeholder(match.group(1))
+        expressions = []
+        for name in options:
+            base, _, key = name.partition(".")
+            if base == CUSTOM_FIELDS:
+                expressions.append(f"_custom_field(row[{column(CUSTOM_FIELDS)}], {key!r})")
+            else:
+                expressions.append(f"_text(row[{column(base)}])")
+        if fallback:
+            expressions.append(repr(fallback))
+        pieces.append(f"({' or '.join(expressions)})")
+
+    literal(source[position:])
+
+    # Generated from validated field names and repr() literals only
+    code = f"def render(row):\n    return ''.join(({', '.join(pieces)},))" if pieces else "def render(row):\n    return ''"
+    namespace = {"_custom_field": _custom_field, "_text": _text}
+    exec(compile(code, "<message template>", "exec"), namespace)
+    return CompiledTemplate(source=source, fields=tuple(fields), render=namespace["render"])
+
+def validate_template(source: str) -> str:
+    """Raise TemplateError unless the template compiles; returns it unchanged"""
+    compile_template(source)
+    return source
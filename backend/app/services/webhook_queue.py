@@ -0,0 +1,387 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+import orjson
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.redis import redis_manager
+from app.services.message_ingest import INGEST_HANDLERS, commit_ingest
+
+logger = logging.getLogger(__name__)
+
+# Idle time after which a consumer with no pending entries is removed from the group
+CONSUMER_PRUNE_IDLE_MS = 24 * 3600 * 1000
+
+def consumer_prefix() -> str:
+    """Stable per-process consumer name: configured, or host and pid"""
+    return settings.WEBHOOK_CONSUMER_NAME or f"{socket.gethostname()}-{os.getpid()}"
+
+@dataclass
+class QueuedPayload:
+    entry_id: str
+    channel: str
+    body: bytes
+    received_at: float
+    deliveries: int = 1
+
+class RedisStreamQueue:
+    """Durable webhook queue on a Redis Stream with a consumer group and dead-letter stream"""
+
+    def __init__(self, stream: str, group: str, dead_letter_stream: str):
+        self.stream = stream
+        self.group = group
+        self.dead_letter_stream = dead_letter_stream
+        # Per consumer: last entry re-read of those a previous run left pending under its name
+        # (None once all are), so each is recovered once before new entries are read
+        self._recovery_cursors: Dict[str, Optional[str]] = {}
+
+    @property
+    def redis(self) -> redis.Redis:
+        return redis_manager.client
+
+    async def setup(self):
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        await self._prune_consumers()
+
+    async def _prune_consumers(self):
+        """Drop long-idle consumers with nothing pending so dead names don't pile up in the group"""
+        for consumer in await self.redis.xinfo_consumers(self.stream, self.group):
+            if consumer["pending"] == 0 and consumer["idle"] > CONSUMER_PRUNE_IDLE_MS:
+                await self.redis.xgroup_delconsumer(self.stream, self.group, consumer["name"])
+
+    async def enqueue(self, channel: str, body: bytes) -> str:
+        entry_id = await self.redis.xadd(
+            self.stream,
+            {"channel": channel, "body": body, "received_at": repr(time.time())},
+            maxlen=settings.WEBHOOK_STREAM_MAXLEN,
+            approximate=True
+        )
+        return entry_id.decode()
+
+    def _decode(self, entry_id, fields: dict, deliveries: int = 1) -> QueuedPayload:
+        return QueuedPayload(
+            entry_id=entry_id.decode() if isinstance(entry_id, bytes) else entry_id,
+            channel=fields[b"channel"].decode(),
+            body=fields[b"body"],
+            received_at=float(fields[b"received_at"]),
+            deliveries=deliveries
+        )
+
+    async def _with_deliveries(self, consumer: str, entries: list) -> List[QueuedPayload]:
+        pending = await self.redis.xpending_range(
+            self.stream, self.group,
+            min=entries[0][0], max=entries[-1][0],
+            count=len(entries), consumername=consumer
+        )
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        return [
+            self._decode(entry_id, fields, deliveries.get(entry_id, 1))
+            for entry_id, fields in entries
+            if fields
+        ]
+
+    async def read(self, consumer: str, count: int, block_ms: int) -> List[QueuedPayload]:
+        # After a restart, finish what this consumer name had read but not acked
+        cursor = self._recovery_cursors.get(consumer, "0")
+        if cursor is not None:
+            response = await self.redis.xreadgroup(self.group, consumer, {self.stream: cursor}, count=count)
+            entries = [entry for _, stream_entries in response or [] for entry in stream_entries]
+            if entries:
+                self._recovery_cursors[consumer] = entries[-1][0]
+                trimmed = [entry_id for entry_id, fields in entries if not fields]
+                if trimmed:
+                    await self.redis.xack(self.stream, self.group, *trimmed)
+                return await self._with_deliveries(consumer, entries)
+            self._recovery_cursors[consumer] = None
+
+        # Take over entries left pending by crashed or stuck consumers
+        claimed = (await self.redis.xautoclaim(
+            self.stream, self.group, consumer,
+            min_idle_time=settings.WEBHOOK_CLAIM_IDLE_MS,
+            start_id="0-0",
+            count=count
+        ))[1]
+        if claimed:
+            return await self._with_deliveries(consumer, claimed)
+
+        response = await self.redis.xreadgroup(
+            self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+        items = []
+        for _, entries in response or []:
+            items.extend(self._decode(entry_id, fields) for entry_id, fields in entries)
+        return items
+
+    async def ack(self, items: List[QueuedPayload]):
+        if items:
+            await self.redis.xack(self.stream, self.group, *[item.entry_id for item in items])
+
+    async def retry(self, item: QueuedPayload):
+        # Leave the entry pending; it is reclaimed once WEBHOOK_CLAIM_IDLE_MS elapses
+        pass
+
+    async def dead_letter(self, item: QueuedPayload, error: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.dead_letter_stream, {
+                "channel": item.channel,
+                "body": item.body,
+                "received_at": repr(item.received_at),
+                "source_id": item.entry_id,
+                "deliveries": item.deliveries,
+                "error": error[:2000]
+            })
+            pipe.xack(self.stream, self.group, item.entry_id)
+            await pipe.execute()
+
+    async def list_dead_letters(self, count: int = 100) -> List[dict]:
+        entries = await self.redis.xrange(self.dead_letter_stream, count=count)
+        return [
+            {
+                "id": entry_id.decode(),
+                **{key.decode(): (value if key == b"body" else value.decode()) for key, value in fields.items()}
+            }
+            for entry_id, fields in entries
+        ]
+
+    async def replay_dead_letters(self, ids: Optional[List[str]] = None) -> int:
+        """Move dead-lettered payloads back onto the inbound stream"""
+        if ids:
+            entries = []
+            for entry_id in ids:
+                entries.extend(await self.redis.xrange(self.dead_letter_stream, min=entry_id, max=entry_id))
+        else:
+            entries = await self.redis.xrange(self.dead_letter_stream)
+
+        for entry_id, fields in entries:
+            await self.enqueue(fields[b"channel"].decode(), fields[b"body"])
+            await self.redis.xdel(self.dead_letter_stream, entry_id)
+        return len(entries)
+
+    async def purge_dead_letters(self, ids: Optional[List[str]] = None) -> int:
+        if ids:
+            return await self.redis.xdel(self.dead_letter_stream, *ids)
+        length = await self.redis.xlen(self.dead_letter_stream)
+        await self.redis.delete(self.dead_letter_stream)
+        return length
+
+    async def stats(self) -> dict:
+        length = await self.redis.xlen(self.stream)
+        dead_letters = await self.redis.xlen(self.dead_letter_stream)
+        stats = {"backend": "redis", "length": length, "dead_letters": dead_letters, "pending": 0, "lag": None}
+
+        for group in await self.redis.xinfo_groups(self.stream):
+            name = group["name"].decode() if isinstance(group["name"], bytes) else group["name"]
+            if name == self.group:
+                stats["pending"] = group["pending"]
+                stats["lag"] = group.get("lag")
+
+        pending = await self.redis.xpending_range(self.stream, self.group, min="-", max="+", count=1)
+        stats["oldest_pending_ms"] = pending[0]["time_since_delivered"] if pending else 0
+        return stats
+
+class InMemoryQueue:
+    """In-process queue with the same interface, used in tests and single-process setups"""
+
+    def __init__(self):
+        self._items: Deque[QueuedPayload] = deque()
+        self._pending: Dict[str, QueuedPayload] = {}
+        self._dead: Dict[str, dict] = {}
+        self._available = asyncio.Event()
+        self._sequence = 0
+
+    def _next_id(self) -> str:
+        self._sequence += 1
+        return f"{int(time.time() * 1000)}-{self._sequence}"
+
+    async def setup(self):
+        pass
+
+    async def enqueue(self, channel: str, body: bytes) -> str:
+        item = QueuedPayload(entry_id=self._next_id(), channel=channel, body=body, received_at=time.time())
+        self._items.append(item)
+        self._available.set()
+        return item.entry_id
+
+    async def read(self, consumer: str, count: int, block_ms: int) -> List[QueuedPayload]:
+        if not self._items:
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), timeout=block_ms / 1000)
+            except asyncio.TimeoutError:
+                return []
+
+        items = []
+        while self._items and len(items) < count:
+            item = self._items.popleft()
+            self._pending[item.entry_id] = item
+            items.append(item)
+        return items
+
+    async def ack(self, items: List[QueuedPayload]):
+        for item in items:
+            self._pending.pop(item.entry_id, None)
+
+    async def retry(self, item: QueuedPayload):
+        self._pending.pop(item.entry_id, None)
+        item.deliveries += 1
+        self._items.append(item)
+        self._available.set()
+
+    async def dead_letter(self, item: QueuedPayload, error: str):
+        self._pending.pop(item.entry_id, None)
+        self._dead[self._next_id()] = {
+            "channel": item.channel,
+            "body": item.body,
+            "received_at": repr(item.received_at),
+            "source_id": item.entry_id,
+            "deliveries": str(item.deliveries),
+            "error": error[:2000]
+        }
+
+    async def list_dead_letters(self, count: int = 100) -> List[dict]:
+        return [{"id": entry_id, **fields} for entry_id, fields in list(self._dead.items())[:count]]
+
+    async def replay_dead_letters(self, ids: Optional[List[str]] = None) -> int:
+        selected = ids or list(self._dead)
+        replayed = 0
+        for entry_id in selected:
+            fields = self._dead.pop(entry_id, None)
+            if fields:
+                await self.enqueue(fields["channel"], fields["body"])
+                replayed += 1
+        return replayed
+
+    async def purge_dead_letters(self, ids: Optional[List[str]] = None) -> int:
+        selected = ids or list(self._dead)
+        return sum(1 for entry_id in selected if self._dead.pop(entry_id, None) is not None)
+
+    async def stats(self) -> dict:
+        oldest = min((item.received_at for item in self._pending.values()), default=None)
+        return {
+            "backend": "memory",
+            "length": len(self._items) + len(self._pending),
+            "dead_letters": len(self._dead),
+            "pending": len(self._pending),
+            "lag": len(self._items),
+            "oldest_pending_ms": int((time.time() - oldest) * 1000) if oldest else 0
+        }
+
+def create_webhook_queue():
+    if settings.WEBHOOK_QUEUE_BACKEND == "memory":
+        return InMemoryQueue()
+    return RedisStreamQueue(
+        settings.WEBHOOK_STREAM_KEY,
+        settings.WEBHOOK_CONSUMER_GROUP,
+        settings.WEBHOOK_DEAD_LETTER_KEY
+    )
+
+webhook_queue = create_webhook_queue()
+
+class WebhookConsumerPool:
+    """Pool of tasks that drain the webhook queue in batches"""
+
+    def __init__(self, queue, handlers: dict):
+        self.queue = queue
+        self.handlers = handlers
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    async def start(self, consumers: int = None):
+        self._running = True
+        await self.queue.setup()
+        consumers = consumers or settings.WEBHOOK_CONSUMERS
+        for index in range(consumers):
+            self._tasks.append(asyncio.create_task(self._run(f"consumer-{index}")))
+
+    async def stop(self):
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, name: str):
+        consumer = f"{consumer_prefix()}-{name}"
+        while self._running:
+            try:
+                items = await self.queue.read(consumer, settings.WEBHOOK_BATCH_SIZE, settings.WEBHOOK_BATCH_BLOCK_MS)
+                if items:
+                    await self.process_batch(items)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Webhook consumer %s failed", name)
+                await asyncio.sleep(1)
+
+    async def _handle(self, items: List[QueuedPayload], db):
+        by_channel: Dict[str, List[dict]] = {}
+        for item in items:
+            by_channel.setdefault(item.channel, []).append(orjson.loads(item.body))
+
+        for channel, payloads in by_channel.items():
+            handler = self.handlers.get(channel)
+            if handler is None:
+                raise ValueError(f"No ingest handler for channel {channel!r}")
+            await handler(payloads, db)
+
+    async def process_batch(self, items: List[QueuedPayload]):
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await self._handle(items, db)
+                await commit_ingest(db)
+        except Exception:
+            # Isolate the poisoned payload(s) by retrying one at a time
+            await self._process_individually(items)
+        else:
+            await self.queue.ack(items)
+            metrics.incr("webhook_queue.processed", len(items))
+
+        now = time.time()
+        for item in items:
+            metrics.observe("webhook_queue.end_to_end_seconds", now - item.received_at)
+        metrics.observe("webhook_queue.batch_seconds", time.perf_counter() - started)
+        metrics.observe("webhook_queue.batch_size", len(items))
+
+    async def _process_individually(self, items: List[QueuedPayload]):
+        for item in items:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self._handle([item], db)
+                    await commit_ingest(db)
+            except Exception as e:
+                metrics.incr("webhook_queue.failed")
+                if item.deliveries >= settings.WEBHOOK_MAX_DELIVERIES:
+                    logger.exception("Dead-lettering webhook payload %s", item.entry_id)
+                    await self.queue.dead_letter(item, repr(e))
+                    metrics.incr("webhook_queue.dead_lettered")
+                else:
+                    await self.queue.retry(item)
+            else:
+                await self.queue.ack([item])
+                metrics.incr("webhook_queue.processed")
+
+    async def collect_metrics(self) -> dict:
+        stats = await self.queue.stats()
+        metrics.set_gauge("webhook_queue.length", stats["length"])
+        metrics.set_gauge("webhook_queue.pending", stats["pending"])
+        metrics.set_gauge("webhook_queue.dead_letters", stats["dead_letters"])
+        metrics.set_gauge("webhook_queue.oldest_pending_ms", stats["oldest_pending_ms"])
+        if stats["lag"] is not None:
+            metrics.set_gauge("webhook_queue.lag", stats["lag"])
+        return stats
+
+webhook_consumers = WebhookConsumerPool(webhook_queue, INGEST_HANDLERS)
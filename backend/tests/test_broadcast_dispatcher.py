@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.broadcast import (
+    Broadcast,
+    BroadcastRecipient,
+    BroadcastSendRange,
+    BroadcastStatus,
+    RecipientStatus,
+    SendRangeStatus
+)
+from app.services import channel_service
+from app.services.broadcast_dispatcher import BroadcastDispatcher
+from app.services.broadcast_ranges import INTERRUPTED_SEND_ERROR, claim_range, plan_ranges
+from app.services.channel_service import ChannelAPIError
+from tests.conftest import make_channel, make_contacts
+
+class SendLog(list):
+    """Sends recorded instead of calling the Graph API; destinations in failing are rejected"""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = set()
+
+@pytest.fixture
+def sent(monkeypatch) -> SendLog:
+    log = SendLog()
+
+    async def send_message(phone_number_id, access_token, to, message):
+        if to in log.failing:
+            raise ChannelAPIError(400, "Recipient is not a valid WhatsApp user", code=131026)
+        log.append((to, message))
+        return {"messages": [{"id": f"wamid.{to}"}]}
+
+    monkeypatch.setattr(channel_service.whatsapp_service, "send_message", send_message)
+    monkeypatch.setattr(settings, "BROADCAST_RANGE_SIZE", 4)
+    return log
+
+async def make_broadcast(db, workspace, count: int, content: str = "Hi {{first_name}}") -> Broadcast:
+    channel = await make_channel(db, workspace)
+    channel.config = {"throughput_mps": 10000}
+    contacts = await make_contacts(db, workspace, count)
+    broadcast = Broadcast(workspace_id=workspace.id, name="Launch", channel="whatsapp", message_content=content,
+                          status=BroadcastStatus.SENDING, total_recipients=count)
+    db.add(broadcast)
+    await db.flush()
+    db.add_all([BroadcastRecipient(broadcast_id=broadcast.id, contact_id=contact.id) for contact in contacts])
+    await db.commit()
+    return broadcast
+
+async def recipients(db, broadcast) -> list:
+    result = await db.execute(
+        select(BroadcastRecipient)
+        .where(BroadcastRecipient.broadcast_id == broadcast.id)
+        .order_by(BroadcastRecipient.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+async def test_dispatch_sends_every_range(db, workspace, sent):
+    broadcast = await make_broadcast(db, workspace, 10)
+
+    report = await BroadcastDispatcher(batch_size=3).dispatch(str(broadcast.id))
+
+    assert (report.sent, report.failed) == (10, 0)
+    assert sorted(sent) == sorted((f"1555{i:07d}", f"Hi Contact {i}") for i in range(10))
+    rows = await recipients(db, broadcast)
+    assert {row.status for row in rows} == {RecipientStatus.SENT}
+    assert {row.channel_message_id for row in rows} == {f"wamid.1555{i:07d}" for i in range(10)}
+    assert all(row.sent_at is not None for row in rows)
+
+    ranges = (await db.execute(
+        select(BroadcastSendRange.status).where(BroadcastSendRange.broadcast_id == broadcast.id)
+    )).scalars().all()
+    assert ranges == [SendRangeStatus.DONE] * 3
+    await db.refresh(broadcast)
+    assert (broadcast.status, broadcast.sent_count, broadcast.failed_count) == (BroadcastStatus.SENT, 10, 0)
+
+    # A second run finds nothing left to send
+    report = await BroadcastDispatcher().dispatch(str(broadcast.id))
+    assert (report.sent, report.failed, len(sent)) == (0, 0, 10)
+
+async def test_claim_range_reports_reclaimed_leases(db, workspace, sent):
+    broadcast = await make_broadcast(db, workspace, 6)
+    assert await plan_ranges(db, broadcast.id) == 2
+
+    first = await claim_range(db, broadcast.id, owner="worker-a")
+    assert first is not None and not first.reclaimed
+    second = await claim_range(db, broadcast.id, owner="worker-b")
+    assert second is not None and second.id != first.id and not second.reclaimed
+    assert await claim_range(db, broadcast.id, owner="worker-c") is None
+
+    # worker-a dies mid-batch: its lease expires and the next claim takes the range over
+    await db.execute(
+        update(BroadcastSendRange)
+        .where(BroadcastSendRange.id == first.id)
+        .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    await db.commit()
+    reclaimed = await claim_range(db, broadcast.id, owner="worker-c")
+    assert reclaimed is not None and reclaimed.id == first.id and reclaimed.reclaimed
+
+async def test_interrupted_sends_are_failed_not_resent(db, workspace, sent):
+    broadcast = await make_broadcast(db, workspace, 3)
+    await plan_ranges(db, broadcast.id)
+    lease = await claim_range(db, broadcast.id, owner="dead-worker")
+    first = (await recipients(db, broadcast))[0]
+    await db.execute(
+        update(BroadcastRecipient)
+        .where(BroadcastRecipient.id == first.id)
+        .values(send_attempted_at=datetime.utcnow())
+    )
+    await db.execute(
+        update(BroadcastSendRange)
+        .where(BroadcastSendRange.id == lease.id)
+        .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    )
+    await db.commit()
+
+    report = await BroadcastDispatcher().dispatch(str(broadcast.id))
+
+    assert (report.sent, report.failed, len(sent)) == (2, 1, 2)
+    interrupted = next(row for row in await recipients(db, broadcast) if row.id == first.id)
+    assert (interrupted.status, interrupted.error_message) == (RecipientStatus.FAILED, INTERRUPTED_SEND_ERROR)
+
+async def test_dispatch_records_a_batch_that_failed_entirely(db, workspace, sent):
+    broadcast = await make_broadcast(db, workspace, 3)
+    sent.failing = {f"1555{i:07d}" for i in range(3)}
+
+    report = await BroadcastDispatcher().dispatch(str(broadcast.id))
+
+    assert (report.sent, report.failed) == (0, 3)
+    rows = await recipients(db, broadcast)
+    assert {row.status for row in rows} == {RecipientStatus.FAILED}
+    assert all(row.sent_at is None and row.channel_message_id is None for row in rows)
+    assert all("not a valid WhatsApp user" in row.error_message for row in rows)
+    await db.refresh(broadcast)
+    assert (broadcast.status, broadcast.sent_count, broadcast.failed_count) == (BroadcastStatus.FAILED, 0, 3)
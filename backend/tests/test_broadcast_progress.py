@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+
+import orjson
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.models.broadcast import Broadcast
+from app.services.broadcast_progress import broadcast_progress, progress_stream, progress_topic
+from app.services.status_ingest import increment_broadcast_counters
+
+def parse(chunk: bytes):
+    lines = chunk.decode().strip().split("\n")
+    return lines[0].removeprefix("event: "), orjson.loads(lines[1].removeprefix("data: "))
+
+def snapshot(broadcast_id, status="sending", total=0, sent=0) -> dict:
+    return {"id": str(broadcast_id), "status": status, "total_recipients": total,
+            "sent_count": sent, "delivered_count": 0, "read_count": 0, "failed_count": 0}
+
+async def collect(stream) -> list:
+    return [parse(chunk) async for chunk in stream if not chunk.startswith(b":")]
+
+@pytest.fixture(autouse=True)
+def emit_every_update(monkeypatch):
+    monkeypatch.setattr(settings, "BROADCAST_PROGRESS_INTERVAL_MS", 0)
+
+async def test_updates_around_the_snapshot_are_neither_lost_nor_double_counted():
+    broadcast_id = uuid.uuid4()
+    topic = progress_topic(broadcast_id)
+
+    async def load_snapshot():
+        # Committed before the read: the snapshot includes it and its update arrives afterwards
+        await event_bus.publish(topic, {"total_recipients": 10, "sent": 5, "delivered": 0, "read": 0, "failed": 0})
+        # Committed after the read
+        await event_bus.publish(topic, {"total_recipients": 10, "sent": 7, "delivered": 0, "read": 0, "failed": 0})
+        await event_bus.publish(topic, {"status": "sent"})
+        return snapshot(broadcast_id, total=10, sent=5)
+
+    events = await asyncio.wait_for(collect(progress_stream(broadcast_id, load_snapshot)), 5)
+
+    assert [name for name, _ in events] == ["snapshot", "progress", "done"]
+    assert events[1][1]["sent"] == 7 and events[1][1]["delta"]["sent"] == 2
+    assert events[2][1] == {"status": "sent", "sent": 7, "delivered": 0, "read": 0, "failed": 0}
+
+async def test_finished_broadcasts_close_after_the_snapshot():
+    broadcast_id = uuid.uuid4()
+
+    async def load_snapshot():
+        return snapshot(broadcast_id, status="sent", total=3, sent=3)
+
+    events = await collect(progress_stream(broadcast_id, load_snapshot))
+    assert [name for name, _ in events] == ["snapshot", "done"]
+
+async def test_recipient_total_follows_materialization(db, workspace):
+    broadcast = Broadcast(workspace_id=workspace.id, name="Launch", channel="whatsapp", message_content="Hi",
+                          total_recipients=0, sent_count=0, delivered_count=0, read_count=0, failed_count=0)
+    db.add(broadcast)
+    await db.commit()
+
+    async def load_snapshot():
+        return snapshot(broadcast.id)
+
+    async def send():
+        await asyncio.sleep(0.05)
+        # The audience job finishes, then the dispatcher writes back a batch
+        await db.execute(Broadcast.__table__.update().where(Broadcast.id == broadcast.id).values(total_recipients=100))
+        await increment_broadcast_counters(db, {broadcast.id: [40, 0, 0, 10]})
+        await db.commit()
+        await broadcast_progress.flush()
+        await broadcast_progress.publish_status(broadcast.id, "sent")
+
+    events, _ = await asyncio.wait_for(asyncio.gather(collect(progress_stream(broadcast.id, load_snapshot)), send()), 5)
+
+    progress = [data for name, data in events if name == "progress"]
+    assert progress[-1]["total_recipients"] == 100
+    assert (progress[-1]["sent"], progress[-1]["failed"]) == (40, 10)
+    assert progress[-1]["eta_seconds"] is not None
+    assert (await db.execute(select(Broadcast.sent_count).where(Broadcast.id == broadcast.id))).scalar() == 40
@@ -0,0 +1,81 @@
+import uuid
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models import Contact
+from app.services.contact_import import import_contacts
+from app.services.jobs import Job
+
+CSV = (
+    "email,phone,first_name,last_name,tags,custom_fields.plan\n"
+    "ADA@example.com,,Ada,Lovelace,newsletter;vip,free\n"
+    ",15550100000,Robert,,,\n"
+    "grace@example.com,,Grace,Hopper,,\n"
+    "grace@example.com,,Dup,,,\n"
+    "not-an-email,,X,,,\n"
+)
+
+async def run_import(tmp_path, workspace, content: str, import_format: str):
+    path = tmp_path / f"contacts.{import_format}"
+    path.write_text(content)
+    job = Job(id=str(uuid.uuid4()), kind="contact_import", workspace_id=str(workspace.id))
+    counts = await import_contacts(str(path), import_format, workspace.id, job)
+    return counts, job
+
+async def contacts(db, workspace) -> dict:
+    result = await db.execute(select(Contact).where(Contact.workspace_id == workspace.id))
+    return {contact.first_name: contact for contact in result.scalars()}
+
+async def test_csv_import_creates_new_contacts_and_fills_in_existing_ones(db, workspace, tmp_path):
+    db.add_all([
+        Contact(workspace_id=workspace.id, first_name="Ada", email="ada@example.com", tags=["vip"],
+                custom_fields={"plan": "pro"}),
+        Contact(workspace_id=workspace.id, first_name="Bob", phone="+1 (555) 010-0000")
+    ])
+    await db.commit()
+
+    counts, job = await run_import(tmp_path, workspace, CSV, "csv")
+
+    assert counts == {"rows": 5, "created": 1, "updated": 2, "invalid": 2}
+    assert job.errors == [
+        {"row": 4, "error": "Duplicate of row 3"},
+        {"row": 5, "error": "Invalid email 'not-an-email'"}
+    ]
+    by_name = await contacts(db, workspace)
+    assert set(by_name) == {"Ada", "Bob", "Grace"}
+    # Matched on the lowercased email: blanks are filled in, values already on the contact win
+    ada = by_name["Ada"]
+    assert (ada.last_name, sorted(ada.tags), ada.custom_fields) == ("Lovelace", ["newsletter", "vip"], {"plan": "pro"})
+    # Matched on the phone digits
+    assert by_name["Bob"].phone == "+1 (555) 010-0000"
+    assert (by_name["Grace"].email, by_name["Grace"].last_name) == ("grace@example.com", "Hopper")
+
+async def test_repeats_across_chunks_merge_into_the_contact_created_first(db, workspace, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTACT_IMPORT_CHUNK", 1)
+    ndjson = (
+        '{"email": "grace@example.com", "first_name": "Grace"}\n'
+        '{"email": "Grace@Example.com", "last_name": "Hopper", "tags": ["navy"]}\n'
+    )
+
+    counts, _ = await run_import(tmp_path, workspace, ndjson, "ndjson")
+
+    assert counts == {"rows": 2, "created": 1, "updated": 1, "invalid": 0}
+    grace = (await contacts(db, workspace))["Grace"]
+    assert (grace.last_name, grace.tags) == ("Hopper", ["navy"])
+
+async def test_rows_matching_one_contact_by_different_keys_report_the_later_ones(db, workspace, tmp_path):
+    db.add(Contact(workspace_id=workspace.id, first_name="Ada", email="ada@example.com", phone="+15550100000"))
+    await db.commit()
+    csv = (
+        "email,phone,last_name,company\n"
+        ",+1 555 010 0000,Byron,Analytical Engines\n"
+        "ada@example.com,,Lovelace,\n"
+    )
+
+    counts, job = await run_import(tmp_path, workspace, csv, "csv")
+
+    assert counts == {"rows": 2, "created": 0, "updated": 1, "invalid": 1}
+    assert job.errors == [{"row": 2, "error": "Duplicate of row 1"}]
+    ada = (await contacts(db, workspace))["Ada"]
+    assert (ada.last_name, ada.company) == ("Byron", "Analytical Engines")
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.api.v1.endpoints import conversations
+from app.core.security import get_current_user
+from app.models.conversation import ChannelType, Conversation, Message, MessageRole
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.include_router(conversations.router, prefix="/conversations")
+    app.dependency_overrides[get_current_user] = lambda: None
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+async def test_bulk_read_up_to_an_aware_timestamp(db, workspace, client):
+    conversation = Conversation(workspace_id=workspace.id, channel=ChannelType.WHATSAPP, unread_count=2)
+    db.add(conversation)
+    await db.flush()
+    db.add_all([
+        Message(conversation_id=conversation.id, role=MessageRole.USER, content="early",
+                created_at=datetime(2026, 1, 1, 9, 0)),
+        Message(conversation_id=conversation.id, role=MessageRole.USER, content="late",
+                created_at=datetime(2026, 1, 1, 11, 0))
+    ])
+    await db.commit()
+
+    # 12:00+02:00 is 10:00 UTC: only the 09:00 message is covered
+    response = await client.post(
+        "/conversations/bulk/read",
+        json={"conversation_ids": [str(conversation.id)], "up_to": "2026-01-01T12:00:00+02:00"},
+        headers={"X-Workspace-Id": str(workspace.id)}
+    )
+    assert response.status_code == 200
+    assert response.json()["unread_counts"] == {str(conversation.id): 1}
+
+    response = await client.post(
+        "/conversations/bulk/read",
+        json={"conversation_ids": [str(conversation.id)], "up_to": "2026-01-01T11:00:00Z"},
+        headers={"X-Workspace-Id": str(workspace.id)}
+    )
+    assert response.json()["unread_counts"] == {str(conversation.id): 0}
+    read = (await db.execute(select(Message.content).where(Message.is_read.is_(True)))).scalars()
+    assert sorted(read) == ["early", "late"]
@@ -0,0 +1,90 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.models import Contact, Conversation, Message
+from app.services.message_ingest import INGEST_HANDLERS, IngestBatcher, commit_ingest
+from tests.conftest import make_channel
+
+def whatsapp_payload(phone_number_id: str, messages: list) -> dict:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{"changes": [{"field": "messages", "value": {
+            "metadata": {"phone_number_id": phone_number_id},
+            "messages": [
+                {"from": sender, "id": message_id, "type": "text", "text": {"body": body}}
+                for sender, message_id, body in messages
+            ]
+        }}]}]
+    }
+
+async def test_ingest_creates_contacts_conversations_and_messages(db, workspace):
+    channel = await make_channel(db, workspace)
+    payload = whatsapp_payload(channel.external_id, [
+        ("15550001", "wamid.1", "hello"),
+        ("15550001", "wamid.2", "anyone there?"),
+        ("15550002", "wamid.3", "hi"),
+    ])
+
+    assert await INGEST_HANDLERS["whatsapp"]([payload], db) == 3
+    await commit_ingest(db)
+
+    contacts = (await db.execute(select(Contact.whatsapp_id).where(Contact.workspace_id == workspace.id))).scalars()
+    assert sorted(contacts) == ["15550001", "15550002"]
+    conversations = (await db.execute(
+        select(Conversation).where(Conversation.workspace_id == workspace.id)
+    )).scalars().all()
+    assert sorted((c.message_count, c.unread_count) for c in conversations) == [(1, 1), (2, 2)]
+    assert {c.last_message_preview for c in conversations} == {"anyone there?", "hi"}
+
+async def test_ingest_skips_redelivered_messages(db, workspace):
+    channel = await make_channel(db, workspace)
+    payload = whatsapp_payload(channel.external_id, [("15550001", "wamid.1", "hello")])
+
+    assert await INGEST_HANDLERS["whatsapp"]([payload, payload], db) == 1
+    await commit_ingest(db)
+    assert await INGEST_HANDLERS["whatsapp"]([payload], db) == 0
+    await commit_ingest(db)
+
+    count = (await db.execute(select(Message.id))).all()
+    assert len(count) == 1
+
+async def test_ingest_ignores_unknown_accounts(db, workspace):
+    await make_channel(db, workspace)
+    payload = whatsapp_payload("unknown-number", [("15550001", "wamid.1", "hello")])
+
+    assert await INGEST_HANDLERS["whatsapp"]([payload], db) == 0
+
+async def test_batch_keeps_webhook_order(db, workspace):
+    channel = await make_channel(db, workspace)
+    texts = [f"part {i}" for i in range(20)]
+    payload = whatsapp_payload(channel.external_id, [("15550001", f"wamid.{i}", text) for i, text in enumerate(texts)])
+
+    await INGEST_HANDLERS["whatsapp"]([payload], db)
+    await commit_ingest(db)
+
+    history = (await db.execute(select(Message.content).order_by(Message.created_at, Message.id))).scalars().all()
+    assert history == texts
+
+async def test_ingest_drops_messages_to_inactive_channels(db, workspace):
+    channel = await make_channel(db, workspace, is_active=False)
+    payload = whatsapp_payload(channel.external_id, [("15550001", "wamid.1", "hello")])
+
+    assert await INGEST_HANDLERS["whatsapp"]([payload], db) == 0
+    await commit_ingest(db)
+    assert (await db.execute(select(Contact.id))).first() is None
+
+async def test_batcher_coalesces_concurrent_deliveries(db):
+    batches = []
+
+    async def handler(payloads, session):
+        # The flush task is referenced while it runs
+        assert len(batcher._flushing) == 1
+        batches.append(payloads)
+
+    batcher = IngestBatcher(handler, window_ms=20, max_payloads=10)
+    await asyncio.gather(*(batcher.submit({"delivery": i}) for i in range(3)))
+
+    assert batches == [[{"delivery": 0}, {"delivery": 1}, {"delivery": 2}]]
+    await asyncio.sleep(0.01)
+    assert not batcher._flushing
@@ -0,0 +1,12 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+from app.core.database import Base
+
+async def test_migrations_match_the_models(db):
+    # The session schema fixture upgraded the database to head
+    connection = await db.connection()
+    diff = await connection.run_sync(
+        lambda sync_connection: compare_metadata(MigrationContext.configure(sync_connection), Base.metadata)
+    )
+    assert diff == []
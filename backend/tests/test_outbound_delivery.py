@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.channel import ChannelType
+from app.models.conversation import Conversation, Message, MessageRole, MessageStatus, OutboundMessage, OutboundStatus
+from app.services import channel_service
+from app.services.channel_service import ChannelAPIError
+from app.services.outbound_delivery import OutboundDeliveryPool, enqueue_outbound
+from tests.conftest import make_channel, make_contacts
+
+@pytest.fixture
+def sent(monkeypatch) -> list:
+    sent = []
+
+    async def send_message(phone_number_id, access_token, to, message):
+        if message == "fail":
+            raise ChannelAPIError(400, "Message failed to send")
+        sent.append((to, message))
+        return {"messages": [{"id": f"wamid.{len(sent)}"}]}
+
+    monkeypatch.setattr(channel_service.whatsapp_service, "send_message", send_message)
+    return sent
+
+async def queue_replies(db, workspace, *contents) -> Conversation:
+    channel = await make_channel(db, workspace)
+    channel.config = {"throughput_mps": 10000}
+    contact = (await make_contacts(db, workspace, 1))[0]
+    conversation = Conversation(workspace_id=workspace.id, contact_id=contact.id, channel=ChannelType.WHATSAPP)
+    db.add(conversation)
+    await db.flush()
+    for content in contents:
+        message = Message(conversation_id=conversation.id, role=MessageRole.ASSISTANT, content=content)
+        db.add(message)
+        await db.flush()
+        assert enqueue_outbound(db, conversation, message)
+    await db.commit()
+    return conversation
+
+async def test_replies_of_a_conversation_go_out_in_order(db, workspace, sent):
+    conversation = await queue_replies(db, workspace, "first", "second")
+    pool = OutboundDeliveryPool()
+
+    jobs = await pool.claim(db)
+    assert [job.content for job in jobs] == ["first"]
+    # The next reply waits for the one being sent
+    assert await pool.claim(db) == []
+    await pool.deliver(db, jobs)
+    await pool.deliver(db, await pool.claim(db))
+
+    assert sent == [("15550000000", "first"), ("15550000000", "second")]
+    messages = (await db.execute(
+        select(Message.content, Message.status, Message.channel_message_id)
+        .where(Message.conversation_id == conversation.id)
+        .order_by(Message.created_at)
+    )).all()
+    assert [tuple(row) for row in messages] == [
+        ("first", MessageStatus.SENT, "wamid.1"), ("second", MessageStatus.SENT, "wamid.2")
+    ]
+
+async def test_rejected_replies_fail_without_retry(db, workspace, sent):
+    conversation = await queue_replies(db, workspace, "fail")
+    pool = OutboundDeliveryPool()
+
+    await pool.deliver(db, await pool.claim(db))
+
+    job = (await db.execute(select(OutboundMessage))).scalar_one()
+    message = (await db.execute(select(Message).where(Message.conversation_id == conversation.id))).scalar_one()
+    assert (job.status, message.status, message.channel_message_id) == (OutboundStatus.FAILED, MessageStatus.FAILED, None)
+    assert job.error_message == "Message failed to send"
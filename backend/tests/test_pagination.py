@@ -0,0 +1,96 @@
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, MetaData, Table, Uuid, create_engine, select
+
+from app.core.pagination import Keyset, decode_cursor, paginate
+
+# The predicates are plain SQL; an in-memory SQLite database evaluates them without Postgres
+metadata = MetaData()
+rows_table = Table("rows", metadata, Column("id", Uuid, primary_key=True), Column("sort", DateTime))
+KEYSET = Keyset(rows_table.c.sort, rows_table.c.id)
+START = datetime(2026, 1, 1)
+
+@pytest.fixture
+def connection():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.connect() as connection:
+        yield connection
+
+def expected_order(rows: list) -> list:
+    # DESC NULLS FIRST on sort, then id DESC
+    return [
+        row["id"] for row in sorted(
+            rows, key=lambda row: (row["sort"] is None, row["sort"] or START, row["id"]), reverse=True
+        )
+    ]
+
+def encode(payload) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode().rstrip("=")
+
+def test_cursor_pages_cover_null_and_dated_rows_once(connection):
+    rows = (
+        [{"id": uuid.uuid4(), "sort": None} for _ in range(3)]
+        + [{"id": uuid.uuid4(), "sort": START + timedelta(minutes=i // 2)} for i in range(6)]
+    )
+    connection.execute(rows_table.insert(), rows)
+
+    served, cursor = [], None
+    while True:
+        page = connection.execute(paginate(select(rows_table), KEYSET, cursor, 0, 2)).all()
+        served += [row.id for row in page]
+        if len(page) < 2:
+            break
+        cursor = KEYSET.cursor_for(page[-1])
+    assert served == expected_order(rows)
+
+def test_cursor_on_the_last_null_row_continues_with_the_newest_dated_row(connection):
+    null_ids = sorted((uuid.uuid4() for _ in range(2)), reverse=True)
+    dated = [{"id": uuid.uuid4(), "sort": START}, {"id": uuid.uuid4(), "sort": START + timedelta(hours=1)}]
+    connection.execute(rows_table.insert(), [{"id": id_value, "sort": None} for id_value in null_ids] + dated)
+
+    after_first = connection.execute(
+        select(rows_table.c.id).where(KEYSET.after(None, null_ids[0])).order_by(*KEYSET.order_by())
+    ).scalars().all()
+    assert after_first == [null_ids[1], dated[1]["id"], dated[0]["id"]]
+    after_last = connection.execute(
+        select(rows_table.c.id).where(KEYSET.after(None, null_ids[1])).order_by(*KEYSET.order_by())
+    ).scalars().all()
+    assert after_last == [dated[1]["id"], dated[0]["id"]]
+
+def test_dated_cursor_never_returns_null_rows(connection):
+    dated_id = uuid.uuid4()
+    connection.execute(rows_table.insert(), [{"id": uuid.uuid4(), "sort": None}, {"id": dated_id, "sort": START}])
+
+    after = connection.execute(
+        select(rows_table.c.id).where(KEYSET.after(START + timedelta(seconds=1), uuid.uuid4()))
+    ).scalars().all()
+    assert after == [dated_id]
+
+def test_cursor_round_trips():
+    row_id = uuid.uuid4()
+    row = type("Row", (), {"sort": START, "id": row_id})
+    assert decode_cursor(KEYSET.cursor_for(row)) == (START, row_id)
+    row.sort = None
+    assert decode_cursor(KEYSET.cursor_for(row)) == (None, row_id)
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",
+    "bm90IGpzb24",
+    encode(5),
+    encode([None]),
+    encode([None, "not-a-uuid"]),
+    encode(["yesterday", str(uuid.uuid4())]),
+    encode([1, str(uuid.uuid4())]),
+    encode([None, 1]),
+    encode({"sort": None, "id": str(uuid.uuid4())}),
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
@@ -0,0 +1,46 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints import realtime
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(realtime.router, prefix="/realtime")
+    return TestClient(app)
+
+@pytest.fixture
+def served(monkeypatch) -> list:
+    served = []
+
+    async def authorize(token, workspace_id):
+        return "user-1" if token == "valid" else None
+
+    async def serve(websocket, workspace_id, user_id):
+        served.append((workspace_id, user_id))
+        await websocket.close()
+
+    monkeypatch.setattr(realtime, "_authorize", authorize)
+    monkeypatch.setattr(realtime.inbox_gateway, "serve", serve)
+    return served
+
+def test_malformed_workspace_ids_are_refused(client, served):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/realtime/inbox?workspace_id=not-a-uuid&token=valid") as socket:
+            socket.receive_text()
+    assert closed.value.code == 1008
+    assert served == []
+
+def test_workspace_ids_are_served_in_canonical_form(client, served):
+    workspace_id = uuid.uuid4()
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(
+            f"/realtime/inbox?workspace_id={str(workspace_id).upper()}&token=valid"
+        ) as socket:
+            socket.receive_text()
+    # inbox_topic() publishes under str(UUID)
+    assert served == [(str(workspace_id), "user-1")]
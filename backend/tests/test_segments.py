@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, null, select
+
+from app.models import Contact
+from app.schemas.segment import AudienceFilter
+from app.services.segments import compile_audience
+
+async def audience(db, workspace, audience_filter: dict) -> set:
+    result = await db.execute(
+        select(Contact.first_name).where(compile_audience(workspace.id, "segment", audience_filter))
+    )
+    return set(result.scalars())
+
+@pytest.fixture
+async def contacts(db, workspace):
+    db.add_all([
+        Contact(workspace_id=workspace.id, first_name="vip", tags=["vip", "newsletter"],
+                custom_fields={"plan": "pro", "seats": 12, "note": "100% happy"}, lead_score=80),
+        Contact(workspace_id=workspace.id, first_name="newsletter", tags=["newsletter"],
+                custom_fields={"plan": "free", "seats": "many", "note": "100 happy"}, lead_score=20),
+        Contact(workspace_id=workspace.id, first_name="bare", tags=[], custom_fields={}),
+        Contact(workspace_id=workspace.id, first_name="null", tags=null(), custom_fields=null()),
+    ])
+    await db.commit()
+
+async def test_tag_filters(db, workspace, contacts):
+    assert await audience(db, workspace, {"tags": {"any": ["vip", "missing"]}}) == {"vip"}
+    assert await audience(db, workspace, {"tags": {"all": ["vip", "newsletter"]}}) == {"vip"}
+    assert await audience(db, workspace, {"tags": {"none": ["vip"]}}) == {"newsletter", "bare", "null"}
+    # Legacy audiences store a plain list meaning "any of"
+    assert await audience(db, workspace, {"tags": ["newsletter"]}) == {"vip", "newsletter"}
+
+async def test_custom_field_filters(db, workspace, contacts):
+    def field(op, value=None):
+        return {"custom_fields": [{"field": "plan" if op != "gt" else "seats", "op": op, "value": value}]}
+
+    assert await audience(db, workspace, field("eq", "pro")) == {"vip"}
+    assert await audience(db, workspace, field("ne", "pro")) == {"newsletter", "bare", "null"}
+    assert await audience(db, workspace, field("in", ["pro", "free"])) == {"vip", "newsletter"}
+    assert await audience(db, workspace, field("exists")) == {"vip", "newsletter"}
+    assert await audience(db, workspace, field("not_exists")) == {"bare", "null"}
+    # Non-numeric values never satisfy a numeric comparison
+    assert await audience(db, workspace, field("gt", 10)) == {"vip"}
+
+async def test_contains_matches_wildcards_literally(db, workspace, contacts):
+    assert await audience(db, workspace, {"custom_fields": [{"field": "note", "op": "contains", "value": "0% HAPPY"}]}) == {"vip"}
+    assert await audience(db, workspace, {"custom_fields": [{"field": "note", "op": "contains", "value": "1_0"}]}) == set()
+
+async def test_lead_score_and_workspace_scope(db, workspace, contacts):
+    assert await audience(db, workspace, {"lead_score": {"gte": 50}}) == {"vip"}
+    total = await db.scalar(select(func.count()).select_from(Contact).where(compile_audience(workspace.id, "all", None)))
+    assert total == 4
+
+async def test_aware_date_windows_compare_in_utc(db, workspace):
+    # last_contacted_at is naive UTC
+    db.add_all([
+        Contact(workspace_id=workspace.id, first_name="early", last_contacted_at=datetime(2026, 1, 1, 10)),
+        Contact(workspace_id=workspace.id, first_name="late", last_contacted_at=datetime(2026, 1, 1, 12)),
+    ])
+    await db.commit()
+
+    assert await audience(db, workspace, {"last_contacted_at": {"after": "2026-01-01T13:00:00+02:00"}}) == {"late"}
+    assert await audience(db, workspace, {"last_contacted_at": {"before": "2026-01-01T12:00:00Z"}}) == {"early"}
+
+def test_unknown_criteria_are_rejected():
+    with pytest.raises(ValidationError):
+        AudienceFilter.model_validate({"tag": ["vip"]})
+    with pytest.raises(ValidationError):
+        AudienceFilter.model_validate({"tags": {"anyof": ["vip"]}})
+    with pytest.raises(ValidationError):
+        AudienceFilter.model_validate({"custom_fields": [{"field": "plan", "operator": "eq", "value": "pro"}]})
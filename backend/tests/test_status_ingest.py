@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.broadcast import Broadcast, BroadcastRecipient, BroadcastStatus, RecipientStatus
+from app.models.channel import ChannelType
+from app.models.conversation import Conversation, Message, MessageRole, MessageStatus
+from app.services.status_ingest import StatusEvent, apply_status_events
+from tests.conftest import make_contacts
+
+async def make_sent_broadcast(db, workspace, count: int) -> Broadcast:
+    contacts = await make_contacts(db, workspace, count)
+    broadcast = Broadcast(workspace_id=workspace.id, name="Launch", channel="whatsapp", message_content="Hi",
+                          status=BroadcastStatus.SENDING, total_recipients=count)
+    db.add(broadcast)
+    await db.flush()
+    db.add_all([
+        BroadcastRecipient(broadcast_id=broadcast.id, contact_id=contact.id, status=RecipientStatus.PENDING,
+                           channel_message_id=f"wamid.{i}")
+        for i, contact in enumerate(contacts)
+    ])
+    await db.commit()
+    return broadcast
+
+async def recipient_statuses(db, broadcast) -> dict:
+    result = await db.execute(
+        select(BroadcastRecipient.channel_message_id, BroadcastRecipient.status)
+        .where(BroadcastRecipient.broadcast_id == broadcast.id)
+    )
+    return dict(result.all())
+
+async def counters(db, broadcast) -> tuple:
+    result = await db.execute(
+        select(Broadcast.sent_count, Broadcast.delivered_count, Broadcast.read_count, Broadcast.failed_count)
+        .where(Broadcast.id == broadcast.id)
+    )
+    return tuple(result.one())
+
+async def test_sent_only_batch_updates_recipients_and_counters(db, workspace):
+    broadcast = await make_sent_broadcast(db, workspace, 3)
+    now = datetime.utcnow()
+    events = [StatusEvent(f"wamid.{i}", RecipientStatus.SENT, now) for i in range(3)]
+
+    updated, unmatched = await apply_status_events(events, db)
+    await db.commit()
+
+    assert (updated, unmatched) == (3, [])
+    assert set((await recipient_statuses(db, broadcast)).values()) == {RecipientStatus.SENT}
+    assert await counters(db, broadcast) == (3, 0, 0, 0)
+
+async def test_statuses_only_move_forward(db, workspace):
+    broadcast = await make_sent_broadcast(db, workspace, 2)
+    now = datetime.utcnow()
+
+    await apply_status_events([
+        StatusEvent("wamid.0", RecipientStatus.SENT, now),
+        StatusEvent("wamid.0", RecipientStatus.DELIVERED, now + timedelta(seconds=1)),
+        StatusEvent("wamid.1", RecipientStatus.READ, now + timedelta(seconds=2)),
+    ], db)
+    await db.commit()
+    # Late and duplicate callbacks are matched but change nothing
+    updated, unmatched = await apply_status_events([
+        StatusEvent("wamid.0", RecipientStatus.SENT, now),
+        StatusEvent("wamid.1", RecipientStatus.DELIVERED, now),
+    ], db)
+    await db.commit()
+
+    assert (updated, unmatched) == (0, [])
+    assert await recipient_statuses(db, broadcast) == {
+        "wamid.0": RecipientStatus.DELIVERED, "wamid.1": RecipientStatus.READ
+    }
+    recipient = (await db.execute(
+        select(BroadcastRecipient).where(BroadcastRecipient.channel_message_id == "wamid.1")
+    )).scalar_one()
+    assert recipient.delivered_at is not None and recipient.read_at is not None
+    assert await counters(db, broadcast) == (2, 2, 1, 0)
+
+async def test_failed_status_records_error(db, workspace):
+    broadcast = await make_sent_broadcast(db, workspace, 1)
+
+    await apply_status_events([StatusEvent("wamid.0", RecipientStatus.FAILED, datetime.utcnow(), "131026: Undeliverable")], db)
+    await db.commit()
+
+    recipient = (await db.execute(select(BroadcastRecipient))).scalar_one()
+    assert (recipient.status, recipient.error_message) == (RecipientStatus.FAILED, "131026: Undeliverable")
+    assert await counters(db, broadcast) == (0, 0, 0, 1)
+
+async def test_failed_recipients_delivered_later_stop_counting_as_failed(db, workspace):
+    broadcast = await make_sent_broadcast(db, workspace, 2)
+    now = datetime.utcnow()
+
+    await apply_status_events([StatusEvent(f"wamid.{i}", RecipientStatus.SENT, now) for i in range(2)], db)
+    await apply_status_events([
+        StatusEvent(f"wamid.{i}", RecipientStatus.FAILED, now + timedelta(seconds=1)) for i in range(2)
+    ], db)
+    await db.commit()
+    assert await counters(db, broadcast) == (2, 0, 0, 2)
+
+    await apply_status_events([
+        StatusEvent("wamid.0", RecipientStatus.DELIVERED, now + timedelta(seconds=2)),
+        StatusEvent("wamid.1", RecipientStatus.READ, now + timedelta(seconds=2)),
+    ], db)
+    await db.commit()
+    assert await counters(db, broadcast) == (2, 2, 1, 0)
+
+async def test_unknown_message_ids_are_returned(db, workspace):
+    await make_sent_broadcast(db, workspace, 1)
+    event = StatusEvent("wamid.unknown", RecipientStatus.DELIVERED, datetime.utcnow())
+
+    assert await apply_status_events([event], db) == (0, [event])
+
+async def test_concurrent_consumers_count_each_transition_once(db, workspace):
+    broadcast = await make_sent_broadcast(db, workspace, 50)
+    events = [StatusEvent(f"wamid.{i}", RecipientStatus.DELIVERED, datetime.utcnow()) for i in range(50)]
+
+    async def consume():
+        async with AsyncSessionLocal() as session:
+            await apply_status_events(events, session)
+            await session.commit()
+
+    await asyncio.gather(*(consume() for _ in range(4)))
+
+    assert await counters(db, broadcast) == (50, 50, 0, 0)
+
+async def test_inbox_reply_statuses_move_forward_and_notify_the_inbox(db, workspace):
+    contact = (await make_contacts(db, workspace, 1))[0]
+    conversation = Conversation(workspace_id=workspace.id, contact_id=contact.id, channel=ChannelType.WHATSAPP)
+    db.add(conversation)
+    await db.flush()
+    reply = Message(conversation_id=conversation.id, role=MessageRole.ASSISTANT, content="On it",
+                    channel_message_id="wamid.reply", status=MessageStatus.SENT)
+    db.add(reply)
+    await db.commit()
+
+    updated, unmatched = await apply_status_events([
+        StatusEvent("wamid.reply", RecipientStatus.READ, datetime.utcnow()),
+        StatusEvent("wamid.reply", RecipientStatus.DELIVERED, datetime.utcnow()),
+    ], db)
+
+    assert (updated, unmatched) == (0, [])
+    events = db.info["inbox_events"][str(workspace.id)]
+    assert [(event["type"], event["message"]["status"]) for event in events] == [("message.updated", "read")]
+    await db.commit()
+    await db.refresh(reply)
+    assert reply.status == MessageStatus.READ
+
+    # Late callbacks for the reply are matched, not retried
+    assert await apply_status_events([StatusEvent("wamid.reply", RecipientStatus.SENT, datetime.utcnow())], db) == (0, [])
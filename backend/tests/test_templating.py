@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.templating import TemplateError, compile_template
+
+def render(source: str, **values) -> str:
+    template = compile_template(source)
+    return template.render(tuple(values.get(field) for field in template.fields))
+
+def test_static_templates_need_no_fields():
+    template = compile_template("Sale ends tonight")
+    assert template.is_static
+    assert template.render(()) == "Sale ends tonight"
+
+def test_fields_are_listed_once_in_first_use_order():
+    template = compile_template("{{company}}: hi {{ first_name }}, {{company}} {{custom_fields.plan}}")
+    assert template.fields == ("company", "first_name", "custom_fields")
+    assert render(template.source, company="Acme", first_name="Ada", custom_fields={"plan": "pro"}) == \
+        "Acme: hi Ada, Acme pro"
+
+def test_fallback_chain_takes_the_first_non_empty_value():
+    source = 'Hi {{first_name | company | "there"}}!'
+    assert render(source, first_name="Ada", company="Acme") == "Hi Ada!"
+    assert render(source, first_name="", company="Acme") == "Hi Acme!"
+    assert render(source) == "Hi there!"
+    assert render("Hi {{first_name | company}}!") == "Hi !"
+
+def test_custom_fields_render_missing_values_as_empty():
+    source = "{{custom_fields.seats}}/{{custom_fields.plan}}"
+    assert render(source, custom_fields={"seats": 12, "plan": None}) == "12/"
+    assert render(source, custom_fields=None) == "/"
+
+def test_literal_text_is_never_evaluated():
+    source = "it's \"quoted\" \\n '); import os; ('"
+    assert render(source) == source
+
+@pytest.mark.parametrize("source", [
+    "Hi {{nickname}}",
+    "Hi {{custom_fields}}",
+    "Hi {{first_name.x}}",
+    "Hi {{ }}",
+    "Hi {{first_name | }}",
+    'Hi {{first_name | "there}}',
+    "Hi {{first_name",
+    "Hi first_name}}",
+    "Hi {{__import__('os')}}",
+])
+def test_invalid_templates_are_rejected(source):
+    with pytest.raises(TemplateError):
+        compile_template(source)
@@ -0,0 +1,53 @@
+import random
+
+from app.core.timer_wheel import HierarchicalTimerWheel
+
+def test_timers_fire_at_their_tick_and_never_earlier():
+    wheel = HierarchicalTimerWheel(tick=0.5, start=100.0)
+    wheel.add("a", 101.2)
+    wheel.add("b", 101.5)
+
+    assert wheel.advance(101.0) == []
+    # 101.2 rounds up to the 101.5 tick
+    assert wheel.advance(101.4) == []
+    assert sorted(wheel.advance(101.5)) == ["a", "b"]
+    assert len(wheel) == 0
+
+def test_past_due_timers_fire_on_the_next_advance():
+    wheel = HierarchicalTimerWheel(tick=1, start=50)
+    wheel.add("late", 10)
+
+    assert wheel.advance(50) == ["late"]
+    assert wheel.advance(51) == []
+
+def test_reschedule_and_cancel():
+    wheel = HierarchicalTimerWheel(tick=1, slots=4, levels=2)
+    wheel.add("moved", 3)
+    wheel.add("moved", 30)
+    wheel.add("cancelled", 5)
+    assert wheel.cancel("cancelled")
+    assert not wheel.cancel("cancelled")
+    assert "moved" in wheel and "cancelled" not in wheel
+
+    assert wheel.advance(29) == []
+    assert wheel.advance(30) == ["moved"]
+    assert len(wheel) == 0
+
+def test_timers_cascade_from_upper_levels_and_overflow():
+    # 4 slots x 3 levels cover 64 ticks; later timers start in the overflow map
+    rng = random.Random(7)
+    wheel = HierarchicalTimerWheel(tick=1, slots=4, levels=3)
+    due = {key: rng.randint(1, 200) for key in range(300)}
+    for key, tick in due.items():
+        wheel.add(key, tick)
+
+    fired, advances = {}, []
+    while not advances or advances[-1] < 210:
+        advances.append((advances[-1] if advances else 0) + rng.randint(1, 9))
+        for key in wheel.advance(advances[-1]):
+            assert key not in fired
+            fired[key] = advances[-1]
+
+    assert len(wheel) == 0
+    # Each timer fires exactly once, on the first advance that reaches its tick
+    assert fired == {key: next(now for now in advances if now >= tick) for key, tick in due.items()}
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.core.config import settings
+from app.services import webhook_queue
+from app.services.webhook_queue import RedisStreamQueue
+
+def make_queue() -> RedisStreamQueue:
+    return RedisStreamQueue("test:webhooks", "ingest", "test:webhooks:dead")
+
+async def test_restarted_consumer_recovers_its_unacked_entries(redis_client):
+    queue = make_queue()
+    await queue.setup()
+    for i in range(3):
+        await queue.enqueue("whatsapp", f'{{"n": {i}}}'.encode())
+    read = await queue.read("host-1-consumer-0", 10, 10)
+    assert len(read) == 3
+
+    # Same consumer name after a restart: the unacked entries come back first, once
+    restarted = make_queue()
+    await restarted.setup()
+    await restarted.enqueue("whatsapp", b'{"n": 3}')
+    recovered = await restarted.read("host-1-consumer-0", 10, 10)
+    assert [item.entry_id for item in recovered] == [item.entry_id for item in read]
+    assert {item.deliveries for item in recovered} == {2}
+    await restarted.ack(recovered)
+
+    fresh = await restarted.read("host-1-consumer-0", 10, 10)
+    assert [item.body for item in fresh] == [b'{"n": 3}']
+    await restarted.ack(fresh)
+    assert await restarted.read("host-1-consumer-0", 10, 10) == []
+    assert (await restarted.stats())["pending"] == 0
+
+async def test_stale_entries_of_other_consumers_are_claimed(redis_client, monkeypatch):
+    queue = make_queue()
+    await queue.setup()
+    await queue.enqueue("whatsapp", b"{}")
+    assert len(await queue.read("dead-host-1-consumer-0", 10, 10)) == 1
+
+    monkeypatch.setattr(settings, "WEBHOOK_CLAIM_IDLE_MS", 0)
+    claimed = await queue.read("host-2-consumer-0", 10, 10)
+    assert len(claimed) == 1 and claimed[0].deliveries == 2
+
+async def test_setup_prunes_idle_consumers_with_nothing_pending(redis_client, monkeypatch):
+    queue = make_queue()
+    await queue.setup()
+    await queue.enqueue("whatsapp", b"{}")
+    await queue.read("idle-consumer", 10, 10)
+    assert await queue.read("drained-consumer", 10, 10) == []
+    monkeypatch.setattr(webhook_queue, "CONSUMER_PRUNE_IDLE_MS", 0)
+    await asyncio.sleep(0.01)
+
+    await queue.setup()
+
+    consumers = {c["name"]: c["pending"] for c in await redis_client.xinfo_consumers("test:webhooks", "ingest")}
+    assert consumers == {b"idle-consumer": 1}
+
+def test_consumer_names_are_stable_per_process(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_CONSUMER_NAME", "")
+    assert webhook_queue.consumer_prefix() == webhook_queue.consumer_prefix()
+    monkeypatch.setattr(settings, "WEBHOOK_CONSUMER_NAME", "ingest-pod-3")
+    assert webhook_queue.consumer_prefix() == "ingest-pod-3"
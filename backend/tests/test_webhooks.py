@@ -0,0 +1,57 @@
+import hashlib
+import hmac
+
+import httpx
+import orjson
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.api.v1.endpoints import webhooks
+from app.core.config import settings
+from app.models import Message
+from tests.conftest import make_channel
+from tests.test_message_ingest import whatsapp_payload
+
+SECRET = "test-app-secret"
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.include_router(webhooks.router, prefix="/webhooks")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+def signed(body: bytes, secret: str = SECRET) -> dict:
+    return {"X-Hub-Signature-256": "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()}
+
+async def test_unsigned_webhooks_are_rejected_without_an_app_secret(client, monkeypatch):
+    monkeypatch.setattr(settings, "META_APP_SECRET", "")
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_UNSIGNED", False)
+
+    response = await client.post("/webhooks/whatsapp", content=b'{"entry": []}')
+    assert response.status_code == 403
+
+async def test_signatures_are_verified(client, monkeypatch):
+    monkeypatch.setattr(settings, "META_APP_SECRET", SECRET)
+    body = b'{"object": "whatsapp_business_account"}'
+
+    assert (await client.post("/webhooks/whatsapp", content=body)).status_code == 403
+    assert (await client.post("/webhooks/whatsapp", content=body, headers=signed(body, "wrong"))).status_code == 403
+    assert (await client.post("/webhooks/whatsapp", content=body, headers=signed(body))).status_code == 200
+
+async def test_development_flag_accepts_unsigned_webhooks(client, monkeypatch):
+    monkeypatch.setattr(settings, "META_APP_SECRET", "")
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_UNSIGNED", True)
+
+    assert (await client.post("/webhooks/whatsapp", content=b"{}")).status_code == 200
+
+async def test_signed_webhook_is_ingested(client, monkeypatch, db, workspace):
+    monkeypatch.setattr(settings, "META_APP_SECRET", SECRET)
+    channel = await make_channel(db, workspace)
+    body = orjson.dumps(whatsapp_payload(channel.external_id, [("15550001", "wamid.1", "hello")]))
+
+    response = await client.post("/webhooks/whatsapp", content=body, headers=signed(body))
+
+    assert response.status_code == 200
+    assert (await db.execute(select(Message.content))).scalars().all() == ["hello"]